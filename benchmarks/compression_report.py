@@ -0,0 +1,118 @@
+"""
+Size/time trade-off of the artifact compression codecs on the artifacts of a pipeline run.
+
+Run it from the root of the repository after a training run:
+
+    python -m benchmarks.compression_report --artifact-dir artifact/10_19_2026_10_30_00
+
+Every transformed array and pickled object of the run (the latest run by default) is written
+uncompressed and with every installed codec, then loaded back. It prints the stored size, the
+compression ratio and the write and load time of every artifact and codec, so the codec set with
+ARTIFACT_COMPRESSION can be chosen on real artifacts.
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+from sensor.constant.training_pipeline import ARTIFACT_COMPRESSION_CODECS, ARTIFACT_DIR
+from sensor.utils.compression import get_file_codec, is_codec_available
+from sensor.utils.main_utils import load_numpy_array_data, load_object, save_numpy_array_data, save_object
+
+ARTIFACT_FILE_EXTENSIONS = (".npy", ".pkl")
+
+
+def get_latest_run_dir(artifact_dir: str = ARTIFACT_DIR) -> str:
+    """
+    This function is used to get the directory of the latest pipeline run.
+    """
+    run_dirs = [os.path.join(artifact_dir, name) for name in os.listdir(artifact_dir) if os.path.isdir(os.path.join(artifact_dir, name))]
+    if not run_dirs:
+        raise FileNotFoundError(f"No pipeline run in {artifact_dir}")
+    return max(run_dirs, key=os.path.getmtime)
+
+
+def get_artifact_files(run_dir: str) -> List[str]:
+    """
+    This function is used to get the array and object artifacts of a run.
+    """
+    return sorted(
+        os.path.join(dir_path, file_name)
+        for dir_path, _, file_names in os.walk(run_dir)
+        for file_name in file_names if file_name.endswith(ARTIFACT_FILE_EXTENSIONS)
+    )
+
+
+def report_artifact(file_path: str, work_dir: str, n_repeats: int) -> List[Dict]:
+    """
+    This function is used to write and load one artifact uncompressed and with every installed codec.
+
+    Returns:
+        List[Dict]: stored size, ratio and best write and load time of every codec.
+    """
+    is_array = file_path.endswith(".npy")
+    load, save = (load_numpy_array_data, save_numpy_array_data) if is_array else (load_object, save_object)
+    artifact = load(file_path)
+    results = []
+    for codec in (None,) + tuple(codec for codec in ARTIFACT_COMPRESSION_CODECS if is_codec_available(codec)):
+        codec_file_path = os.path.join(work_dir, f"{codec or 'none'}_{os.path.basename(file_path)}")
+        write_seconds, load_seconds = [], []
+        for _ in range(n_repeats):
+            start = time.perf_counter()
+            size_report = save(codec_file_path, artifact, compression=codec)
+            write_seconds.append(time.perf_counter() - start)
+            start = time.perf_counter()
+            load(codec_file_path)
+            load_seconds.append(time.perf_counter() - start)
+        results.append({
+            "codec": codec or "none",
+            "raw_mb": round(size_report["raw_bytes"] / 2 ** 20, 3),
+            "stored_mb": round(size_report["stored_bytes"] / 2 ** 20, 3),
+            "ratio": size_report["ratio"],
+            "write_s": round(min(write_seconds), 4),
+            "load_s": round(min(load_seconds), 4),
+        })
+        os.remove(codec_file_path)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report the size and time of every artifact of a run with every compression codec.")
+    parser.add_argument("--artifact-dir", default=None, help="directory of the pipeline run, the latest run by default")
+    parser.add_argument("--repeats", type=int, default=3, help="the best time of this many writes and loads is reported")
+    parser.add_argument("--json", default=None, help="json file where the report is written")
+    args = parser.parse_args()
+
+    run_dir = args.artifact_dir or get_latest_run_dir()
+    artifact_files = get_artifact_files(run_dir)
+    if not artifact_files:
+        sys.exit(f"No .npy or .pkl artifact in {run_dir}")
+    missing_codecs = [codec for codec in ARTIFACT_COMPRESSION_CODECS if not is_codec_available(codec)]
+    if missing_codecs:
+        print(f"Not installed, skipped: {missing_codecs}")
+
+    work_dir = tempfile.mkdtemp(prefix="sensor_compression_report_")
+    report = {}
+    try:
+        print(f"{'artifact':<70} {'codec':<6} {'raw MB':>9} {'stored MB':>10} {'ratio':>6} {'write s':>8} {'load s':>8}")
+        for file_path in artifact_files:
+            artifact_name = os.path.relpath(file_path, run_dir)
+            report[artifact_name] = report_artifact(file_path, work_dir, args.repeats)
+            stored_codec = get_file_codec(file_path) or "none"
+            for result in report[artifact_name]:
+                marker = "*" if result["codec"] == stored_codec else " "
+                print(f"{artifact_name:<70} {result['codec']:<5}{marker} {result['raw_mb']:>9} {result['stored_mb']:>10} {result['ratio']:>6} {result['write_s']:>8} {result['load_s']:>8}")
+        print("* codec the artifact is stored with. Arrays memory mapped by the cross validation are always stored uncompressed.")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    if args.json:
+        with open(args.json, "w") as json_file:
+            json.dump({"artifact_dir": run_dir, "report": report}, json_file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Parity check of the dtype policy of config/schema.yaml against a float64 reference.
+
+Run it from the root of the repository:
+
+    python -m benchmarks.dtype_parity --rows 60000
+
+It ingests and validates synthetic APS shaped data once, then transforms it and trains the model
+twice: with float64 features / int64 target and with the dtype policy of the schema. It prints the
+test metrics, the size of the transformed arrays and the wall time of both runs, and fails when a
+metric of the policy run differs from the reference by more than the tolerance.
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from typing import Dict
+
+import numpy as np
+
+from benchmarks.synthetic_data import FileSensorData, SyntheticAPSData
+from sensor.components.data_ingestion import DataIngestion
+from sensor.components.data_transformation import DataTransformation
+from sensor.components.data_validation import DataValidation
+from sensor.components.model_trainer import ModelTrainer
+from sensor.entity.config_entity import DataIngestionConfig, DataTransformationConfig, DataValidationConfig, ModelTrainerConfig, TrainingPipelineConfig
+from sensor.ml.metric.classification_metric import get_classification_score
+from sensor.ml.schema.schema_validator import CompiledSchema, get_compiled_schema
+from sensor.utils.main_utils import load_numpy_array_data
+
+REFERENCE_DTYPE_POLICY: Dict[str, str] = {"features": "float64", "target": "int64"}
+METRIC_TOLERANCE: float = 0.01
+SEED: int = 42
+
+
+def train_with_schema(schema: CompiledSchema, data_ingestion_artifact, data_validation_artifact, artifact_dir: str) -> dict:
+    """
+    This function is used to transform the validated data and train the model with the dtypes of the given schema.
+
+    Returns:
+        dict: test metrics, size of the transformed arrays and wall time.
+    """
+    training_pipeline_config = TrainingPipelineConfig()
+    training_pipeline_config.artifact_dir = artifact_dir
+    start = time.perf_counter()
+    # SMOTETomek draws from the global random state, both runs get the same draws.
+    np.random.seed(SEED)
+    data_transformation = DataTransformation(data_validation_artifact, DataTransformationConfig(training_pipeline_config), data_ingestion_artifact)
+    data_transformation._schema = schema
+    data_transformation_artifact = data_transformation.initiate_data_transformation()
+    model_trainer = ModelTrainer(ModelTrainerConfig(training_pipeline_config), data_transformation_artifact)
+    train_arr = load_numpy_array_data(data_transformation_artifact.transformed_train_file_path)
+    test_arr = load_numpy_array_data(data_transformation_artifact.transformed_test_file_path)
+    model = model_trainer.train_model(train_arr[:, :-1], train_arr[:, -1].astype(schema.target_dtype))
+    y_test = test_arr[:, -1].astype(schema.target_dtype)
+    metric = get_classification_score(y_true=y_test, y_pred=model.predict(test_arr[:, :-1]))
+    return {
+        "features": str(schema.feature_dtype),
+        "target": str(schema.target_dtype),
+        "f1_score": float(metric.f1_score),
+        "precision_score": float(metric.precision_score),
+        "recall_score": float(metric.recall_score),
+        "array_mb": round((train_arr.nbytes + test_arr.nbytes) / 2 ** 20, 2),
+        "wall_time_s": round(time.perf_counter() - start, 4),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the model metrics of the schema dtype policy with a float64 reference.")
+    parser.add_argument("--rows", type=int, default=60_000)
+    parser.add_argument("--tolerance", type=float, default=METRIC_TOLERANCE, help="maximum absolute difference of every metric")
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="sensor_dtype_parity_")
+    try:
+        data_file_path = SyntheticAPSData().write_csv(os.path.join(work_dir, "sensor.csv"), args.rows)
+        training_pipeline_config = TrainingPipelineConfig()
+        training_pipeline_config.artifact_dir = os.path.join(work_dir, "artifact")
+        data_ingestion_artifact = DataIngestion(DataIngestionConfig(training_pipeline_config), sensor_data=FileSensorData(data_file_path)).initiate_data_ingestion()
+        data_validation_artifact = DataValidation(data_ingestion_artifact, DataValidationConfig(training_pipeline_config)).initiate_data_validation()
+
+        schema = get_compiled_schema()
+        reference_schema = CompiledSchema(dict(schema.schema_config, dtype_policy=REFERENCE_DTYPE_POLICY))
+        reference = train_with_schema(reference_schema, data_ingestion_artifact, data_validation_artifact, os.path.join(work_dir, "reference"))
+        policy = train_with_schema(schema, data_ingestion_artifact, data_validation_artifact, os.path.join(work_dir, "policy"))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    differences = {metric: round(policy[metric] - reference[metric], 6) for metric in ("f1_score", "precision_score", "recall_score")}
+    is_within_tolerance = all(abs(difference) <= args.tolerance for difference in differences.values())
+    print(json.dumps({"rows": args.rows, "reference": reference, "policy": policy, "differences": differences, "status": "ok" if is_within_tolerance else "failed: metrics differ more than the tolerance"}, indent=2))
+    return 0 if is_within_tolerance else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,68 @@
+"""
+Cold start benchmark of the serving process.
+
+Run it from the root of the repository:
+
+    python -m benchmarks.import_time --target 1.5
+
+It imports the serving entry point in a fresh interpreter with `python -X importtime`, prints the
+slowest imports and fails when the total import time is above the target or when a training only
+dependency is imported.
+"""
+import argparse
+import subprocess
+import sys
+from typing import List, Tuple
+
+SERVING_MODULE: str = "main"
+IMPORT_TIME_TARGET_SECONDS: float = 1.5
+# packages which are only needed by the training pipeline or by the unpickled model.
+TRAINING_ONLY_MODULES: List[str] = ["imblearn", "scipy.stats", "xgboost", "sklearn", "pymongo", "sensor.pipeline.training_pipeline"]
+
+
+def measure_import_time(module: str) -> Tuple[float, List[Tuple[int, str]], List[str]]:
+    """
+    This function is used to import a module in a fresh interpreter and read its -X importtime report.
+
+    Args:
+        module (str): module to import.
+
+    Returns:
+        tuple: total import time in seconds, (cumulative us, package) of the top two import levels and the imported modules.
+    """
+    code = f"import sys, {module}; print('\\n'.join(sorted(sys.modules)))"
+    completed = subprocess.run([sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True, check=True)
+    total_us, imports = 0, []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, package = line[len("import time:"):].split("|")
+        # nested imports are indented by two spaces per level, only the top level ones add up to the total time.
+        depth = (len(package) - len(package.lstrip()) - 1) // 2
+        if depth == 0:
+            total_us += int(cumulative)
+        if depth <= 1:
+            imports.append((int(cumulative), package.strip()))
+    return total_us / 1e6, imports, completed.stdout.split()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the import time of the serving process.")
+    parser.add_argument("--module", default=SERVING_MODULE, help="module to import")
+    parser.add_argument("--target", type=float, default=IMPORT_TIME_TARGET_SECONDS, help="maximum import time in seconds")
+    parser.add_argument("--top", type=int, default=15, help="number of slowest imports to print")
+    args = parser.parse_args()
+
+    total_seconds, imports, imported_modules = measure_import_time(args.module)
+    for cumulative, package in sorted(imports, reverse=True)[:args.top]:
+        print(f"{cumulative / 1e3:10.1f} ms  {package}")
+    print(f"total import time of {args.module}: {total_seconds:.3f}s (target {args.target:.3f}s)")
+
+    training_modules = [module for module in TRAINING_ONLY_MODULES if module in imported_modules]
+    if training_modules:
+        print(f"training only modules imported by the serving process: {training_modules}")
+    return 0 if total_seconds <= args.target and not training_modules else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,182 @@
+"""
+End to end benchmark of the training pipeline stages on synthetic APS shaped data.
+
+Run it from the root of the repository:
+
+    python -m benchmarks.pipeline_benchmark --rows 60000 600000 6000000
+
+Every run appends wall time, peak RSS and rows/sec of each stage to the json history file and
+prints the change against the previous run of the same stage and size.
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Callable, Dict, List
+
+import pandas as pd
+
+from benchmarks.synthetic_data import FileSensorData, SyntheticAPSData
+from sensor.components.data_ingestion import DataIngestion
+from sensor.components.data_transformation import DataTransformation
+from sensor.components.data_validation import DataValidation
+from sensor.components.model_trainer import ModelTrainer
+from sensor.constant.training_pipeline import TARGET_COLUMN
+from sensor.entity.config_entity import DataIngestionConfig, DataTransformationConfig, DataValidationConfig, ModelTrainerConfig, TrainingPipelineConfig
+from sensor.ml.schema.schema_validator import get_compiled_schema
+from sensor.utils.main_utils import load_object
+from sensor.utils.resource_utils import get_peak_rss, reset_peak_rss
+
+DEFAULT_ROWS: List[int] = [60_000]
+HISTORY_FILE_PATH: str = os.path.join("benchmarks", "history.json")
+
+
+def measure(stage: str, n_rows: int, func: Callable):
+    """
+    This function is used to run one stage and measure its wall time, peak RSS and throughput.
+
+    Args:
+        stage (str): name of the stage.
+        n_rows (int): number of rows processed by the stage.
+        func (Callable): stage to run.
+
+    Returns:
+        tuple: output of the stage and the measured result.
+    """
+    peak_is_reset = reset_peak_rss()
+    start = time.perf_counter()
+    output, status = None, "ok"
+    try:
+        output = func()
+    except Exception as e:
+        status = f"failed: {e}"
+    wall_time = time.perf_counter() - start
+    result = {
+        "stage": stage,
+        "rows": n_rows,
+        "wall_time_s": round(wall_time, 4),
+        "peak_rss_mb": round(get_peak_rss() / 2 ** 20, 1),
+        # without a reset the peak covers every stage which ran before.
+        "peak_rss_is_per_stage": peak_is_reset,
+        "rows_per_s": round(n_rows / wall_time, 1) if wall_time > 0 else None,
+        "status": status,
+    }
+    print(json.dumps(result))
+    return output, result
+
+
+def run_benchmark(n_rows: int, work_dir: str) -> List[Dict]:
+    """
+    This function is used to run every stage of the pipeline on n_rows synthetic rows.
+
+    Args:
+        n_rows (int): number of rows.
+        work_dir (str): directory of the synthetic data and of the artifacts.
+
+    Returns:
+        List[Dict]: measured result of every stage.
+    """
+    results = []
+    data_file_path, _ = measure("generate_data", n_rows, lambda: SyntheticAPSData().write_csv(os.path.join(work_dir, "sensor.csv"), n_rows))
+    training_pipeline_config = TrainingPipelineConfig()
+    training_pipeline_config.artifact_dir = os.path.join(work_dir, "artifact")
+
+    data_ingestion = DataIngestion(DataIngestionConfig(training_pipeline_config), sensor_data=FileSensorData(data_file_path))
+    data_ingestion_artifact, result = measure("data_ingestion", n_rows, data_ingestion.initiate_data_ingestion)
+    results.append(result)
+    if data_ingestion_artifact is None:
+        return results
+
+    data_validation = DataValidation(data_ingestion_artifact, DataValidationConfig(training_pipeline_config))
+    data_validation_artifact, result = measure("data_validation", n_rows, data_validation.initiate_data_validation)
+    results.append(result)
+    if data_validation_artifact is None:
+        return results
+
+    data_transformation = DataTransformation(data_validation_artifact, DataTransformationConfig(training_pipeline_config), data_ingestion_artifact)
+    data_transformation_artifact, result = measure("data_transformation", n_rows, data_transformation.initiate_data_transformation)
+    results.append(result)
+    if data_transformation_artifact is None:
+        return results
+
+    model_trainer = ModelTrainer(ModelTrainerConfig(training_pipeline_config), data_transformation_artifact)
+    model_trainer_artifact, result = measure("model_trainer", n_rows, model_trainer.initiate_model_trainer)
+    results.append(result)
+    if model_trainer_artifact is None:
+        return results
+
+    sensor_model = load_object(model_trainer_artifact.trained_model_file_path)
+    test_df = pd.read_csv(data_validation_artifact.valid_test_file_path, dtype=get_compiled_schema().read_dtypes).drop(columns=[TARGET_COLUMN])
+    _, result = measure("model_predict", len(test_df), lambda: sensor_model.predict(test_df))
+    results.append(result)
+    return results
+
+
+def compare_with_history(history: List[Dict], results: List[Dict]) -> None:
+    """
+    This function is used to print the change of the wall time against the previous run of the same stage and size.
+    """
+    previous = {}
+    for run in history:
+        for result in run["results"]:
+            if result["status"] == "ok":
+                previous[(result["stage"], result["rows"])] = result
+    for result in results:
+        baseline = previous.get((result["stage"], result["rows"]))
+        if baseline is None or result["status"] != "ok":
+            continue
+        ratio = result["wall_time_s"] / baseline["wall_time_s"] if baseline["wall_time_s"] else float("nan")
+        print(f"{result['stage']:<20} rows={result['rows']:<9} wall {baseline['wall_time_s']:.2f}s -> {result['wall_time_s']:.2f}s ({ratio:.2f}x)")
+
+
+def get_git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL).decode().strip()
+    except Exception:
+        return "unknown"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the sensor training pipeline on synthetic APS shaped data.")
+    parser.add_argument("--rows", type=int, nargs="+", default=DEFAULT_ROWS, help="dataset sizes to benchmark, e.g. 60000 600000 6000000")
+    parser.add_argument("--history", default=HISTORY_FILE_PATH, help="json file where the results are appended")
+    parser.add_argument("--work-dir", default=None, help="directory of the synthetic data and artifacts, a temporary one by default")
+    parser.add_argument("--keep", action="store_true", help="keep the synthetic data and artifacts")
+    args = parser.parse_args()
+
+    history = []
+    if os.path.exists(args.history):
+        with open(args.history, "r") as history_file:
+            history = json.load(history_file)
+
+    results = []
+    for n_rows in args.rows:
+        work_dir = tempfile.mkdtemp(prefix=f"sensor_benchmark_{n_rows}_", dir=args.work_dir)
+        try:
+            results.extend(run_benchmark(n_rows, work_dir))
+        finally:
+            if not args.keep:
+                shutil.rmtree(work_dir, ignore_errors=True)
+
+    compare_with_history(history, results)
+    history.append({
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "commit": get_git_commit(),
+        "python": platform.python_version(),
+        "cpu_count": os.cpu_count(),
+        "results": results,
+    })
+    os.makedirs(os.path.dirname(args.history) or ".", exist_ok=True)
+    with open(args.history, "w") as history_file:
+        json.dump(history, history_file, indent=2)
+    return 0 if all(result["status"] == "ok" for result in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,86 @@
+"""
+Throughput benchmark of a running prediction service.
+
+Start the service with the launcher and point the benchmark at it, once per worker count:
+
+    python -m sensor.serving.launcher --workers 4
+    python -m benchmarks.serving_benchmark --workers 4 --batch-rows 100 --concurrency 16
+
+The result (requests/sec, rows/sec and latency percentiles) is appended to the json history of the
+pipeline benchmark, so the scaling with the number of workers can be compared between runs.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import numpy as np
+
+from benchmarks.pipeline_benchmark import HISTORY_FILE_PATH, get_git_commit
+from benchmarks.synthetic_data import SyntheticAPSData
+
+DEFAULT_URL: str = "http://127.0.0.1:8080/predict"
+
+
+def send_requests(url: str, body: bytes, deadline: float) -> list:
+    """
+    This function is used to send requests one after another until the deadline and return their latencies.
+    """
+    latencies = []
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        request = urllib.request.Request(url, data=body, method="POST", headers={"Content-Type": "text/csv"})
+        with urllib.request.urlopen(request) as response:
+            response.read()
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the throughput of a running prediction service.")
+    parser.add_argument("--url", default=DEFAULT_URL)
+    parser.add_argument("--workers", type=int, required=True, help="number of workers of the service, recorded with the result")
+    parser.add_argument("--batch-rows", type=int, default=100, help="rows per request")
+    parser.add_argument("--concurrency", type=int, default=16, help="concurrent clients")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds to send requests for")
+    parser.add_argument("--history", default=HISTORY_FILE_PATH)
+    args = parser.parse_args()
+
+    synthetic_data = SyntheticAPSData()
+    body = synthetic_data.generate_chunk(args.batch_rows, np.random.default_rng(synthetic_data.seed)).to_csv(index=False, na_rep="na").encode("utf-8")
+    deadline = time.perf_counter() + args.duration
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        futures = [executor.submit(send_requests, args.url, body, deadline) for _ in range(args.concurrency)]
+        latencies = np.array([latency for future in futures for latency in future.result()])
+
+    result = {
+        "stage": "serving",
+        "rows": args.batch_rows,
+        "workers": args.workers,
+        "concurrency": args.concurrency,
+        "requests_per_s": round(len(latencies) / args.duration, 1),
+        "rows_per_s": round(len(latencies) * args.batch_rows / args.duration, 1),
+        "p50_latency_ms": round(float(np.percentile(latencies, 50)) * 1e3, 2) if len(latencies) else None,
+        "p99_latency_ms": round(float(np.percentile(latencies, 99)) * 1e3, 2) if len(latencies) else None,
+        "wall_time_s": args.duration,
+        "status": "ok" if len(latencies) else "failed: no request completed",
+    }
+    print(json.dumps(result))
+
+    history = []
+    if os.path.exists(args.history):
+        with open(args.history, "r") as history_file:
+            history = json.load(history_file)
+    history.append({"timestamp": datetime.now().isoformat(timespec="seconds"), "commit": get_git_commit(), "cpu_count": os.cpu_count(), "results": [result]})
+    os.makedirs(os.path.dirname(args.history) or ".", exist_ok=True)
+    with open(args.history, "w") as history_file:
+        json.dump(history, history_file, indent=2)
+    return 0 if len(latencies) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
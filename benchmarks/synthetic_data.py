@@ -0,0 +1,105 @@
+"""
+Synthetic data shaped like the APS failure dataset, generated from config/schema.yaml.
+"""
+import os
+from typing import Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from sensor.constant.training_pipeline import SCHEMA_FILE_PATH, TARGET_COLUMN
+from sensor.ml.schema.schema_validator import get_compiled_schema
+
+# one positive truck for every sixty negative trucks, like the APS dataset.
+POSITIVE_RATE: float = 1 / 61
+# number of columns whose values are shifted for the positive class.
+N_INFORMATIVE_COLUMNS: int = 12
+CHUNK_SIZE: int = 100_000
+
+
+class SyntheticAPSData:
+    """
+    This class is used to generate synthetic APS shaped records: the numerical and dropped columns
+    of the schema, a heavy missing value rate and the 1:60 class imbalance.
+    """
+    def __init__(self, schema_file_path: str = SCHEMA_FILE_PATH, seed: int = 42):
+        schema = get_compiled_schema(schema_file_path)
+        self.feature_columns: List[str] = schema.numerical_columns + schema.drop_columns
+        self.columns: List[str] = [TARGET_COLUMN] + self.feature_columns
+        self.seed = seed
+        rng = np.random.default_rng(seed)
+        n_numerical = len(schema.numerical_columns)
+        # most sensors miss a few percent of the values, some miss a lot and the dropped ones miss most of them.
+        null_rates = rng.choice([0.01, 0.05, 0.2, 0.5], size=n_numerical, p=[0.5, 0.3, 0.15, 0.05])
+        self.null_rates = np.concatenate([null_rates, rng.uniform(0.75, 0.82, size=len(schema.drop_columns))])
+        # sensor counters are non negative and heavy tailed.
+        self.log_means = rng.uniform(0, 10, size=len(self.feature_columns))
+        self.informative_columns = rng.choice(n_numerical, size=N_INFORMATIVE_COLUMNS, replace=False)
+
+    def generate_chunk(self, n_rows: int, rng: np.random.Generator) -> pd.DataFrame:
+        """
+        This method is used to generate one chunk of records, missing values are written as "na" like in mongodb.
+
+        Args:
+            n_rows (int): number of records.
+            rng (np.random.Generator): random generator.
+
+        Returns:
+            pd.DataFrame: records of the chunk.
+        """
+        is_positive = rng.random(n_rows) < POSITIVE_RATE
+        values = np.floor(np.exp(rng.normal(self.log_means, 1.0, size=(n_rows, len(self.feature_columns)))))
+        # failing trucks have much larger counters in the informative columns.
+        values[np.ix_(is_positive, self.informative_columns)] *= 20
+        values[rng.random(values.shape) < self.null_rates] = np.nan
+        dataframe = pd.DataFrame(values, columns=self.feature_columns)
+        dataframe.insert(0, TARGET_COLUMN, np.where(is_positive, "pos", "neg"))
+        return dataframe
+
+    def write_csv(self, file_path: str, n_rows: int, chunk_size: int = CHUNK_SIZE) -> str:
+        """
+        This method is used to write the records chunk by chunk into a csv file, so that millions of
+        rows never have to fit in memory at once.
+
+        Args:
+            file_path (str): path of the csv file.
+            n_rows (int): number of records.
+            chunk_size (int, optional): number of records per chunk. Defaults to CHUNK_SIZE.
+
+        Returns:
+            str: path of the csv file.
+        """
+        os.makedirs(os.path.dirname(file_path) or ".", exist_ok=True)
+        rng = np.random.default_rng(self.seed)
+        written = 0
+        while written < n_rows:
+            n_chunk = min(chunk_size, n_rows - written)
+            self.generate_chunk(n_chunk, rng).to_csv(file_path, mode="w" if written == 0 else "a", header=written == 0, index=False, na_rep="na", float_format="%.0f")
+            written += n_chunk
+        return file_path
+
+
+class FileSensorData:
+    """
+    File backed stand-in of SensorData which exports a csv file instead of a mongodb collection.
+    """
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+
+    def export_collection_as_dataframe(self, collection_name: str, database_name: Optional[str] = None, filter: Optional[dict] = None, exclude_columns: Optional[List[str]] = None, sample_fraction: Optional[float] = None) -> pd.DataFrame:
+        if filter:
+            raise ValueError("Filters are not supported by the csv data source.")
+        df = pd.read_csv(self.file_path, na_values=["na"], keep_default_na=False)
+        df = df.drop(columns=exclude_columns or [], errors="ignore")
+        if sample_fraction is not None and sample_fraction < 1:
+            df = df.sample(frac=sample_fraction)
+        return df
+
+    def export_collection_as_dataframe_chunks(self, collection_name: str, database_name: Optional[str] = None, chunk_size: int = 10000, filter: Optional[dict] = None, exclude_columns: Optional[List[str]] = None, sample_fraction: Optional[float] = None) -> Iterator[pd.DataFrame]:
+        if filter:
+            raise ValueError("Filters are not supported by the csv data source.")
+        for df in pd.read_csv(self.file_path, na_values=["na"], keep_default_na=False, chunksize=chunk_size):
+            df = df.drop(columns=exclude_columns or [], errors="ignore")
+            if sample_fraction is not None and sample_fraction < 1:
+                df = df.sample(frac=sample_fraction)
+            yield df
@@ -1,16 +1,9 @@
 import os
 from sensor.logger import logging
-from sensor.pipeline.training_pipeline import TrainPipeline
 from sensor.utils.main_utils import read_yaml_file
-from sensor.constant.training_pipeline import SAVED_MODEL_DIR
-from fastapi import FastAPI
 from sensor.constant.application import APP_HOST, APP_PORT
-from starlette.responses import RedirectResponse
+from sensor.serving.app import app
 from uvicorn import run as app_run
-from fastapi.responses import Response
-from sensor.ml.model.estimator import ModelResolver
-from sensor.utils.main_utils import load_object
-from fastapi.middleware.cors import CORSMiddleware
 
 
 env_file_path=os.path.join(os.getcwd(),"env.yaml")
@@ -27,53 +20,11 @@ def set_env_variable(env_file_path):
 
 
 
-app = FastAPI()
-origins = ["*"]
-
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=origins,
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-@app.get("/", tags=["authentication"])
-async def index():
-    return RedirectResponse(url="/docs")
-
-@app.get("/train")
-async def train_route():
-    try:
-        train_pipeline = TrainPipeline()
-        if train_pipeline.is_pipeline_running:
-            return Response("Training pipeline is already running.")
-        train_pipeline.run_pipeline()
-        return Response("Training successful !!")
-    except Exception as e:
-        return Response(f"Error Occurred! {e}")
-
-@app.get("/predict")
-async def predict_route():
-    # try:
-        #get data from user csv file
-        #convert csv file into dataframe
-        # df = None
-    model_resolver = ModelResolver(model_dir = SAVED_MODEL_DIR)
-    if not model_resolver.is_model_exists():
-        return Response("Model is not available")
-    best_model_path  = model_resolver.get_best_model_path()
-    model = load_object(file_path = best_model_path)
-        # y_pred = model.predict(df)
-        # df['predicted_column'] = y_pred
-        # df['predicted_column'].replace(TargetValueMapping().reverse_mapping(), inplace = True)
-        # decide how to return file to user.
-    # except Exception as e:
-    #     raise Response(f"Error Occured! {e}") from e
-
 def main():
     try:
         set_env_variable(env_file_path)
+        # the training pipeline is only imported when it is used, serving does not need it.
+        from sensor.pipeline.training_pipeline import TrainPipeline
         training_pipeline = TrainPipeline()
         training_pipeline.run_pipeline()
     except Exception as e:
@@ -85,5 +36,3 @@ if __name__=="__main__":
     # main()
     # set_env_variable(env_file_path)
     app_run(app, host=APP_HOST, port=APP_PORT)
-
-    
\ No newline at end of file
@@ -1,38 +1,79 @@
 
 import os,sys
+from typing import Dict, Iterable, Iterator
 from pandas import DataFrame
-from sklearn.model_selection import train_test_split
 
 from sensor.exception import SensorException
 from sensor.logger import logging
 from sensor.entity.config_entity import DataIngestionConfig
 from sensor.entity.artifact_entity import DataIngestionArtifact
 from sensor.data_access.sensor_data import SensorData
-from sensor.utils.main_utils import read_yaml_file
+from sensor.ml.schema.column_profile import ColumnProfile
+from sensor.ml.schema.schema_validator import get_compiled_schema
+from sensor.ml.split.stratified_hash_splitter import StratifiedHashSplitter
+from sensor.utils.main_utils import read_yaml_file, write_yaml_file
 from sensor.constant.training_pipeline import SCHEMA_FILE_PATH
 
 class DataIngestion:
     """
     This class consists of all the data ingestion functions.
     """
-    def __init__(self, data_ingestion_config:DataIngestionConfig):
+    def __init__(self, data_ingestion_config:DataIngestionConfig, sensor_data:SensorData = None):
         try:
             self.data_ingestion_config = data_ingestion_config
+            # source of the records, by default the mongodb collection is used.
+            self.sensor_data = sensor_data
             self._schema_config = read_yaml_file(SCHEMA_FILE_PATH)
+            self._schema = get_compiled_schema(SCHEMA_FILE_PATH)
+            # profile of the numerical columns of the train split, merged chunk by chunk.
+            self.column_profile: ColumnProfile = None
         except Exception as e:
             raise SensorException(e, sys)
 
-    def export_data_into_feature_store(self, )->DataFrame:
+    def get_collection_filter(self, ) -> dict:
         """
-        This method is used to Export mongodb collection record as dataframe into feature.
+        This method is used to build the mongodb query of the date window and truck subset of the config.
 
         Returns:
-            DataFrame: _description_
+            dict: query of the records to export, empty when every record is exported.
+        """
+        config = self.data_ingestion_config
+        collection_filter = {}
+        if config.start_date is not None or config.end_date is not None:
+            date_range = {}
+            if config.start_date is not None:
+                date_range["$gte"] = config.start_date
+            if config.end_date is not None:
+                date_range["$lt"] = config.end_date
+            collection_filter[config.date_field] = date_range
+        if config.truck_ids:
+            # the truck id field may be stored as a number or as a string, numeric ids match both.
+            truck_ids = list(config.truck_ids) + [str(truck_id) for truck_id in config.truck_ids if isinstance(truck_id, int)]
+            collection_filter[config.truck_id_field] = {"$in": truck_ids}
+        return collection_filter
+
+    def export_data_into_feature_store(self, )->Iterator[DataFrame]:
+        """
+        This method is used to Export mongodb collection record as dataframe chunks into feature store,
+        every chunk is appended to the feature store file as it is read.
+
+        Yields:
+            Iterator[DataFrame]: chunks of the collection.
         """
         try:
             logging.info("Exporting the data from mongodb to feature store")
-            sensor_data = SensorData()
-            dataframe = sensor_data.export_collection_as_dataframe(collection_name=self.data_ingestion_config.collection_name, )
+            sensor_data = self.sensor_data if self.sensor_data is not None else SensorData()
+            # filtering, sampling and dropping the unused columns is done by mongodb instead of pandas,
+            # the fields only used by the filters are not features so they are dropped as well.
+            schema_columns = {column for column_dtype in self._schema_config["columns"] for column in column_dtype}
+            filter_fields = [self.data_ingestion_config.date_field, self.data_ingestion_config.truck_id_field]
+            chunks = sensor_data.export_collection_as_dataframe_chunks(
+                collection_name=self.data_ingestion_config.collection_name,
+                chunk_size=self.data_ingestion_config.chunk_size,
+                filter=self.get_collection_filter(),
+                exclude_columns=self._schema_config["drop_columns"] + [field for field in filter_fields if field not in schema_columns],
+                sample_fraction=self.data_ingestion_config.sample_fraction,
+            )
             # Getting the feature store filepath.
             feature_store_file_path = self.data_ingestion_config.feature_store_file_path
 
@@ -41,45 +82,78 @@ class DataIngestion:
             # exist_ok means if folder is available no need to create if folder not available create it.
             os.makedirs(dir_path, exist_ok=True)
 
-            # Saving the data, if i not give index = False it will create one more extra col.
-            dataframe.to_csv(feature_store_file_path, index = False, header = True)
-            return dataframe
+            columns = None
+            for dataframe in chunks:
+                # Saving the data, if i not give index = False it will create one more extra col.
+                if columns is None:
+                    columns = dataframe.columns.to_list()
+                    dataframe.to_csv(feature_store_file_path, index = False, header = True)
+                else:
+                    dataframe = dataframe.reindex(columns=columns)
+                    dataframe.to_csv(feature_store_file_path, mode = "a", index = False, header = False)
+                yield dataframe
 
 
         except Exception as e:
             raise SensorException(e,sys)
 
-    def split_data_as_train_test(self, dataframe:DataFrame):
+    def split_data_as_train_test(self, dataframes:Iterable[DataFrame]) -> Dict[str, Dict[str, int]]:
         """
-        This method is used to feature store dataset split into train and test file.
+        This method is used to split the feature store chunks into train and test file. The split is
+        stratified by class and seeded, so every run puts the same rows in the test set.
 
         Args:
-            dataframe (DataFrame): dataframe
+            dataframes (Iterable[DataFrame]): chunks of the dataset.
+
+        Returns:
+            Dict[str, Dict[str, int]]: number of rows of every class in the train and test file.
         """
         logging.info("Entered split_data_as_train_test method of Data_Ingestion class")
 
         try:
-            # spliting the train and test data.
-            train_set, test_set = train_test_split(
-                dataframe, test_size=self.data_ingestion_config.train_test_split_ratio
-            )
-
-            logging.info("Performed train test split on the dataframe")
-
+            splitter = StratifiedHashSplitter(test_ratio=self.data_ingestion_config.train_test_split_ratio, seed=self.data_ingestion_config.split_seed)
+            # every chunk is appended to the train and test file without keeping the whole dataset,
+            # the train rows are profiled on the way.
+            class_counts = splitter.split_to_csv(dataframes, self.data_ingestion_config.training_file_path, self.data_ingestion_config.testing_file_path, train_chunk_callback=self.profile_columns)
             logging.info(
                 "Exited split_data_as_train_test method of Data_Ingestion class"
             )
-            # Returning the directory of training file path
-            dir_path = os.path.dirname(self.data_ingestion_config.training_file_path)
-            # creating the directory.
-            os.makedirs(dir_path, exist_ok=True)
+            return class_counts
+        except Exception as e:
+            raise SensorException(e, sys) from e
+
+    def profile_columns(self, dataframe:DataFrame) -> None:
+        """
+        This method is used to merge the profile of one chunk of train rows into the column profile.
+
+        Args:
+            dataframe (DataFrame): train rows of one chunk.
+        """
+        chunk_profile = ColumnProfile.from_dataframe(dataframe, self._schema.numerical_columns)
+        self.column_profile = chunk_profile if self.column_profile is None else self.column_profile.merge(chunk_profile)
 
-            logging.info(f"Exporting train and test file path.")
-            # conevrt the train and test set into csv and saving
-            train_set.to_csv(self.data_ingestion_config.training_file_path, index=False, header=True)
-            test_set.to_csv(self.data_ingestion_config.testing_file_path, index=False, header=True)
+    def write_column_profile(self, ) -> str:
+        """
+        This method is used to choose the columns used as features from the column profile and to
+        write the profile report.
 
-            logging.info(f"Exported train and test file path.")
+        Returns:
+            str: path of the column profile report.
+        """
+        try:
+            pruned_columns = self.column_profile.prune_columns(max_null_rate=self.data_ingestion_config.prune_max_null_rate, min_variance=self.data_ingestion_config.prune_min_variance)
+            selected_columns = [column for column in self.column_profile.columns if column not in pruned_columns]
+            if not selected_columns:
+                raise Exception("Every column was pruned by the column profile.")
+            logging.info(f"Pruned {len(pruned_columns)} columns: {pruned_columns}")
+            report = {
+                "n_rows": self.column_profile.n_rows,
+                "selected_columns": selected_columns,
+                "pruned_columns": pruned_columns,
+                "columns": self.column_profile.to_report(),
+            }
+            write_yaml_file(self.data_ingestion_config.column_profile_file_path, report, replace=True)
+            return self.data_ingestion_config.column_profile_file_path
         except Exception as e:
             raise SensorException(e, sys) from e
 
@@ -95,13 +169,15 @@ class DataIngestion:
         """
         try:
             # exporting the data into csv file from mongodb.
-            dataframe = self.export_data_into_feature_store()
-            # dropping the columns.
-            dataframe = dataframe.drop(self._schema_config["drop_columns"], axis=1)
+            dataframes = self.export_data_into_feature_store()
+            # dropping the columns which the data source did not already exclude.
+            dataframes = (dataframe.drop(columns=self._schema_config["drop_columns"], errors="ignore") for dataframe in dataframes)
             # splitting the data into train and test data.
-            self.split_data_as_train_test(dataframe=dataframe)
+            self.split_data_as_train_test(dataframes=dataframes)
+            # choosing the feature columns from the profile of the train split.
+            column_profile_file_path = self.write_column_profile()
             # calling the data ingestion artifact.
-            data_ingestion_artifact = DataIngestionArtifact(training_file_path=self.data_ingestion_config.training_file_path, testing_file_path=self.data_ingestion_config.testing_file_path)
+            data_ingestion_artifact = DataIngestionArtifact(training_file_path=self.data_ingestion_config.training_file_path, testing_file_path=self.data_ingestion_config.testing_file_path, column_profile_file_path=column_profile_file_path)
             return data_ingestion_artifact
         except Exception as e:
             raise SensorException(e, sys) from e
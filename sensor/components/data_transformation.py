@@ -4,36 +4,43 @@ import pandas as pd
 
 from imblearn.combine import SMOTETomek
 from sklearn.impute import SimpleImputer
+from sklearn.model_selection import train_test_split
 from sklearn.pipeline import Pipeline
 from sklearn.preprocessing import RobustScaler
 
-from sensor.constant.training_pipeline import TARGET_COLUMN
-from sensor.entity.artifact_entity import DataTransformationArtifact, DataValidationArtifact
+from sensor.constant.training_pipeline import SCHEMA_FILE_PATH, TARGET_COLUMN
+from sensor.entity.artifact_entity import DataIngestionArtifact, DataTransformationArtifact, DataValidationArtifact
 
 from sensor.entity.config_entity import DataTransformationConfig
 from sensor.exception import SensorException
 from sensor.logger import logging
+from sensor.ml.model.column_selector import ColumnSelector
 from sensor.ml.model.estimator import TargetValueMapping
-from sensor.utils.main_utils import save_numpy_array_data, save_object
+from sensor.ml.schema.schema_validator import get_compiled_schema
+from sensor.utils.main_utils import read_yaml_file, save_numpy_array_data, save_object
 
 class DataTransformation:
     """
     This class consists the functions of data transformation which is used to transform the data.
     """
-    def __init__(self, data_validation_artifact: DataValidationArtifact, data_transformation_config:DataTransformationConfig):
+    def __init__(self, data_validation_artifact: DataValidationArtifact, data_transformation_config:DataTransformationConfig, data_ingestion_artifact: DataIngestionArtifact = None):
         try:
             self.data_validation_artifact = data_validation_artifact
+            # the column profile of the ingestion decides which columns are used, every column is used without it.
+            self.data_ingestion_artifact = data_ingestion_artifact
             self.data_transformation_config = data_transformation_config
+            self._schema = get_compiled_schema(SCHEMA_FILE_PATH)
         except Exception as e:
             raise SensorException(e, sys) from e
 
     @staticmethod
-    def read_data(file_path):
+    def read_data(file_path, dtype=None):
         """
         This method is used to read the data through pandas.
 
         Args:
             file_path (str): path of the file.
+            dtype (dict, optional): dtype of the columns, inferred when None. Defaults to None.
 
         Raises:
             SensorException: raises the exception error.
@@ -43,16 +50,19 @@ class DataTransformation:
         """
         try:
             # reading the data through pandas.
-            return pd.read_csv(file_path)
+            return pd.read_csv(file_path, dtype=dtype)
 
         except Exception as e:
             raise SensorException(e, sys) from e
 
     @classmethod
-    def get_data_transformer_object(cls):
+    def get_data_transformer_object(cls, columns=None, selected_columns=None):
         """
         This method is used to get the data transformer object.
 
+        Args:
+            columns (List[str], optional): input columns, in the order of the input arrays. Defaults to None.
+            selected_columns (List[str], optional): columns kept by the first step, every column is kept when None. Defaults to None.
 
         Raises:
             SensorException: raises the exception error.
@@ -66,7 +76,11 @@ class DataTransformation:
             # Intiating the simple imputer.
             simple_imputer = SimpleImputer(strategy="constant", fill_value=0)
             # If there any missing values is there update with 0 "robust scaler": keeps every feature in same range and handles outliers.
-            preprocesser = Pipeline(steps=[("Imputer", simple_imputer), ("RobustScaler", robust_scaler)])
+            steps = [("Imputer", simple_imputer), ("RobustScaler", robust_scaler)]
+            if selected_columns is not None:
+                # the pruned columns are dropped before any other step, at training and at inference.
+                steps.insert(0, ("ColumnSelector", ColumnSelector(columns=columns, selected_columns=selected_columns)))
+            preprocesser = Pipeline(steps=steps)
             return preprocesser
 
         except Exception as e:
@@ -84,36 +98,53 @@ class DataTransformation:
         """
         try:
             # reading the valid train and test data.
-            train_df = DataTransformation.read_data(self.data_validation_artifact.valid_train_file_path)
-            test_df = DataTransformation.read_data(self.data_validation_artifact.valid_test_file_path)
-            preprocessor = self.get_data_transformer_object()
+            # the features are parsed straight into the dtype of the schema policy (float32).
+            train_df = DataTransformation.read_data(self.data_validation_artifact.valid_train_file_path, dtype=self._schema.read_dtypes)
+            test_df = DataTransformation.read_data(self.data_validation_artifact.valid_test_file_path, dtype=self._schema.read_dtypes)
+            selected_columns = None
+            if self.data_ingestion_artifact is not None:
+                selected_columns = read_yaml_file(self.data_ingestion_artifact.column_profile_file_path)["selected_columns"]
+                logging.info(f"Using {len(selected_columns)} of {len(self._schema.numerical_columns)} columns selected by the column profile")
+            preprocessor = self.get_data_transformer_object(columns=self._schema.numerical_columns, selected_columns=selected_columns)
             # Getting the input and target features from train data.
             target_feature_train_df = train_df[TARGET_COLUMN]
-            input_feature_train_df = train_df.drop(columns=[TARGET_COLUMN], axis = 1)
-            target_feature_train_df = target_feature_train_df.replace(TargetValueMapping().to_dict())
+            # input features are kept in schema order, the serving path coerces requests into the same order.
+            input_feature_train_df = train_df[self._schema.numerical_columns]
+            target_feature_train_df = TargetValueMapping().encode(target_feature_train_df, dtype=self._schema.target_dtype)
             # Getting the input and target features from test data.
             target_feature_test_df = test_df[TARGET_COLUMN]
-            input_feature_test_df = test_df.drop(columns=[TARGET_COLUMN], axis = 1)
-            target_feature_test_df = target_feature_test_df.replace(TargetValueMapping().to_dict())
+            input_feature_test_df = test_df[self._schema.numerical_columns]
+            target_feature_test_df = TargetValueMapping().encode(target_feature_test_df, dtype=self._schema.target_dtype)
             # fitting and transforming the train data.
             preprocessor_object = preprocessor.fit(input_feature_train_df)
             transformed_input_train_feature = preprocessor_object.transform(input_feature_train_df)
             # fitting and transforming the test data.
             preprocessor_object = preprocessor.fit(input_feature_test_df)
             transformed_input_test_feature = preprocessor_object.transform(input_feature_test_df)
+            # holding out train rows with the real class ratio to choose the decision threshold, before resampling
+            # so no synthetic row is made from them and the test rows are only used to measure the model.
+            target_feature_train_df = np.asarray(target_feature_train_df)
+            fit_index, validation_index = train_test_split(np.arange(len(target_feature_train_df)), test_size=self.data_transformation_config.validation_split_ratio, random_state=self.data_transformation_config.validation_split_seed, stratify=target_feature_train_df)
+            validation_arr = np.c_[transformed_input_train_feature[validation_index], target_feature_train_df[validation_index]].astype(self._schema.feature_dtype, copy=False)
+            transformed_input_train_feature, target_feature_train_df = transformed_input_train_feature[fit_index], target_feature_train_df[fit_index]
             # Performing the SMOTE to balance the data based on target labels.
             smt = SMOTETomek(sampling_strategy="minority")
             input_feature_train_final, target_feature_train_final = smt.fit_resample(transformed_input_train_feature, target_feature_train_df)
             input_feature_test_final, target_feature_test_final = smt.fit_resample(transformed_input_test_feature, target_feature_test_df)
-            # concatenating the train and test features.
-            train_arr = np.c_[input_feature_train_final, np.array(target_feature_train_final)]
-            test_arr = np.c_[input_feature_test_final, np.array(target_feature_test_final)]
+            # concatenating the train and test features, the target is stored in the feature dtype as the last column.
+            train_arr = np.c_[input_feature_train_final, np.array(target_feature_train_final)].astype(self._schema.feature_dtype, copy=False)
+            test_arr = np.c_[input_feature_test_final, np.array(target_feature_test_final)].astype(self._schema.feature_dtype, copy=False)
+            # train rows before resampling (without the held out rows), the cross validation resamples the training folds only so no synthetic
+            # row made from a validation row is trained on.
+            unresampled_train_arr = np.c_[transformed_input_train_feature, np.array(target_feature_train_df)].astype(self._schema.feature_dtype, copy=False)
             # saving the data in the format of numpy.
-            save_numpy_array_data(self.data_transformation_config.transformed_train_file_path, array = train_arr)
-            save_numpy_array_data(self.data_transformation_config.transformed_test_file_path, array = test_arr)
+            save_numpy_array_data(self.data_transformation_config.transformed_train_file_path, array = train_arr, compression = self.data_transformation_config.compression)
+            save_numpy_array_data(self.data_transformation_config.transformed_test_file_path, array = test_arr, compression = self.data_transformation_config.compression)
+            save_numpy_array_data(self.data_transformation_config.transformed_validation_file_path, array = validation_arr, compression = self.data_transformation_config.compression)
+            save_numpy_array_data(self.data_transformation_config.transformed_unresampled_train_file_path, array = unresampled_train_arr, compression = self.data_transformation_config.unresampled_train_compression)
             # saving the object.
-            save_object(self.data_transformation_config.transformed_object_file_path, preprocessor)
-            data_transformation_artifact = DataTransformationArtifact(transformed_object_file_path=self.data_transformation_config.transformed_object_file_path, transformed_train_file_path=self.data_transformation_config.transformed_train_file_path, transformed_test_file_path=self.data_transformation_config.transformed_test_file_path)
+            save_object(self.data_transformation_config.transformed_object_file_path, preprocessor, compression = self.data_transformation_config.compression)
+            data_transformation_artifact = DataTransformationArtifact(transformed_object_file_path=self.data_transformation_config.transformed_object_file_path, transformed_train_file_path=self.data_transformation_config.transformed_train_file_path, transformed_test_file_path=self.data_transformation_config.transformed_test_file_path, transformed_validation_file_path=self.data_transformation_config.transformed_validation_file_path, transformed_unresampled_train_file_path=self.data_transformation_config.transformed_unresampled_train_file_path)
             logging.info(f"Data transformation artifact:{data_transformation_artifact}")
             return data_transformation_artifact
 
@@ -1,12 +1,15 @@
 import os,sys
+from dataclasses import replace
+
 import pandas as pd
-from scipy.stats import ks_2samp
 
 from sensor.constant.training_pipeline import SCHEMA_FILE_PATH
 from sensor.entity.artifact_entity import DataIngestionArtifact, DataValidationArtifact
 from sensor.entity.config_entity import DataValidationConfig
 from sensor.exception import SensorException
 from sensor.logger import logging
+from sensor.ml.metric.ks_drift import KSDriftDetector
+from sensor.ml.schema.schema_validator import NULL_TOKENS, get_compiled_schema
 from sensor.utils.main_utils import read_yaml_file, write_yaml_file
 
 class DataValidation:
@@ -17,7 +20,9 @@ class DataValidation:
         try:
             self.data_ingestion_artifact = data_ingestion_artifact
             self.data_validation_config = data_validation_config
-            self._schema_config = read_yaml_file(SCHEMA_FILE_PATH)
+            # compiled schema is loaded only once per process and shared by every instance.
+            self._schema = get_compiled_schema(SCHEMA_FILE_PATH)
+            self._schema_config = self._schema.schema_config
         except Exception as e:
             raise SensorException(e, sys)
 
@@ -36,7 +41,7 @@ class DataValidation:
         """
         try:
             # number of columns.
-            number_of_columns = len(self._schema_config["columns"])
+            number_of_columns = self._schema.n_columns
             logging.info(f"Required number of columns:{number_of_columns}")
             logging.info(f"Data frame has columns:{len(dataframe.columns)}")
             # If length of data frame columns is equal to number of columns return True otherwise, False.
@@ -60,31 +65,50 @@ class DataValidation:
             bool: True or False.
         """
         try:
-            # numerical columns.
-            numerical_columns = self._schema_config["numerical_columns"]
-            # taking the dataframe columns.
-            dataframe_columns = dataframe.columns
-            numerical_col_present = True
-            missing_numerical_columns = list()
-            # Iterating the each numerical column.
-            for numerical_col in numerical_columns:
-                # If numerical col not in data frame then give false and appending the numerical col.
-                if numerical_col not in dataframe_columns:
-                    numerical_col_present = False
-                    missing_numerical_columns.append(numerical_col)
+            # numerical columns of the schema which are not in the dataframe columns.
+            missing_numerical_columns = self._schema.numerical_index.difference(dataframe.columns).to_list()
             logging.info(f"Missing numerical columns:[{missing_numerical_columns}]")
-            return numerical_col_present
+            return len(missing_numerical_columns) == 0
+
+        except Exception as e:
+            raise SensorException(e, sys)
+
+    def validate_rows(self, dataframe:pd.DataFrame, invalid_file_path:str):
+        """
+        This method is used to validate the dtypes, value ranges and null budget of the dataframe
+        in one pass and write the failing rows into the invalid file.
+
+        Args:
+            dataframe (pd.DataFrame): dataframe
+            invalid_file_path (str): path of the file where the invalid rows are written.
 
+        Raises:
+            SensorException: raises the exception error.
+
+        Returns:
+            tuple: valid dataframe, invalid file path (None when every row is valid) and columns over the null budget.
+        """
+        try:
+            result = self._schema.validate(dataframe)
+            columns_over_null_budget = result.columns_over_null_budget(self._schema.null_budget)
+            logging.info(f"Invalid rows:{result.n_invalid_rows} of {result.n_rows}, columns over null budget:{columns_over_null_budget}")
+            if result.n_invalid_rows == 0:
+                return dataframe, None, columns_over_null_budget
+            # writing the failing rows into the invalid file.
+            os.makedirs(os.path.dirname(invalid_file_path), exist_ok=True)
+            dataframe[result.invalid_row_mask].to_csv(invalid_file_path, index=False, header=True)
+            return dataframe[~result.invalid_row_mask], invalid_file_path, columns_over_null_budget
         except Exception as e:
             raise SensorException(e, sys)
 
     @staticmethod
-    def read_data(file_path)->pd.DataFrame:
+    def read_data(file_path, dtype=None)->pd.DataFrame:
         """
         This method is used to read the data through pandas.
 
         Args:
             file_path (str): path of the file.
+            dtype (dict, optional): dtype of the columns, inferred when None. Defaults to None.
 
         Raises:
             SensorException: raises the exception error.
@@ -94,7 +118,15 @@ class DataValidation:
         """
         try:
             # reading the data through pandas.
-            return pd.read_csv(file_path)
+            try:
+                return pd.read_csv(file_path, dtype=dtype, na_values=NULL_TOKENS)
+            except ValueError as e:
+                if dtype is None:
+                    raise
+                # a value which is not a number can not be parsed into the dtype, the file is read with inferred
+                # dtypes so the schema validation moves the failing rows to the invalid file.
+                logging.info(f"{file_path} has values which are not numbers ({e}), reading it with inferred dtypes")
+                return pd.read_csv(file_path, na_values=NULL_TOKENS)
 
         except Exception as e:
             raise SensorException(e, sys)
@@ -106,7 +138,7 @@ class DataValidation:
         Args:
             base_df (dataframe): base dataframe
             current_df (dataframe): current dataframe
-            threshold (float, optional): _description_. Defaults to 0.5.
+            threshold (float, optional): a column drifted when the p value of its test is below it. Defaults to 0.5.
 
         Raises:
             SensorException: raises the exception error.
@@ -115,22 +147,18 @@ class DataValidation:
             bool: True or False
         """
         try:
-            status = True
-            report = {}
-            # Iterating the columns from base dataframe.
-            for column in base_df.columns:
-                d1 = base_df[column]
-                d2 = current_df[column]
-                # Performs the two-sample Kolmogorov-Smirnov test for goodness of fit.
-                is_same_dist = ks_2samp(d1, d2)
-                # If the threshold is less than or equal to is_same_dist_p-value returning the False otherwise false.
-                if threshold <= is_same_dist.pvalue:
-                    is_found = False
-                else:
-                    is_found = True
-                    status = False
-                # appending the each col p_value and drift_status into dictionary.
-                report.update({column:{"p_value":float(is_same_dist.pvalue), "drift_status":is_found}})
+            # only the numerical columns are tested, the missing values of a column are left out of its test.
+            columns = [column for column in self._schema.numerical_columns if column in base_df.columns and column in current_df.columns]
+            drift_detector = KSDriftDetector(
+                p_value_threshold=threshold,
+                max_workers=self.data_validation_config.drift_max_workers,
+                block_size=self.data_validation_config.drift_block_size,
+                sample_size=self.data_validation_config.drift_sample_size or None,
+                seed=self.data_validation_config.drift_seed,
+                max_drifted_columns=self.data_validation_config.drift_max_drifted_columns,
+                early_stop=self.data_validation_config.drift_early_stop,
+            )
+            status, report = drift_detector.detect(base_df=base_df, current_df=current_df, columns=columns)
             drift_report_file_path =self.data_validation_config.drift_report_file_path
             # create directory.
             dir_path = os.path.dirname(drift_report_file_path)
@@ -141,10 +169,14 @@ class DataValidation:
         except Exception as e:
             raise SensorException(e, sys)
 
-    def initiate_data_validation(self, )->DataValidationArtifact:
+    def initiate_data_validation(self, detect_drift:bool = True)->DataValidationArtifact:
         """
         This method is used to initiate the data validation.
 
+        Args:
+            detect_drift (bool, optional): also run the drift detection, when False it is left to
+                initiate_drift_detection so that it can run alongside the next stages. Defaults to True.
+
         Raises:
             Exception: displaying the message
             SensorException: raises exception
@@ -157,8 +189,8 @@ class DataValidation:
             train_file_path = self.data_ingestion_artifact.training_file_path
             test_file_path = self.data_ingestion_artifact.testing_file_path
             # Reading data from train and test file location.
-            train_data_frame = DataValidation.read_data(train_file_path)
-            test_data_frame = DataValidation.read_data(test_file_path)
+            train_data_frame = DataValidation.read_data(train_file_path, dtype=self._schema.read_dtypes)
+            test_data_frame = DataValidation.read_data(test_file_path, dtype=self._schema.read_dtypes)
 
             # validate number of columns for train and test.
             status = self.validate_number_of_columns(dataframe=train_data_frame)
@@ -179,11 +211,40 @@ class DataValidation:
             if len(error_message)>0:
                 raise Exception(error_message)
 
+            # validate dtypes, value ranges and null budget, failing rows are moved to the invalid files.
+            # columns pruned by the column profile of the ingestion are not used, so their null budget does not matter.
+            pruned_columns = read_yaml_file(self.data_ingestion_artifact.column_profile_file_path)["pruned_columns"]
+            train_data_frame, invalid_train_file_path, train_null_columns = self.validate_rows(dataframe=train_data_frame, invalid_file_path=self.data_validation_config.invalid_train_file_path)
+            train_null_columns = [column for column in train_null_columns if column not in pruned_columns]
+            if train_null_columns:
+                error_message = f"{error_message}Train dataframe columns exceed the null budget: {train_null_columns}.\n"
+            test_data_frame, invalid_test_file_path, test_null_columns = self.validate_rows(dataframe=test_data_frame, invalid_file_path=self.data_validation_config.invalid_test_file_path)
+            test_null_columns = [column for column in test_null_columns if column not in pruned_columns]
+            if test_null_columns:
+                error_message = f"{error_message}Test dataframe columns exceed the null budget: {test_null_columns}.\n"
+            if len(error_message)>0:
+                raise Exception(error_message)
+
+            # the ingested files are valid as they are unless some rows were moved to the invalid files.
+            valid_train_file_path = train_file_path
+            if invalid_train_file_path is not None:
+                valid_train_file_path = self.data_validation_config.valid_train_file_path
+                os.makedirs(os.path.dirname(valid_train_file_path), exist_ok=True)
+                train_data_frame.to_csv(valid_train_file_path, index=False, header=True)
+            valid_test_file_path = test_file_path
+            if invalid_test_file_path is not None:
+                valid_test_file_path = self.data_validation_config.valid_test_file_path
+                os.makedirs(os.path.dirname(valid_test_file_path), exist_ok=True)
+                test_data_frame.to_csv(valid_test_file_path, index=False, header=True)
+
             # checking the datadrift(which means only to check the distribution of two datasets whether they belongs to same or not).
-            status = self.detect_dataset_drift(base_df=train_data_frame, current_df=test_data_frame)
+            status, drift_report_file_path = True, None
+            if detect_drift:
+                status = self.detect_dataset_drift(base_df=train_data_frame, current_df=test_data_frame)
+                drift_report_file_path = self.data_validation_config.drift_report_file_path
 
             # Creating the data validation artifacts.
-            data_validation_artifact = DataValidationArtifact(validation_status=status, valid_train_file_path=self.data_ingestion_artifact.training_file_path, valid_test_file_path = self.data_ingestion_artifact.testing_file_path, invalid_train_file_path=self.data_validation_config.invalid_train_file_path, invalid_test_file_path=self.data_validation_config.invalid_test_file_path, drift_report_file_path=self.data_validation_config.drift_report_file_path)
+            data_validation_artifact = DataValidationArtifact(validation_status=status, valid_train_file_path=valid_train_file_path, valid_test_file_path = valid_test_file_path, invalid_train_file_path=invalid_train_file_path, invalid_test_file_path=invalid_test_file_path, drift_report_file_path=drift_report_file_path)
             # data_validation_artifact = DataValidationArtifact(validation_status=status, valid_train_file_path=self.data_ingestion_artifact.training_file_path, valid_test_file_path = self.data_ingestion_artifact.testing_file_path, invalid_train_file_path=None, invalid_test_file_path=None, drift_report_file_path=self.data_validation_config.drift_report_file_path)
             logging.info(f"Data validation artifact: {data_validation_artifact}")
 
@@ -191,3 +252,26 @@ class DataValidation:
 
         except Exception as e:
             raise SensorException(e, sys)
+
+    def initiate_drift_detection(self, data_validation_artifact:DataValidationArtifact)->DataValidationArtifact:
+        """
+        This method is used to detect the drift between the valid train and test files of a schema validation.
+
+        Args:
+            data_validation_artifact (DataValidationArtifact): artifact of initiate_data_validation(detect_drift=False).
+
+        Raises:
+            SensorException: raises exception
+
+        Returns:
+            DataValidationArtifact: the artifact with the drift status and report.
+        """
+        try:
+            train_data_frame = DataValidation.read_data(data_validation_artifact.valid_train_file_path, dtype=self._schema.read_dtypes)
+            test_data_frame = DataValidation.read_data(data_validation_artifact.valid_test_file_path, dtype=self._schema.read_dtypes)
+            status = self.detect_dataset_drift(base_df=train_data_frame, current_df=test_data_frame)
+            drift_artifact = replace(data_validation_artifact, validation_status=status, drift_report_file_path=self.data_validation_config.drift_report_file_path)
+            logging.info(f"Drift detection artifact: {drift_artifact}")
+            return drift_artifact
+        except Exception as e:
+            raise SensorException(e, sys)
@@ -1,13 +1,14 @@
 import sys,os
 import pandas as pd
 
-from sensor.constant.training_pipeline import TARGET_COLUMN
+from sensor.constant.training_pipeline import SCHEMA_FILE_PATH, TARGET_COLUMN
 from sensor.entity.artifact_entity import DataValidationArtifact,ModelTrainerArtifact, ModelEvaluationArtifact
 from sensor.entity.config_entity import ModelEvaluationConfig
 from sensor.exception import SensorException
 from sensor.logger import logging
 from sensor.ml.metric.classification_metric import get_classification_score
 from sensor.ml.model.estimator import TargetValueMapping
+from sensor.ml.schema.schema_validator import get_compiled_schema
 from sensor.utils.main_utils import  load_object, write_yaml_file
 from sensor.ml.model.estimator import ModelResolver
 from sensor.constant.training_pipeline import TARGET_COLUMN
@@ -21,6 +22,7 @@ class ModelEvaluation:
             self.model_evaluation_config = model_evaluation_config
             self.data_validation_artifact = data_validation_artifcat
             self.model_trainer_artifact = model_trainer_artifact
+            self._schema = get_compiled_schema(SCHEMA_FILE_PATH)
         except Exception as e:
             raise SensorException(e, sys) from e
 
@@ -38,11 +40,10 @@ class ModelEvaluation:
             valid_train_file = self.data_validation_artifact.valid_train_file_path
             valid_test_file = self.data_validation_artifact.valid_test_file_path
             # Getting valid train and test file dataframe
-            train_df = pd.read_csv(valid_train_file)
-            test_df = pd.read_csv(valid_test_file)
+            train_df = pd.read_csv(valid_train_file, dtype=self._schema.read_dtypes)
+            test_df = pd.read_csv(valid_test_file, dtype=self._schema.read_dtypes)
             df = pd.concat([train_df, test_df])
-            y_true = df[TARGET_COLUMN]
-            y_true.replace(TargetValueMapping().to_dict(), inplace=True)
+            y_true = TargetValueMapping().encode(df[TARGET_COLUMN], dtype=self._schema.target_dtype)
             df.drop(TARGET_COLUMN, axis=1, inplace=True)
             train_model_file_path = self.model_trainer_artifact.trained_model_file_path
 
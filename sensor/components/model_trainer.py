@@ -1,15 +1,24 @@
 
 import os,sys
+import warnings
+import numpy as np
+import pandas as pd
+import xgboost
+from sklearn.model_selection import train_test_split
 from xgboost import XGBClassifier
 
 from sensor.utils.main_utils import load_numpy_array_data
 from sensor.exception import SensorException
 from sensor.logger import logging
-from sensor.entity.artifact_entity import DataTransformationArtifact, ModelTrainerArtifact
+from sensor.constant.training_pipeline import SCHEMA_FILE_PATH, TARGET_COLUMN
+from sensor.entity.artifact_entity import DataTransformationArtifact, DataValidationArtifact, ModelTrainerArtifact
 from sensor.entity.config_entity import ModelTrainerConfig
 from sensor.ml.metric.classification_metric import get_classification_score
-from sensor.ml.model.estimator import SensorModel
-from sensor.utils.main_utils import save_object, load_object
+from sensor.ml.metric.decision_threshold import get_cost_optimal_threshold
+from sensor.ml.model.cross_validation import CrossValidator
+from sensor.ml.model.estimator import ModelResolver, SensorModel, TargetValueMapping
+from sensor.ml.schema.schema_validator import get_compiled_schema
+from sensor.utils.main_utils import load_object, read_yaml_file, save_object
 
 
 
@@ -17,10 +26,13 @@ class ModelTrainer:
     """
     This class is used to train the model.
     """
-    def __init__(self, model_trainer_config:ModelTrainerConfig, data_transformation_artifact:DataTransformationArtifact, ):
+    def __init__(self, model_trainer_config:ModelTrainerConfig, data_transformation_artifact:DataTransformationArtifact, data_validation_artifact:DataValidationArtifact = None):
         try:
             self.model_trainer_config = model_trainer_config
             self.data_transformation_artifact = data_transformation_artifact
+            # artifact of the drift detection, needed by the warm start only.
+            self.data_validation_artifact = data_validation_artifact
+            self._schema = get_compiled_schema(SCHEMA_FILE_PATH)
         except Exception as e:
             raise SensorException(e, sys) from e
 
@@ -48,6 +60,152 @@ class ModelTrainer:
         except Exception as e:
             raise SensorException(e, sys) from e
 
+    def cross_validate(self):
+        """
+        This method is used to cross validate the model on the transformed training data.
+
+        Raises:
+            SensorException: raises the exception.
+
+        Returns:
+            CrossValidationMetricArtifact: mean and standard deviation of the fold metrics.
+        """
+        try:
+            cross_validator = CrossValidator(
+                n_folds=self.model_trainer_config.cross_validation_folds,
+                false_positive_cost=self.model_trainer_config.false_positive_cost,
+                false_negative_cost=self.model_trainer_config.false_negative_cost,
+                seed=self.model_trainer_config.cross_validation_seed,
+                max_workers=self.model_trainer_config.cross_validation_max_workers or None,
+            )
+            cross_validation_metric = cross_validator.cross_validate(
+                train_file_path=self.data_transformation_artifact.transformed_unresampled_train_file_path,
+                folds_file_path=self.model_trainer_config.cross_validation_folds_file_path,
+                target_dtype=self._schema.target_dtype,
+            )
+            logging.info(f"Cross validation metric:{cross_validation_metric}")
+            return cross_validation_metric
+        except Exception as e:
+            raise SensorException(e, sys) from e
+
+    def get_drift_ratio(self):
+        """
+        This method is used to get the ratio of drifted columns from the drift report.
+
+        Returns:
+            float: ratio of drifted columns, None when the drift was not detected.
+        """
+        try:
+            if self.data_validation_artifact is None or self.data_validation_artifact.drift_report_file_path is None:
+                return None
+            drift_report = read_yaml_file(self.data_validation_artifact.drift_report_file_path) or {}
+            if not drift_report:
+                return None
+            return sum(bool(column_report["drift_status"]) for column_report in drift_report.values()) / len(drift_report)
+        except Exception as e:
+            raise SensorException(e, sys) from e
+
+    def get_warm_start_model(self):
+        """
+        This method is used to get the best saved model to warm start from. The model is trained from
+        scratch when the warm start is disabled, no model is saved yet or too many columns drifted.
+
+        Raises:
+            SensorException: raises the exception.
+
+        Returns:
+            SensorModel: best saved model, None for a full training.
+        """
+        try:
+            if not self.model_trainer_config.warm_start:
+                return None
+            model_resolver = ModelResolver()
+            if not model_resolver.is_model_exists():
+                logging.info("No saved model to warm start from, training from scratch")
+                return None
+            drift_ratio = self.get_drift_ratio()
+            if drift_ratio is None:
+                logging.info("No drift report to check the drifted columns against, training from scratch")
+                return None
+            if drift_ratio > self.model_trainer_config.warm_start_max_drift_ratio:
+                logging.info(f"Drifted column ratio {drift_ratio} exceeds {self.model_trainer_config.warm_start_max_drift_ratio}, training from scratch")
+                return None
+            best_model_path = model_resolver.get_best_model_path()
+            logging.info(f"Warm starting ({self.model_trainer_config.warm_start}) from {best_model_path}, drifted column ratio {drift_ratio}")
+            return load_object(file_path=best_model_path)
+        except Exception as e:
+            raise SensorException(e, sys) from e
+
+    def get_warm_start_data(self, preprocessor):
+        """
+        This method is used to transform the valid train and test rows with the preprocessor of the
+        best saved model, its trees split on the features of that preprocessor. The rows are not
+        resampled and keep the real class ratio. Part of the train rows is held out to choose the
+        decision threshold, so the test rows are only used to measure the model.
+
+        Args:
+            preprocessor (object): preprocessor of the best saved model.
+
+        Raises:
+            SensorException: raises the exception.
+
+        Returns:
+            tuple: x_train, y_train, x_validation, y_validation, x_test, y_test.
+        """
+        try:
+            data = []
+            for file_path in (self.data_validation_artifact.valid_train_file_path, self.data_validation_artifact.valid_test_file_path):
+                dataframe = pd.read_csv(file_path, dtype=self._schema.read_dtypes)
+                x = preprocessor.transform(dataframe[self._schema.numerical_columns]).astype(self._schema.feature_dtype, copy=False)
+                y = np.asarray(TargetValueMapping().encode(dataframe[TARGET_COLUMN], dtype=self._schema.target_dtype))
+                data.extend([x, y])
+            x_train, y_train, x_test, y_test = data
+            x_train, x_validation, y_train, y_validation = train_test_split(x_train, y_train, test_size=self.model_trainer_config.warm_start_validation_split_ratio, random_state=self.model_trainer_config.warm_start_validation_split_seed, stratify=y_train)
+            return x_train, y_train, x_validation, y_validation, x_test, y_test
+        except Exception as e:
+            raise SensorException(e, sys) from e
+
+    def warm_start_model(self, classifier, x_train, y_train):
+        """
+        This method is used to update the classifier of the best saved model with new data: "continue"
+        adds a bounded number of boosting rounds, "refresh" keeps the trees and refits their leaf values.
+
+        Args:
+            classifier (XGBClassifier): classifier of the best saved model, it is not modified.
+            x_train (data): features transformed by the preprocessor of the best saved model.
+            y_train (data): labels.
+
+        Raises:
+            SensorException: raises the exception.
+
+        Returns:
+            XGBClassifier: updated classifier.
+        """
+        try:
+            booster = classifier.get_booster()
+            # the new rows are not resampled like the ones the model was trained on, the failures are weighted instead.
+            n_positives = max(int(np.sum(y_train == 1)), 1)
+            weight = np.where(y_train == 1, (len(y_train) - n_positives) / n_positives, 1.0)
+            dtrain = xgboost.DMatrix(x_train, label=y_train, weight=weight)
+            params = {key: value for key, value in classifier.get_xgb_params().items() if value is not None}
+            if self.model_trainer_config.warm_start == "refresh":
+                # the updater sequence is given explicitly, so tree_method is dropped instead of being ignored.
+                params.pop("tree_method", None)
+                params.update(process_type="update", updater="refresh", refresh_leaf=True)
+                n_rounds = booster.num_boosted_rounds()
+            else:
+                n_rounds = self.model_trainer_config.warm_start_rounds
+            # training from an existing booster returns a new booster, the saved model is left unchanged.
+            with warnings.catch_warnings():
+                # xgboost warns about any explicit updater, even without a tree_method; refresh needs one.
+                warnings.filterwarnings("ignore", message=".*manually specified the `updater` parameter", category=UserWarning)
+                updated_booster = xgboost.train(params, dtrain, num_boost_round=n_rounds, xgb_model=booster)
+            xgb_clf = XGBClassifier()
+            xgb_clf.load_model(bytearray(updated_booster.save_raw()))
+            return xgb_clf
+        except Exception as e:
+            raise SensorException(e, sys) from e
+
     def initiate_model_trainer(self, ):
         """
         This method is used to initiate the model training.
@@ -61,39 +219,65 @@ class ModelTrainer:
             _type_: _description_
         """
         try:
-            # Getting the transformed train and test file path from data_transformation_artifact.
-            train_file_path = self.data_transformation_artifact.transformed_train_file_path
-            test_file_path = self.data_transformation_artifact.transformed_test_file_path
-            # Loading the training numpy array testing numpy array
-            train_arr = load_numpy_array_data(train_file_path)
-            test_arr = load_numpy_array_data(test_file_path)
-            # differentiating the x_train,y_train,x_test,y_test features.
-            x_train,y_train,x_test,y_test = (train_arr[:, :-1], train_arr[:, -1], test_arr[:,:-1], test_arr[:, -1])
-
-            # training the model.
-            model = self.train_model(x_train=x_train, y_train=y_train)
+            champion_model = self.get_warm_start_model()
+            # with cross validation the acceptance checks use the mean of the folds instead of a single split,
+            # they run first so a rejected model is not trained on the whole data.
+            cross_validation_metric = None
+            if champion_model is None and self.model_trainer_config.cross_validation_folds >= 2:
+                cross_validation_metric = self.cross_validate()
+                if cross_validation_metric.f1_score_mean < self.model_trainer_config.expected_accuracy:
+                    raise Exception("Trained Model is not good to provide expected accuracy.")
+                if abs(cross_validation_metric.train_f1_score_mean - cross_validation_metric.f1_score_mean) > self.model_trainer_config.overfitting_underfitting_threshold:
+                    raise Exception("Model is not good try to do more experimentation.")
+            if champion_model is None:
+                # Getting the transformed train and test file path from data_transformation_artifact.
+                train_file_path = self.data_transformation_artifact.transformed_train_file_path
+                test_file_path = self.data_transformation_artifact.transformed_test_file_path
+                # Loading the training numpy array testing numpy array
+                train_arr = load_numpy_array_data(train_file_path)
+                test_arr = load_numpy_array_data(test_file_path)
+                # differentiating the x_train,y_train,x_test,y_test features.
+                x_train,y_train,x_test,y_test = (train_arr[:, :-1], train_arr[:, -1], test_arr[:,:-1], test_arr[:, -1])
+                # the target is stored as the last column of the feature array, it is converted back to the target dtype.
+                y_train, y_test = y_train.astype(self._schema.target_dtype), y_test.astype(self._schema.target_dtype)
+                # train rows held out before resampling, with the real class ratio, to choose the decision threshold.
+                validation_arr = load_numpy_array_data(self.data_transformation_artifact.transformed_validation_file_path)
+                x_validation, y_validation = validation_arr[:, :-1], validation_arr[:, -1].astype(self._schema.target_dtype)
+                # loading the obj.
+                preprocessor = load_object(file_path=self.data_transformation_artifact.transformed_object_file_path)
+
+                # training the model.
+                model = self.train_model(x_train=x_train, y_train=y_train)
+            else:
+                # the warm started model keeps the preprocessor of the best saved model.
+                preprocessor = champion_model.preprocessor
+                x_train, y_train, x_validation, y_validation, x_test, y_test = self.get_warm_start_data(preprocessor)
+                model = self.warm_start_model(champion_model.model, x_train=x_train, y_train=y_train)
             # predicting the x_train and x_test from trained model.
             y_train_pred = model.predict(x_train)
             y_test_pred = model.predict(x_test)
             # claculating the classification score between actual and predicted labels.
             classification_train_metric = get_classification_score(y_true=y_train, y_pred=y_train_pred)
-            if classification_train_metric.f1_score < self.model_trainer_config.expected_accuracy:
+            if cross_validation_metric is None and classification_train_metric.f1_score < self.model_trainer_config.expected_accuracy:
                 raise Exception("Trained Model is not good to provide expected accuracy.")
             classification_test_metric = get_classification_score(y_true=y_test, y_pred=y_test_pred)
 
             # checking overfitting and underfitting if we will be these two cases rejecting the model.
             diff = abs(classification_train_metric.f1_score - classification_test_metric.f1_score)
-            if diff > self.model_trainer_config.overfitting_underfitting_threshold:
+            if cross_validation_metric is None and diff > self.model_trainer_config.overfitting_underfitting_threshold:
                 raise Exception("Model is not good try to do more experimentation.")
-            # loading the obj.
-            preprocessor = load_object(file_path=self.data_transformation_artifact.transformed_object_file_path)
+            # choosing the threshold with the lowest misclassification cost on held out rows with the real class ratio,
+            # the test rows are not used so the test metrics and the model evaluation are not optimistic.
+            y_validation_score = model.predict_proba(x_validation)[:, 1]
+            decision_threshold, validation_cost = get_cost_optimal_threshold(y_true=y_validation, y_score=y_validation_score, false_positive_cost=self.model_trainer_config.false_positive_cost, false_negative_cost=self.model_trainer_config.false_negative_cost)
+            logging.info(f"Decision threshold {decision_threshold} with validation cost {validation_cost}")
             model_dir_path = os.path.dirname(self.model_trainer_config.trained_model_file_path)
             os.makedirs(model_dir_path, exist_ok=True)
-            sensor_model = SensorModel(preprocessor=preprocessor, model=model)
-            save_object(self.model_trainer_config.trained_model_file_path, obj = sensor_model)
+            sensor_model = SensorModel(preprocessor=preprocessor, model=model, decision_threshold=decision_threshold)
+            save_object(self.model_trainer_config.trained_model_file_path, obj = sensor_model, compression = self.model_trainer_config.compression)
 
             # Model Trainer Artifact.
-            model_trainer_artifact = ModelTrainerArtifact(trained_model_file_path=self.model_trainer_config.trained_model_file_path, train_metric_artifact=classification_train_metric, test_metric_artifact=classification_test_metric)
+            model_trainer_artifact = ModelTrainerArtifact(trained_model_file_path=self.model_trainer_config.trained_model_file_path, train_metric_artifact=classification_train_metric, test_metric_artifact=classification_test_metric, decision_threshold=decision_threshold, validation_cost=validation_cost, cross_validation_metric_artifact=cross_validation_metric, training_mode=self.model_trainer_config.warm_start if champion_model is not None else "full")
 
             logging.info(f"Model trainer artifact:{model_trainer_artifact}")
 
@@ -0,0 +1,122 @@
+import asyncio
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Callable, List, Optional
+
+from sensor.configuration.mongo_db_connection import MongoDBClient
+from sensor.constant.database import DATABASE_NAME, MONGO_DB_ASYNC_WORKERS
+from sensor.constant.env_variables import MONGO_DB_ASYNC_WORKERS_KEY
+from sensor.exception import SensorException
+from sensor.logger import logging
+
+
+class AsyncMongoDBClient:
+    """
+    This class is used to call mongodb from async code (like the FastAPI handlers) without blocking
+    the event loop. The blocking pymongo calls run on a dedicated thread pool and share the
+    connection pool of MongoDBClient, so sync and async callers use the same connections.
+    """
+    executor = None
+
+    def __init__(self, database_name=DATABASE_NAME) -> None:
+        try:
+            self.mongo_db_client = MongoDBClient(database_name=database_name)
+            self.database = self.mongo_db_client.database
+            self.database_name = database_name
+            if AsyncMongoDBClient.executor is None:
+                max_workers = int(os.getenv(MONGO_DB_ASYNC_WORKERS_KEY, MONGO_DB_ASYNC_WORKERS))
+                AsyncMongoDBClient.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="mongodb")
+                logging.info(f"Started the async mongodb executor with {max_workers} threads")
+        except Exception as e:
+            raise SensorException(e, sys)
+
+    async def run(self, func: Callable, *args, **kwargs):
+        """
+        This method is used to run a blocking mongodb call on the executor and await its result.
+
+        Args:
+            func (Callable): blocking function.
+
+        Returns:
+            result of the function.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(AsyncMongoDBClient.executor, partial(func, *args, **kwargs))
+
+    async def find(self, collection_name: str, filter: Optional[dict] = None, projection: Optional[dict] = None, limit: int = 0) -> List[dict]:
+        """
+        This method is used to find the documents of a collection.
+
+        Args:
+            collection_name (str): name of the collection.
+            filter (Optional[dict], optional): query filter. Defaults to None.
+            projection (Optional[dict], optional): fields to return. Defaults to None.
+            limit (int, optional): maximum number of documents, 0 means no limit. Defaults to 0.
+
+        Returns:
+            List[dict]: documents.
+        """
+        try:
+            collection = self.database[collection_name]
+            return await self.run(lambda: list(collection.find(filter or {}, projection, limit=limit)))
+        except Exception as e:
+            raise SensorException(e, sys)
+
+    async def aggregate(self, collection_name: str, pipeline: List[dict]) -> List[dict]:
+        """
+        This method is used to run an aggregation pipeline on a collection.
+
+        Args:
+            collection_name (str): name of the collection.
+            pipeline (List[dict]): aggregation stages.
+
+        Returns:
+            List[dict]: documents.
+        """
+        try:
+            collection = self.database[collection_name]
+            return await self.run(lambda: list(collection.aggregate(pipeline, allowDiskUse=True)))
+        except Exception as e:
+            raise SensorException(e, sys)
+
+    async def insert_many(self, collection_name: str, documents: List[dict], ordered: bool = False) -> int:
+        """
+        This method is used to insert documents into a collection, unordered by default so that one
+        failing document does not stop the others.
+
+        Args:
+            collection_name (str): name of the collection.
+            documents (List[dict]): documents to insert.
+            ordered (bool, optional): stop at the first error. Defaults to False.
+
+        Returns:
+            int: number of inserted documents.
+        """
+        try:
+            collection = self.database[collection_name]
+            result = await self.run(collection.insert_many, documents, ordered=ordered)
+            return len(result.inserted_ids)
+        except Exception as e:
+            raise SensorException(e, sys)
+
+    async def count_documents(self, collection_name: str, filter: Optional[dict] = None) -> int:
+        """
+        This method is used to count the documents of a collection which match a filter.
+
+        Args:
+            collection_name (str): name of the collection.
+            filter (Optional[dict], optional): query the documents must match. Defaults to None, every document.
+
+        Raises:
+            SensorException: raises the exception error.
+
+        Returns:
+            int: number of matching documents.
+        """
+        try:
+            collection = self.database[collection_name]
+            return await self.run(collection.count_documents, filter or {})
+        except Exception as e:
+            raise SensorException(e, sys)
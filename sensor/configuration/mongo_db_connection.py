@@ -2,13 +2,33 @@ import os,sys
 import certifi
 import pymongo
 
+from sensor.constant import database
 from sensor.constant.database import DATABASE_NAME
+from sensor.constant import env_variables
 from sensor.constant.env_variables import MONGODB_URL_KEY
 from sensor.exception import SensorException
 from sensor.logger import logging
 
 ca = certifi.where()
 
+
+def get_client_options() -> dict:
+    """
+    This function is used to get the connection pool, timeout and read preference options of the
+    mongodb client, every default of sensor.constant.database can be overridden by its env variable.
+
+    Returns:
+        dict: keyword arguments of pymongo.MongoClient.
+    """
+    return {
+        "maxPoolSize": int(os.getenv(env_variables.MONGO_DB_MAX_POOL_SIZE_KEY, database.MONGO_DB_MAX_POOL_SIZE)),
+        "minPoolSize": int(os.getenv(env_variables.MONGO_DB_MIN_POOL_SIZE_KEY, database.MONGO_DB_MIN_POOL_SIZE)),
+        "serverSelectionTimeoutMS": int(os.getenv(env_variables.MONGO_DB_SERVER_SELECTION_TIMEOUT_MS_KEY, database.MONGO_DB_SERVER_SELECTION_TIMEOUT_MS)),
+        "connectTimeoutMS": int(os.getenv(env_variables.MONGO_DB_CONNECT_TIMEOUT_MS_KEY, database.MONGO_DB_CONNECT_TIMEOUT_MS)),
+        "socketTimeoutMS": int(os.getenv(env_variables.MONGO_DB_SOCKET_TIMEOUT_MS_KEY, database.MONGO_DB_SOCKET_TIMEOUT_MS)),
+        "readPreference": os.getenv(env_variables.MONGO_DB_READ_PREFERENCE_KEY, database.MONGO_DB_READ_PREFERENCE),
+    }
+
 class MongoDBClient:
     client = None
     def __init__(self, database_name=DATABASE_NAME) -> None:
@@ -19,10 +39,14 @@ class MongoDBClient:
                 # mongo_db_url  = "mongodb+srv://<username>:<passowrd>@cluster0.n3qxk.mongodb.net/?retryWrites=true&w=majority"
                 #first set env variable in Terminal by typing "SET MONGODB_URL_KEY" this command
                 mongo_db_url = os.getenv(MONGODB_URL_KEY)
+                if mongo_db_url is None:
+                    raise Exception(f"Environment variable: {MONGODB_URL_KEY} is not set.")
+                client_options = get_client_options()
+                logging.info(f"Mongodb client options:{client_options}")
                 if "localhost" in mongo_db_url:
-                    MongoDBClient.client = pymongo.MongoClient(mongo_db_url)
+                    MongoDBClient.client = pymongo.MongoClient(mongo_db_url, **client_options)
                 else:
-                    MongoDBClient.client = pymongo.MongoClient(mongo_db_url, tlsCAFile=ca)
+                    MongoDBClient.client = pymongo.MongoClient(mongo_db_url, tlsCAFile=ca, **client_options)
             self.client = MongoDBClient.client
             self.database = self.client[database_name]
             self.database_name = database_name
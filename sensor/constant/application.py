@@ -1,3 +1,41 @@
 # On which post we are using FASTApi to train and to predict.
 APP_HOST = "0.0.0.0"
 APP_PORT = 8080
+
+# How often (in seconds) the serving process checks the saved models directory for a new model.
+MODEL_CACHE_CHECK_INTERVAL_SECONDS = 10
+
+# Number of serving worker processes started by the launcher, 0 means one per cpu core.
+APP_WORKERS = 0
+# How often (in seconds) the launcher checks for a new model to roll the workers onto.
+APP_MODEL_RELOAD_INTERVAL_SECONDS = 30
+# A worker which exits unexpectedly is restarted after a delay doubled on every crash in the window, up to the maximum.
+# The launcher stops when this many workers crashed within the window instead of restarting them forever.
+APP_WORKER_RESTART_DELAY_SECONDS = 1
+APP_WORKER_RESTART_MAX_DELAY_SECONDS = 60
+APP_WORKER_MAX_CRASHES = 5
+APP_WORKER_CRASH_WINDOW_SECONDS = 300
+
+# Prediction log sink: rows are written in one bulk insert when the batch is full or the interval is over.
+PREDICTION_LOG_BATCH_SIZE = 1000
+PREDICTION_LOG_FLUSH_INTERVAL_SECONDS = 5
+# Maximum number of scored requests waiting to be written, new requests wait when it is reached.
+PREDICTION_LOG_MAX_PENDING_REQUESTS = 1000
+PREDICTION_LOG_MAX_RETRIES = 3
+
+# Explanations: rows whose feature contributions are kept in memory (least recently used are evicted first)
+# and number of features with the largest contributions returned for every row by default.
+EXPLAIN_CACHE_MAX_ENTRIES = 10000
+EXPLAIN_TOP_FEATURES = 10
+
+# Prediction result cache: scores of recently seen rows, evicted after the ttl or oldest first when full.
+PREDICTION_CACHE_MAX_ENTRIES = 100000
+PREDICTION_CACHE_TTL_SECONDS = 300
+
+# Shadow scoring: the best model of the challenger registry (same layout as saved_models) scores this fraction
+# of the prediction requests in the background, 0 disables it. Shadow requests beyond the pending limit are
+# dropped, and the challenger uses few threads, so the served requests are never slowed down.
+SHADOW_MODEL_DIR = "challenger_models"
+SHADOW_TRAFFIC_FRACTION = 0.0
+SHADOW_MAX_PENDING_REQUESTS = 100
+SHADOW_MODEL_THREADS = 1
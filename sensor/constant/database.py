@@ -1,2 +1,15 @@
 DATABASE_NAME = "Sensor_Project_Data"
 COLLECTION_NAME = "sensor"
+
+
+# Connection pool defaults of the mongodb client, every value can be overridden by its env variable.
+MONGO_DB_MAX_POOL_SIZE = 100
+MONGO_DB_MIN_POOL_SIZE = 0
+MONGO_DB_SERVER_SELECTION_TIMEOUT_MS = 30000
+MONGO_DB_CONNECT_TIMEOUT_MS = 20000
+MONGO_DB_SOCKET_TIMEOUT_MS = 0
+MONGO_DB_READ_PREFERENCE = "primary"
+# Number of threads which run the blocking mongodb calls of the async client.
+MONGO_DB_ASYNC_WORKERS = 16
+# Collection where the scored prediction requests are logged.
+PREDICTION_LOG_COLLECTION_NAME = "prediction_log"
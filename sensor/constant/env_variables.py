@@ -8,3 +8,39 @@ AWS_SECRET_ACCESS_KEY_ENV_KEY = "AWS_SECRET_ACCESS_KEY"
 REGION_NAME = "us-east-1"
 
 
+# directory of the prometheus textfile collector, the pipeline run metrics are exported there when it is set.
+PIPELINE_METRICS_TEXTFILE_DIR_KEY = "PIPELINE_METRICS_TEXTFILE_DIR"
+# directory shared by the serving workers to aggregate their prometheus metrics.
+PROMETHEUS_MULTIPROC_DIR_KEY = "PROMETHEUS_MULTIPROC_DIR"
+
+# mongodb connection pool settings.
+MONGO_DB_MAX_POOL_SIZE_KEY = "MONGO_DB_MAX_POOL_SIZE"
+MONGO_DB_MIN_POOL_SIZE_KEY = "MONGO_DB_MIN_POOL_SIZE"
+MONGO_DB_SERVER_SELECTION_TIMEOUT_MS_KEY = "MONGO_DB_SERVER_SELECTION_TIMEOUT_MS"
+MONGO_DB_CONNECT_TIMEOUT_MS_KEY = "MONGO_DB_CONNECT_TIMEOUT_MS"
+MONGO_DB_SOCKET_TIMEOUT_MS_KEY = "MONGO_DB_SOCKET_TIMEOUT_MS"
+MONGO_DB_READ_PREFERENCE_KEY = "MONGO_DB_READ_PREFERENCE"
+MONGO_DB_ASYNC_WORKERS_KEY = "MONGO_DB_ASYNC_WORKERS"
+
+# ingestion filters and sampling, pushed down into the mongodb aggregation pipeline.
+# dates are in iso format, truck ids are comma separated and the sample fraction is between 0 and 1.
+DATA_INGESTION_START_DATE_KEY = "DATA_INGESTION_START_DATE"
+DATA_INGESTION_END_DATE_KEY = "DATA_INGESTION_END_DATE"
+DATA_INGESTION_TRUCK_IDS_KEY = "DATA_INGESTION_TRUCK_IDS"
+DATA_INGESTION_SAMPLE_FRACTION_KEY = "DATA_INGESTION_SAMPLE_FRACTION"
+
+# number of cross validation folds of the model trainer and processes training them.
+MODEL_TRAINER_CV_FOLDS_KEY = "MODEL_TRAINER_CV_FOLDS"
+MODEL_TRAINER_CV_MAX_WORKERS_KEY = "MODEL_TRAINER_CV_MAX_WORKERS"
+# "continue" or "refresh" to warm start the model trainer from the best saved model.
+MODEL_TRAINER_WARM_START_KEY = "MODEL_TRAINER_WARM_START"
+# "zstd" or "lz4" to compress the model and transformed array artifacts.
+ARTIFACT_COMPRESSION_KEY = "ARTIFACT_COMPRESSION"
+
+# set to "true" to log every scored row of the prediction service into mongodb.
+PREDICTION_LOG_ENABLED_KEY = "PREDICTION_LOG_ENABLED"
+# set to "true" to reuse the score of rows which were already scored by the same model.
+PREDICTION_CACHE_ENABLED_KEY = "PREDICTION_CACHE_ENABLED"
+# registry directory of the challenger model and fraction of the prediction requests it scores in the background.
+SHADOW_MODEL_DIR_KEY = "SHADOW_MODEL_DIR"
+SHADOW_TRAFFIC_FRACTION_KEY = "SHADOW_TRAFFIC_FRACTION"
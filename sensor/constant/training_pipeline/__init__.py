@@ -20,12 +20,29 @@ SCHEMA_DROP_COLS  = "drop_columns"
 
 
 
+# codec of the model and transformed array artifacts: "zstd", "lz4" or "" to write them uncompressed.
+# the train rows memory mapped by the cross validation workers are always written uncompressed.
+ARTIFACT_COMPRESSION: str = ""
+ARTIFACT_COMPRESSION_CODECS = ("zstd", "lz4")
+ARTIFACT_COMPRESSION_ZSTD_LEVEL: int = 3
+ARTIFACT_COMPRESSION_LZ4_LEVEL: int = 0
+
 # Data Ingestion related constant start with DATA_INGESTION VAR NAME
 DATA_INGESTION_COLLECTION_NAME: str = "sensor"
 DATA_INGESTION_DIR_NAME: str = "data_ingestion"
 DATA_INGESTION_FEATURE_STORE_DIR: str = "feature_store"
 DATA_INGESTION_INGESTED_DIR: str = "ingested"
 DATA_INGESTION_TRAIN_TEST_SPLIT_RATION: float = 0.2
+# records are exported and split in chunks of this size, the seed fixes which rows go to the test set.
+DATA_INGESTION_CHUNK_SIZE: int = 10000
+DATA_INGESTION_SPLIT_SEED: int = 42
+# fields of the records used by the ingestion filters (date window and truck subset).
+DATA_INGESTION_DATE_FIELD: str = "timestamp"
+DATA_INGESTION_TRUCK_ID_FIELD: str = "truck_id"
+# columns of the train split with more missing values or less variance than this are not used as features.
+DATA_INGESTION_COLUMN_PROFILE_FILE_NAME: str = "column_profile.yaml"
+DATA_INGESTION_PRUNE_MAX_NULL_RATE: float = 0.7
+DATA_INGESTION_PRUNE_MIN_VARIANCE: float = 0.0
 
 
 # Data Validation related constants with DATA_VALIDATION VAR NAME
@@ -34,12 +51,28 @@ DATA_VALIDATION_VALID_DIR: str = "validated"
 DATA_VALIDATION_INVALID_DIR: str = "invalid"
 DATA_VALIDATION_DRIFT_REPORT_DIR: str = "drift_report"
 DATA_VALIDATION_DRIFT_REPORT_FILE_NAME: str = "report.yaml"
+# the drift test runs on blocks of columns in a thread pool, every column can be subsampled to a fixed size
+# (0 tests every value), the data is drifted when more columns than the budget drift and the early stop ends
+# the test as soon as the budget is exceeded.
+DATA_VALIDATION_DRIFT_MAX_WORKERS: int = 4
+DATA_VALIDATION_DRIFT_BLOCK_SIZE: int = 16
+DATA_VALIDATION_DRIFT_SAMPLE_SIZE: int = 0
+DATA_VALIDATION_DRIFT_SEED: int = 42
+DATA_VALIDATION_DRIFT_MAX_DRIFTED_COLUMNS: int = 0
+DATA_VALIDATION_DRIFT_EARLY_STOP: bool = False
 
 
 # Data transformation related constants with DATA_TRANSFORMATION VAR NAME
 DATA_TRANSFORMATION_DIR_NAME: str = "data_transformation"
 DATA_TRANSFORMATION_TRANSFORMED_DATA_DIR: str = "transformed"
 DATA_TRANSFORMATION_TRANSFORMED_OBJECT_DIR: str = "transformed_object"
+# train rows held out before resampling, with the real class ratio, used to choose the decision threshold.
+# they are never trained on and the test rows stay untouched for the test metrics and the model evaluation.
+DATA_TRANSFORMATION_VALIDATION_FILE_NAME: str = "validation.npy"
+DATA_TRANSFORMATION_VALIDATION_SPLIT_RATIO: float = 0.2
+DATA_TRANSFORMATION_VALIDATION_SPLIT_SEED: int = 42
+# train rows before resampling, the cross validation folds are assigned over them.
+DATA_TRANSFORMATION_UNRESAMPLED_TRAIN_FILE_NAME: str = "train_unresampled.npy"
 
 # Model Trainer related constant start with MODEL TRAINER VAR NAME
 MODEL_TRAINER_DIR_NAME: str = "model_trainer"
@@ -47,6 +80,25 @@ MODEL_TRAINER_TRAINED_MODEL_DIR: str = "trained_model"
 MODEL_TRAINER_TRAINED_MODEL_NAME: str = "model.pkl"
 MODEL_TRAINER_EXPECTED_SCORE: float = 0.6
 MODEL_TRAINER_OVER_FITTING_UNDER_FITTING_THRESHOLD: float = 0.05
+# cost of an unnecessary check of a truck and of a missed APS failure, used to choose the decision threshold.
+MODEL_TRAINER_FALSE_POSITIVE_COST: float = 10
+MODEL_TRAINER_FALSE_NEGATIVE_COST: float = 500
+# k-fold cross validation of the training data, 0 keeps the checks on the single train/test split.
+MODEL_TRAINER_CV_FOLDS: int = 0
+MODEL_TRAINER_CV_SEED: int = 42
+# processes training the folds, 0 means one per core up to the number of folds.
+MODEL_TRAINER_CV_MAX_WORKERS: int = 0
+MODEL_TRAINER_CV_DIR_NAME: str = "cross_validation"
+MODEL_TRAINER_CV_FOLDS_FILE_NAME: str = "folds.npy"
+# warm start from the best saved model: "continue" adds boosting rounds, "refresh" refits the leaf values
+# of its trees, "" always trains from scratch. A full training is used when too many columns drifted.
+MODEL_TRAINER_WARM_START_MODE: str = ""
+MODEL_TRAINER_WARM_START_MODES = ("continue", "refresh")
+MODEL_TRAINER_WARM_START_ROUNDS: int = 50
+MODEL_TRAINER_WARM_START_MAX_DRIFT_RATIO: float = 0.2
+# share of the warm start train rows held out to choose the decision threshold, like the full training.
+MODEL_TRAINER_WARM_START_VALIDATION_SPLIT_RATIO: float = DATA_TRANSFORMATION_VALIDATION_SPLIT_RATIO
+MODEL_TRAINER_WARM_START_VALIDATION_SPLIT_SEED: int = DATA_TRANSFORMATION_VALIDATION_SPLIT_SEED
 
 # Model Evaluation related constant start with MODEL_EVALUATION name.
 MODEL_EVALUATION_CHANGED_THRESHOLD_SCORE: float = 0.02
@@ -56,3 +108,11 @@ MODEL_EVALUATION_REPORT_FILE_NAME:str = "report.yaml"
 # Model Pusher related constants.
 MODEL_PUSHER_DIR_NAME:str = "model_pusher"
 MODEL_PUSHER_SAVED_MODEL_DIR:str = SAVED_MODEL_DIR
+
+# Pipeline run summary related constants.
+PIPELINE_RUN_SUMMARY_FILE_NAME: str = "run_summary.yaml"
+PIPELINE_METRICS_FILE_NAME: str = "sensor_pipeline.prom"
+# artifacts of the completed stages of a run, a failed run is resumed from them.
+PIPELINE_RUN_MANIFEST_FILE_NAME: str = "run_manifest.yaml"
+# number of threads running the independent stages of the pipeline concurrently.
+PIPELINE_MAX_WORKERS: int = 4
@@ -1,9 +1,11 @@
 import sys
-from typing import Optional
+from itertools import islice
+from typing import Iterator, List, Optional
 
 import numpy as np
 import pandas as pd
 
+from sensor.configuration.async_mongo_db_connection import AsyncMongoDBClient
 from sensor.configuration.mongo_db_connection import MongoDBClient
 from sensor.constant.database import DATABASE_NAME
 from sensor.exception import SensorException
@@ -25,13 +27,40 @@ class SensorData:
         except Exception as e:
             raise SensorException(e, sys)
 
-    def export_collection_as_dataframe(self, collection_name: str, database_name: Optional[str] = None) -> pd.DataFrame:
+    @staticmethod
+    def build_aggregation_pipeline(filter: Optional[dict] = None, exclude_columns: Optional[List[str]] = None, sample_fraction: Optional[float] = None) -> List[dict]:
+        """
+        This method is used to build the aggregation pipeline which filters, samples and projects the
+        records on the mongodb server, so only the needed rows and columns are sent over the wire.
+
+        Args:
+            filter (Optional[dict], optional): query of the $match stage. Defaults to None.
+            exclude_columns (Optional[List[str]], optional): columns which are not exported. Defaults to None.
+            sample_fraction (Optional[float], optional): fraction of the matched records to keep. Defaults to None.
+
+        Returns:
+            List[dict]: stages of the aggregation pipeline.
+        """
+        pipeline = []
+        if filter:
+            # first stage, so the indexes of the filtered fields can be used.
+            pipeline.append({"$match": filter})
+        if sample_fraction is not None and sample_fraction < 1:
+            # every record is kept with the given probability; unlike $sample this streams and needs no count.
+            pipeline.append({"$match": {"$expr": {"$lt": [{"$rand": {}}, sample_fraction]}}})
+        pipeline.append({"$project": {"_id": 0, **{column: 0 for column in exclude_columns or []}}})
+        return pipeline
+
+    def export_collection_as_dataframe(self, collection_name: str, database_name: Optional[str] = None, filter: Optional[dict] = None, exclude_columns: Optional[List[str]] = None, sample_fraction: Optional[float] = None) -> pd.DataFrame:
         """
         This method id used to export entire collectin as dataframe:
 
         Args:
             collection_name (str): name of the collection of Mongodb
             database_name (Optional[str], optional): database name of mongodb. Defaults to None.
+            filter (Optional[dict], optional): query the records must match. Defaults to None.
+            exclude_columns (Optional[List[str]], optional): columns which are not exported. Defaults to None.
+            sample_fraction (Optional[float], optional): fraction of the records to export. Defaults to None.
 
         Raises:
             SensorException: Error
@@ -46,20 +75,67 @@ class SensorData:
                 logging.info(f"mongo_db_client_if:{collection}")
 
             else:
-                collection = self.mongo_db_client.database_name[collection_name]
+                collection = self.mongo_db_client.client[database_name][collection_name]
                 logging.info(f"mongo_db_client_else:{collection}")
-            # Creating the Dataframe.
-            logging.info("finding_operation")
-            df = pd.DataFrame(list(collection.find()))
-            logging.info("started the dropping columns")
-            # If "_id" is there we are dropping that column.
-            if "_id" in df.columns.to_list():
-                df = df.drop(columns=["_id"], axis=1)
+            # Creating the Dataframe, filtering, sampling and dropping the columns (and "_id") on the server.
+            pipeline = self.build_aggregation_pipeline(filter=filter, exclude_columns=exclude_columns, sample_fraction=sample_fraction)
+            logging.info(f"aggregation pipeline:{pipeline}")
+            df = pd.DataFrame(list(collection.aggregate(pipeline, allowDiskUse=True)))
             # Replacing the na values with np.nan.
             df.replace({"na": np.nan}, inplace=True)
-            logging.info("completed the exporting collection as dataframe")
+            logging.info(f"completed the exporting collection as dataframe with shape {df.shape}")
             return df
 
         except Exception as e:
             logging.info(f"{e}")
             raise SensorException(e, sys)
+
+    def export_collection_as_dataframe_chunks(self, collection_name: str, database_name: Optional[str] = None, chunk_size: int = 10000, filter: Optional[dict] = None, exclude_columns: Optional[List[str]] = None, sample_fraction: Optional[float] = None) -> Iterator[pd.DataFrame]:
+        """
+        This method is used to export the collection as a stream of dataframes, only one chunk of
+        records is held in memory at a time.
+
+        Args:
+            collection_name (str): name of the collection of Mongodb
+            database_name (Optional[str], optional): database name of mongodb. Defaults to None.
+            chunk_size (int, optional): number of records per dataframe. Defaults to 10000.
+            filter, exclude_columns, sample_fraction: see export_collection_as_dataframe.
+
+        Yields:
+            Iterator[pd.DataFrame]: chunks of the collection.
+        """
+        try:
+            if database_name is None:
+                collection = self.mongo_db_client.database[collection_name]
+            else:
+                collection = self.mongo_db_client.client[database_name][collection_name]
+            pipeline = self.build_aggregation_pipeline(filter=filter, exclude_columns=exclude_columns, sample_fraction=sample_fraction)
+            logging.info(f"started the exporting collection as chunks of {chunk_size} records, aggregation pipeline:{pipeline}")
+            cursor = collection.aggregate(pipeline, allowDiskUse=True, batchSize=chunk_size)
+            while True:
+                records = list(islice(cursor, chunk_size))
+                if not records:
+                    break
+                df = pd.DataFrame(records)
+                df.replace({"na": np.nan}, inplace=True)
+                yield df
+            logging.info("completed the exporting collection as chunks")
+        except Exception as e:
+            logging.info(f"{e}")
+            raise SensorException(e, sys)
+
+    async def export_collection_as_dataframe_async(self, collection_name: str, database_name: Optional[str] = None, **export_options) -> pd.DataFrame:
+        """
+        This method is used to export the collection as dataframe from async code, the export runs on
+        the thread pool of the async mongodb client so the event loop is not blocked.
+
+        Args:
+            collection_name (str): name of the collection of Mongodb
+            database_name (Optional[str], optional): database name of mongodb. Defaults to None.
+            export_options: filter, exclude_columns and sample_fraction of export_collection_as_dataframe.
+
+        Returns:
+            pd.DataFrame: pd.DataFrame of collection
+        """
+        async_mongo_db_client = AsyncMongoDBClient(database_name=self.mongo_db_client.database_name)
+        return await async_mongo_db_client.run(self.export_collection_as_dataframe, collection_name, database_name, **export_options)
@@ -1,9 +1,11 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from typing import List, Optional
 
 @dataclass
 class DataIngestionArtifact:
     training_file_path: str
     testing_file_path: str
+    column_profile_file_path: str
 
 @dataclass
 class DataValidationArtifact:
@@ -28,6 +30,10 @@ class DataTransformationArtifact:
 
     transformed_test_file_path: str
 
+    transformed_validation_file_path: str
+
+    transformed_unresampled_train_file_path: str
+
 @dataclass
 class ClassificationMetricArtifact:
     f1_score: float
@@ -36,11 +42,32 @@ class ClassificationMetricArtifact:
 
     recall_score: float
 
+@dataclass
+class CrossValidationMetricArtifact:
+    n_folds: int
+
+    train_f1_score_mean: float
+
+    f1_score_mean: float
+
+    f1_score_std: float
+
+    cost_mean: float
+
+    cost_std: float
+
+    fold_f1_scores: List[float] = field(default_factory=list)
+
 @dataclass
 class ModelTrainerArtifact:
     trained_model_file_path: str
     train_metric_artifact: ClassificationMetricArtifact
     test_metric_artifact: ClassificationMetricArtifact
+    decision_threshold: float
+    validation_cost: float
+    cross_validation_metric_artifact: Optional[CrossValidationMetricArtifact] = None
+    # "full", or the warm start mode used to update the best saved model.
+    training_mode: str = "full"
 
 @dataclass
 class ModelEvaluationArtifact:
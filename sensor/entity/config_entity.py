@@ -1,20 +1,25 @@
 
 import os
 from datetime import datetime
+from typing import List, Optional, Union
 
-from sensor.constant import training_pipeline
+from sensor.constant import env_variables, training_pipeline
+from sensor.utils.compression import check_codec
 
 
 class TrainingPipelineConfig:
     """
     This class is used to initialize the TrainingPipelineConfigurations from __init__.py file.
     """
-    def __init__(self, timestamp = datetime.now()):
+    def __init__(self, timestamp: Optional[str] = None):
 
-        timestamp = datetime.now().strftime("%m_%d_%Y_%H_%M_%S")
+        # a new run gets the current time as run id, an existing run id points to the artifacts of that run.
+        timestamp = timestamp or datetime.now().strftime("%m_%d_%Y_%H_%M_%S")
         self.pipeline_name:str = training_pipeline.PIPELINE_NAME
         self.artifact_dir: str = os.path.join(training_pipeline.ARTIFACT_DIR, timestamp)
         self.timestamp: str = timestamp
+        # codec of the model and transformed array artifacts, a missing package fails before the run starts.
+        self.artifact_compression: Optional[str] = check_codec(os.getenv(env_variables.ARTIFACT_COMPRESSION_KEY, training_pipeline.ARTIFACT_COMPRESSION))
 
 
 class DataIngestionConfig:
@@ -33,8 +38,26 @@ class DataIngestionConfig:
         self.testing_file_path:str = os.path.join(self.data_ingestion_dir, training_pipeline.DATA_INGESTION_INGESTED_DIR, training_pipeline.TEST_FILE_NAME)
         # splitting the data in the ratio format.
         self.train_test_split_ratio: float = training_pipeline.DATA_INGESTION_TRAIN_TEST_SPLIT_RATION
+        self.split_seed: int = training_pipeline.DATA_INGESTION_SPLIT_SEED
+        self.chunk_size: int = training_pipeline.DATA_INGESTION_CHUNK_SIZE
+        # profile of the train split and the columns pruned from the features.
+        self.column_profile_file_path: str = os.path.join(self.data_ingestion_dir, training_pipeline.DATA_INGESTION_COLUMN_PROFILE_FILE_NAME)
+        self.prune_max_null_rate: float = training_pipeline.DATA_INGESTION_PRUNE_MAX_NULL_RATE
+        self.prune_min_variance: float = training_pipeline.DATA_INGESTION_PRUNE_MIN_VARIANCE
         # taking the collection name.
         self.collection_name: str = training_pipeline.DATA_INGESTION_COLLECTION_NAME
+        # optional filters and sampling, None means the whole collection is exported.
+        start_date, end_date = os.getenv(env_variables.DATA_INGESTION_START_DATE_KEY), os.getenv(env_variables.DATA_INGESTION_END_DATE_KEY)
+        truck_ids, sample_fraction = os.getenv(env_variables.DATA_INGESTION_TRUCK_IDS_KEY), os.getenv(env_variables.DATA_INGESTION_SAMPLE_FRACTION_KEY)
+        self.date_field: str = training_pipeline.DATA_INGESTION_DATE_FIELD
+        self.start_date: Optional[datetime] = datetime.fromisoformat(start_date) if start_date else None
+        self.end_date: Optional[datetime] = datetime.fromisoformat(end_date) if end_date else None
+        self.truck_id_field: str = training_pipeline.DATA_INGESTION_TRUCK_ID_FIELD
+        # numeric truck ids are parsed as int, the ingestion filter matches them stored as numbers or strings.
+        self.truck_ids: Optional[List[Union[int, str]]] = [int(truck_id) if truck_id.isdigit() else truck_id for truck_id in (truck_id.strip() for truck_id in truck_ids.split(",")) if truck_id] if truck_ids else None
+        self.sample_fraction: Optional[float] = float(sample_fraction) if sample_fraction else None
+        if self.sample_fraction is not None and not 0 < self.sample_fraction <= 1:
+            raise ValueError(f"{env_variables.DATA_INGESTION_SAMPLE_FRACTION_KEY} must be in (0, 1], got {self.sample_fraction}")
 
 class DataValidationConfig:
     """
@@ -57,6 +80,13 @@ class DataValidationConfig:
         self.invalid_test_file_path: str = os.path.join(self.invalid_data_dir, training_pipeline.TEST_FILE_NAME)
         # creating the drift report file path.
         self.drift_report_file_path: str = os.path.join(self.data_validation_dir, training_pipeline.DATA_VALIDATION_DRIFT_REPORT_DIR, training_pipeline.DATA_VALIDATION_DRIFT_REPORT_FILE_NAME)
+        # settings of the column wise drift test.
+        self.drift_max_workers: int = training_pipeline.DATA_VALIDATION_DRIFT_MAX_WORKERS
+        self.drift_block_size: int = training_pipeline.DATA_VALIDATION_DRIFT_BLOCK_SIZE
+        self.drift_sample_size: int = training_pipeline.DATA_VALIDATION_DRIFT_SAMPLE_SIZE
+        self.drift_seed: int = training_pipeline.DATA_VALIDATION_DRIFT_SEED
+        self.drift_max_drifted_columns: int = training_pipeline.DATA_VALIDATION_DRIFT_MAX_DRIFTED_COLUMNS
+        self.drift_early_stop: bool = training_pipeline.DATA_VALIDATION_DRIFT_EARLY_STOP
 
 class DataTransformationConfig:
     """
@@ -71,6 +101,18 @@ class DataTransformationConfig:
         self.transformed_test_file_path: str = os.path.join(self.data_transformation_dir, training_pipeline.DATA_TRANSFORMATION_TRANSFORMED_DATA_DIR, training_pipeline.TEST_FILE_NAME.replace("csv", "npy"))
         # creating the transformed object file path.
         self.transformed_object_file_path:str = os.path.join(self.data_transformation_dir, training_pipeline.DATA_TRANSFORMATION_TRANSFORMED_OBJECT_DIR, training_pipeline.PREROCESSING_OBJECT_FILE_NAME)
+        # creating the data transformation validation file path.
+        self.transformed_validation_file_path: str = os.path.join(self.data_transformation_dir, training_pipeline.DATA_TRANSFORMATION_TRANSFORMED_DATA_DIR, training_pipeline.DATA_TRANSFORMATION_VALIDATION_FILE_NAME)
+        # share of the train rows held out to choose the decision threshold.
+        self.validation_split_ratio: float = training_pipeline.DATA_TRANSFORMATION_VALIDATION_SPLIT_RATIO
+        self.validation_split_seed: int = training_pipeline.DATA_TRANSFORMATION_VALIDATION_SPLIT_SEED
+        # train rows before resampling, the cross validation folds are assigned over them.
+        self.transformed_unresampled_train_file_path: str = os.path.join(self.data_transformation_dir, training_pipeline.DATA_TRANSFORMATION_TRANSFORMED_DATA_DIR, training_pipeline.DATA_TRANSFORMATION_UNRESAMPLED_TRAIN_FILE_NAME)
+        # codec of the transformed arrays and of the preprocessor, the cross validation workers memory map
+        # the unresampled train rows so they are kept uncompressed when the model trainer cross validates.
+        self.compression: Optional[str] = training_pipeline_config.artifact_compression
+        cross_validation_folds = int(os.getenv(env_variables.MODEL_TRAINER_CV_FOLDS_KEY, training_pipeline.MODEL_TRAINER_CV_FOLDS))
+        self.unresampled_train_compression: Optional[str] = None if cross_validation_folds >= 2 else self.compression
 
 class ModelTrainerConfig:
     """
@@ -86,6 +128,24 @@ class ModelTrainerConfig:
         self.expected_accuracy: float = training_pipeline.MODEL_TRAINER_EXPECTED_SCORE
         # creating the variable for overfitting and underfitting threshold.
         self.overfitting_underfitting_threshold: float = training_pipeline.MODEL_TRAINER_OVER_FITTING_UNDER_FITTING_THRESHOLD
+        # misclassification costs which the decision threshold minimises.
+        self.false_positive_cost: float = training_pipeline.MODEL_TRAINER_FALSE_POSITIVE_COST
+        self.false_negative_cost: float = training_pipeline.MODEL_TRAINER_FALSE_NEGATIVE_COST
+        # cross validation is used for the acceptance checks when it has at least 2 folds.
+        self.cross_validation_folds: int = int(os.getenv(env_variables.MODEL_TRAINER_CV_FOLDS_KEY, training_pipeline.MODEL_TRAINER_CV_FOLDS))
+        self.cross_validation_max_workers: int = int(os.getenv(env_variables.MODEL_TRAINER_CV_MAX_WORKERS_KEY, training_pipeline.MODEL_TRAINER_CV_MAX_WORKERS))
+        self.cross_validation_seed: int = training_pipeline.MODEL_TRAINER_CV_SEED
+        self.cross_validation_folds_file_path: str = os.path.join(self.model_trainer_dir, training_pipeline.MODEL_TRAINER_CV_DIR_NAME, training_pipeline.MODEL_TRAINER_CV_FOLDS_FILE_NAME)
+        # warm start mode, rounds added by "continue" and largest ratio of drifted columns it is used for.
+        self.warm_start: str = os.getenv(env_variables.MODEL_TRAINER_WARM_START_KEY, training_pipeline.MODEL_TRAINER_WARM_START_MODE).strip().lower()
+        if self.warm_start and self.warm_start not in training_pipeline.MODEL_TRAINER_WARM_START_MODES:
+            raise ValueError(f"{env_variables.MODEL_TRAINER_WARM_START_KEY} must be one of {training_pipeline.MODEL_TRAINER_WARM_START_MODES}, got {self.warm_start}")
+        self.warm_start_rounds: int = training_pipeline.MODEL_TRAINER_WARM_START_ROUNDS
+        self.warm_start_max_drift_ratio: float = training_pipeline.MODEL_TRAINER_WARM_START_MAX_DRIFT_RATIO
+        self.warm_start_validation_split_ratio: float = training_pipeline.MODEL_TRAINER_WARM_START_VALIDATION_SPLIT_RATIO
+        self.warm_start_validation_split_seed: int = training_pipeline.MODEL_TRAINER_WARM_START_VALIDATION_SPLIT_SEED
+        # codec of the trained model, it is copied as it is by the model pusher.
+        self.compression: Optional[str] = training_pipeline_config.artifact_compression
 
 class ModelEvaluationConfig:
     """
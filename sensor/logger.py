@@ -1,19 +1,106 @@
+import atexit
+import json
 import logging
 import os
+import queue
+import threading
 from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 
+LOG_DIR = os.path.join(os.getcwd(), "logs")
+LOG_FILE_MAX_BYTES = 10 * 1024 * 1024
+LOG_FILE_BACKUP_COUNT = 5
+LOG_LEVEL = logging.INFO
 
-LOG_FILE = f"{datetime.now().strftime('%m_%d_%Y_%H_%M_%S')}.log"
-logs_path = os.path.join(os.getcwd(), "logs", LOG_FILE)
-os.makedirs(logs_path, exist_ok=True)
 
-LOG_FILE_PATH = os.path.join(logs_path, LOG_FILE)
+class JsonFormatter(logging.Formatter):
+    """
+    This class is used to format every log record as one json line.
+    """
+    def format(self, record: logging.LogRecord) -> str:
+        log_record = {
+            "time": self.formatTime(record),
+            "name": record.name,
+            "level": record.levelname,
+            "module": record.module,
+            "line": record.lineno,
+            "process": record.process,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            log_record["exception"] = self.formatException(record.exc_info)
+        return json.dumps(log_record)
 
-# https://docs.python.org/3/library/logging.html
-logging.basicConfig(
-    filename=LOG_FILE_PATH,
-    format="[%(asctime)s] %(name)s - %(levelname)s - %(message)s",
-    level=logging.INFO,
-)
 
+class LazyQueueHandler(QueueHandler):
+    """
+    This class is used to hand the log records over to a background thread which writes them into a
+    rotating file. Nothing is created on the filesystem until the first record is logged, and a
+    forked process starts its own writer thread and log file. Once the writer thread is stopped at
+    exit, the records are written into the file by the logging thread itself.
+    """
+    def __init__(self):
+        super().__init__(queue.SimpleQueue())
+        self.listener = None
+        # handlers of the stopped writer thread, the records logged after the stop are written to them directly.
+        self._stopped_handlers = ()
+        self.log_file_path = None
+        self._pid = None
+        self._lock = threading.Lock()
 
+    def _start(self) -> None:
+        timestamp = datetime.now().strftime('%m_%d_%Y_%H_%M_%S')
+        # a forked process writes into its own file, rotation of a shared file is not process safe.
+        log_file = f"{timestamp}.log" if self._pid is None else f"{timestamp}_{os.getpid()}.log"
+        os.makedirs(LOG_DIR, exist_ok=True)
+        self.log_file_path = os.path.join(LOG_DIR, log_file)
+        file_handler = RotatingFileHandler(self.log_file_path, maxBytes=LOG_FILE_MAX_BYTES, backupCount=LOG_FILE_BACKUP_COUNT)
+        file_handler.setFormatter(JsonFormatter())
+        self.queue = queue.SimpleQueue()
+        self.listener = QueueListener(self.queue, file_handler)
+        self.listener.start()
+        self._stopped_handlers = ()
+        self._pid = os.getpid()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # the record is formatted by the json formatter of the writer thread, exception info is kept for it.
+        record.message = record.getMessage()
+        record.msg, record.args = record.message, None
+        return record
+
+    def emit(self, record: logging.LogRecord) -> None:
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._start()
+        if self.listener is None and self._stopped_handlers:
+            for handler in self._stopped_handlers:
+                if record.levelno >= handler.level:
+                    handler.handle(record)
+            return
+        super().emit(record)
+
+    def stop(self) -> None:
+        """
+        This method is used to flush the pending records and stop the writer thread, the records
+        logged afterwards are written synchronously.
+        """
+        if self.listener is not None and self._pid == os.getpid():
+            self._stopped_handlers = self.listener.handlers
+            self.listener.stop()
+            self.listener = None
+
+
+def _configure_root_logger() -> LazyQueueHandler:
+    root_logger = logging.getLogger()
+    for handler in root_logger.handlers:
+        if isinstance(handler, LazyQueueHandler):
+            return handler
+    handler = LazyQueueHandler()
+    root_logger.addHandler(handler)
+    root_logger.setLevel(LOG_LEVEL)
+    atexit.register(handler.stop)
+    return handler
+
+
+log_handler = _configure_root_logger()
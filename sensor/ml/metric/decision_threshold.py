@@ -0,0 +1,46 @@
+import sys
+from typing import Tuple
+
+import numpy as np
+
+from sensor.exception import SensorException
+
+
+def get_cost_optimal_threshold(y_true, y_score, false_positive_cost: float, false_negative_cost: float) -> Tuple[float, float]:
+    """
+    This function is used to find the decision threshold with the lowest misclassification cost in
+    one pass over the scores sorted from the highest: lowering the threshold to the next distinct
+    score turns the rows with that score into positives, so the false positives and false negatives
+    of every candidate threshold are cumulative sums.
+
+    Args:
+        y_true (numerical): actual labels, 1 is the positive class.
+        y_score (numerical): predicted probability of the positive class.
+        false_positive_cost (float): cost of predicting a failure for a healthy truck.
+        false_negative_cost (float): cost of missing a failure.
+
+    Raises:
+        SensorException: raises the exception error.
+
+    Returns:
+        Tuple[float, float]: threshold (a row is positive when its score is >= threshold) and total cost on the given rows.
+    """
+    try:
+        y_true = np.asarray(y_true).astype(bool)
+        y_score = np.asarray(y_score, dtype=np.float64)
+        order = np.argsort(-y_score, kind="stable")
+        sorted_scores, sorted_true = y_score[order], y_true[order]
+        true_positives = np.cumsum(sorted_true)
+        false_positives = np.cumsum(~sorted_true)
+        # only the last row of every run of equal scores is a candidate, rows with equal scores can not be separated.
+        is_last_of_score = np.r_[sorted_scores[1:] != sorted_scores[:-1], True]
+        n_positives = int(y_true.sum())
+        costs = false_positive_cost * false_positives[is_last_of_score] + false_negative_cost * (n_positives - true_positives[is_last_of_score])
+        thresholds = sorted_scores[is_last_of_score]
+        # a threshold above every score predicts no failure at all.
+        best = int(np.argmin(costs)) if len(costs) else -1
+        if best < 0 or costs[best] >= false_negative_cost * n_positives:
+            return float(np.nextafter(y_score.max(initial=1.0), np.inf)), float(false_negative_cost * n_positives)
+        return float(thresholds[best]), float(costs[best])
+    except Exception as e:
+        raise SensorException(e, sys) from e
@@ -0,0 +1,96 @@
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from scipy.stats import ks_2samp
+
+from sensor.exception import SensorException
+from sensor.logger import logging
+
+
+class KSDriftDetector:
+    """
+    This class is used to run the two sample Kolmogorov-Smirnov test on every column of two datasets.
+    Columns are tested in blocks on a thread pool (the sorts of the test release the GIL), can be
+    subsampled to a fixed size with a seed per column, and the test can stop as soon as more columns
+    drifted than the failure budget allows.
+    """
+    def __init__(self, p_value_threshold: float = 0.5, max_workers: int = 4, block_size: int = 16, sample_size: Optional[int] = None, seed: int = 42, max_drifted_columns: int = 0, early_stop: bool = False):
+        self.p_value_threshold = p_value_threshold
+        self.max_workers = max(1, max_workers)
+        self.block_size = max(1, block_size)
+        self.sample_size = sample_size
+        self.seed = seed
+        self.max_drifted_columns = max_drifted_columns
+        self.early_stop = early_stop
+
+    def _sample(self, values: np.ndarray, column_index: int, role: int) -> np.ndarray:
+        """
+        This method is used to drop the missing values of a column and subsample it. The seed depends on
+        the column only, so the sample does not depend on the block or the thread which tests it.
+        """
+        values = values[~np.isnan(values)]
+        if self.sample_size and len(values) > self.sample_size:
+            rng = np.random.default_rng([self.seed, column_index, role])
+            values = values[rng.choice(len(values), size=self.sample_size, replace=False)]
+        return values
+
+    def _test_column(self, base_df: pd.DataFrame, current_df: pd.DataFrame, column: str, column_index: int) -> dict:
+        """
+        This method is used to test one column, a column without values in one of the datasets can not
+        be compared and is not counted as drift.
+        """
+        # values which are not numbers (like "na") are missing values.
+        d1 = self._sample(pd.to_numeric(base_df[column], errors="coerce").to_numpy(dtype=np.float64), column_index, 0)
+        d2 = self._sample(pd.to_numeric(current_df[column], errors="coerce").to_numpy(dtype=np.float64), column_index, 1)
+        if len(d1) == 0 or len(d2) == 0:
+            return {"p_value": None, "drift_status": False}
+        p_value = float(ks_2samp(d1, d2).pvalue)
+        return {"p_value": p_value, "drift_status": bool(p_value < self.p_value_threshold)}
+
+    def detect(self, base_df: pd.DataFrame, current_df: pd.DataFrame, columns: List[str]) -> Tuple[bool, Dict[str, dict]]:
+        """
+        This method is used to test every column for drift between the base and the current dataset.
+
+        Args:
+            base_df (pd.DataFrame): base dataset.
+            current_df (pd.DataFrame): current dataset.
+            columns (List[str]): numerical columns to test.
+
+        Raises:
+            SensorException: raises the exception error.
+
+        Returns:
+            Tuple[bool, Dict[str, dict]]: True when no more columns drifted than the failure budget, and the
+                p value and drift status of every tested column (in column order, without the columns
+                skipped by an early stop).
+        """
+        try:
+            report = {}
+            n_drifted = 0
+            lock = threading.Lock()
+            stop = threading.Event()
+
+            def test_block(start: int):
+                nonlocal n_drifted
+                for column_index in range(start, min(start + self.block_size, len(columns))):
+                    # the other blocks stop after their current column once the failure budget is exceeded.
+                    if stop.is_set():
+                        return
+                    column_report = self._test_column(base_df, current_df, columns[column_index], column_index)
+                    with lock:
+                        report[columns[column_index]] = column_report
+                        n_drifted += column_report["drift_status"]
+                        if self.early_stop and n_drifted > self.max_drifted_columns and not stop.is_set():
+                            logging.info(f"{n_drifted} drifted columns exceed the budget of {self.max_drifted_columns}, stopping the drift test")
+                            stop.set()
+
+            with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="drift") as executor:
+                for future in [executor.submit(test_block, start) for start in range(0, len(columns), self.block_size)]:
+                    future.result()
+            return n_drifted <= self.max_drifted_columns, {column: report[column] for column in columns if column in report}
+        except Exception as e:
+            raise SensorException(e, sys) from e
@@ -0,0 +1,27 @@
+from typing import List
+
+import numpy as np
+import pandas as pd
+from sklearn.base import BaseEstimator, TransformerMixin
+
+
+class ColumnSelector(BaseEstimator, TransformerMixin):
+    """
+    First step of the preprocessor: keeps only the selected columns, so the columns pruned at
+    ingestion are skipped by the imputer, the scaler and the model at training and at inference.
+    Dataframes are selected by name, arrays are expected in the order of `columns` (the order the
+    serving path coerces requests into).
+    """
+    def __init__(self, columns: List[str], selected_columns: List[str]):
+        self.columns = columns
+        self.selected_columns = selected_columns
+
+    def fit(self, x, y=None):
+        column_index = {column: index for index, column in enumerate(self.columns)}
+        self.selected_index_ = np.array([column_index[column] for column in self.selected_columns], dtype=np.intp)
+        return self
+
+    def transform(self, x):
+        if isinstance(x, pd.DataFrame):
+            return x[self.selected_columns].to_numpy()
+        return np.asarray(x)[:, self.selected_index_]
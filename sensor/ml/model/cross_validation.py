@@ -0,0 +1,131 @@
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+import numpy as np
+from imblearn.combine import SMOTETomek
+from sklearn.metrics import f1_score
+from sklearn.model_selection import StratifiedKFold
+from xgboost import XGBClassifier
+
+from sensor.entity.artifact_entity import CrossValidationMetricArtifact
+from sensor.exception import SensorException
+from sensor.logger import logging
+from sensor.ml.metric.decision_threshold import get_cost_optimal_threshold
+from sensor.utils.compression import get_file_codec
+from sensor.utils.main_utils import load_numpy_array_data, save_numpy_array_data
+
+
+def train_fold(train_file_path: str, folds_file_path: str, fold: int, n_threads: int, target_dtype: str, false_positive_cost: float, false_negative_cost: float, seed: int = 42) -> dict:
+    """
+    This function is used to train the model on every fold but one and score it on the held out fold.
+    It runs in a worker process: the training array is memory mapped, so the workers share the pages
+    of one file instead of receiving a pickled copy of the data. Only the training folds are resampled
+    like the train split of DataTransformation, the held out fold keeps the real class ratio.
+
+    Returns:
+        dict: fold, train and validation f1 score and the lowest misclassification cost on the held out fold.
+    """
+    train_arr = np.load(train_file_path, mmap_mode="r")
+    is_validation = np.load(folds_file_path) == fold
+    x_train, y_train = train_arr[~is_validation, :-1], train_arr[~is_validation, -1].astype(target_dtype)
+    x_validation, y_validation = train_arr[is_validation, :-1], train_arr[is_validation, -1].astype(target_dtype)
+    # resampled after the split, a synthetic row is never made from a row of the held out fold.
+    x_train, y_train = SMOTETomek(sampling_strategy="minority", random_state=seed + fold).fit_resample(x_train, y_train)
+    x_train = x_train.astype(train_arr.dtype, copy=False)
+    # same classifier as ModelTrainer.train_model, its threads are limited to the share of cores of this process.
+    model = XGBClassifier(n_jobs=n_threads)
+    model.fit(x_train, y_train)
+    y_validation_score = model.predict_proba(x_validation)[:, 1]
+    _, cost = get_cost_optimal_threshold(y_true=y_validation, y_score=y_validation_score, false_positive_cost=false_positive_cost, false_negative_cost=false_negative_cost)
+    return {
+        "fold": fold,
+        "train_f1_score": float(f1_score(y_train, model.predict(x_train))),
+        "f1_score": float(f1_score(y_validation, model.predict(x_validation))),
+        "cost": cost,
+    }
+
+
+class CrossValidator:
+    """
+    This class is used to cross validate the model with stratified k folds trained concurrently in a
+    process pool. The folds are assigned over the train rows before resampling and every worker resamples
+    its training folds only. The workers get the path of the training array and of the fold of every row,
+    never the arrays themselves, and split the cores between them so XGBoost does not oversubscribe.
+    """
+    def __init__(self, n_folds: int, false_positive_cost: float, false_negative_cost: float, seed: int = 42, max_workers: Optional[int] = None):
+        if n_folds < 2:
+            raise ValueError(f"Cross validation needs at least 2 folds, got {n_folds}")
+        self.n_folds = n_folds
+        self.false_positive_cost = false_positive_cost
+        self.false_negative_cost = false_negative_cost
+        self.seed = seed
+        n_cores = os.cpu_count() or 1
+        self.max_workers = min(max_workers or n_cores, n_folds)
+        self.n_threads = max(1, n_cores // self.max_workers)
+
+    def assign_folds(self, y) -> np.ndarray:
+        """
+        This method is used to get the fold of every row, every fold keeps the class ratio.
+
+        Args:
+            y (numerical): labels of the rows.
+
+        Returns:
+            np.ndarray: fold of every row.
+        """
+        folds = np.empty(len(y), dtype=np.int8)
+        k_fold = StratifiedKFold(n_splits=self.n_folds, shuffle=True, random_state=self.seed)
+        for fold, (_, validation_index) in enumerate(k_fold.split(np.zeros(len(y)), y)):
+            folds[validation_index] = fold
+        return folds
+
+    def cross_validate(self, train_file_path: str, folds_file_path: str, target_dtype) -> CrossValidationMetricArtifact:
+        """
+        This method is used to train and score the model on every fold and aggregate the fold metrics.
+
+        Args:
+            train_file_path (str): numpy file of the train rows before resampling, with the target as last column.
+            folds_file_path (str): numpy file where the fold of every row is written.
+            target_dtype: dtype of the target.
+
+        Raises:
+            SensorException: raises the exception error.
+
+        Returns:
+            CrossValidationMetricArtifact: mean and standard deviation of the fold metrics.
+        """
+        try:
+            if get_file_codec(train_file_path) is not None:
+                # a compressed array can not be memory mapped, the workers share an uncompressed copy.
+                memory_mapped_file_path = os.path.join(os.path.dirname(folds_file_path), os.path.basename(train_file_path))
+                logging.info(f"{train_file_path} is compressed, writing an uncompressed copy to {memory_mapped_file_path}")
+                save_numpy_array_data(memory_mapped_file_path, load_numpy_array_data(train_file_path))
+                train_file_path = memory_mapped_file_path
+            train_arr = np.load(train_file_path, mmap_mode="r")
+            save_numpy_array_data(folds_file_path, self.assign_folds(np.asarray(train_arr[:, -1]).astype(target_dtype)))
+            del train_arr
+            logging.info(f"Cross validating {self.n_folds} folds in {self.max_workers} processes with {self.n_threads} threads each")
+            # workers are spawned, forking the multi threaded pipeline process could deadlock them.
+            with ProcessPoolExecutor(max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+                futures = [
+                    executor.submit(train_fold, train_file_path, folds_file_path, fold, self.n_threads, np.dtype(target_dtype).name, self.false_positive_cost, self.false_negative_cost, self.seed)
+                    for fold in range(self.n_folds)
+                ]
+                fold_metrics = [future.result() for future in futures]
+            logging.info(f"Cross validation fold metrics: {fold_metrics}")
+            f1_scores = np.array([metrics["f1_score"] for metrics in fold_metrics])
+            costs = np.array([metrics["cost"] for metrics in fold_metrics])
+            return CrossValidationMetricArtifact(
+                n_folds=self.n_folds,
+                train_f1_score_mean=float(np.mean([metrics["train_f1_score"] for metrics in fold_metrics])),
+                f1_score_mean=float(f1_scores.mean()),
+                f1_score_std=float(f1_scores.std()),
+                cost_mean=float(costs.mean()),
+                cost_std=float(costs.std()),
+                fold_f1_scores=f1_scores.tolist(),
+            )
+        except Exception as e:
+            raise SensorException(e, sys) from e
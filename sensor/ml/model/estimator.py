@@ -1,5 +1,8 @@
 import os
 
+import numpy as np
+import pandas as pd
+
 from sensor.constant.training_pipeline import SAVED_MODEL_DIR, MODEL_FILE_NAME
 
 
@@ -19,19 +22,77 @@ class TargetValueMapping:
 
         return dict(zip(mapping_response.values(), mapping_response.keys()))
 
+    def encode(self, labels, dtype=np.int8) -> np.ndarray:
+        """
+        This method is used to encode the labels of the target column into target values in one pass:
+        the labels become categorical codes of the known labels and the codes are looked up in an array
+        of the target values.
+
+        Args:
+            labels (array like): labels of the target column, objects or categorical.
+            dtype (np.dtype, optional): dtype of the target values. Defaults to np.int8.
+
+        Raises:
+            ValueError: when a label is missing or unknown.
+
+        Returns:
+            np.ndarray: target value of every label.
+        """
+        mapping = self.to_dict()
+        codes = pd.Categorical(labels, categories=list(mapping.keys())).codes
+        if len(codes) and codes.min() < 0:
+            unknown_labels = pd.unique(np.asarray(labels, dtype=object)[codes < 0])
+            raise ValueError(f"Unknown target labels: {list(unknown_labels[:5])}")
+        return np.asarray(list(mapping.values()), dtype=dtype)[codes]
+
+    def decode(self, target_values) -> np.ndarray:
+        """
+        This method is used to decode target values (like predicted labels) into the labels of the target column.
+
+        Args:
+            target_values (array like): target values.
+
+        Returns:
+            np.ndarray: label of every target value.
+        """
+        reverse_mapping = self.reverse_mapping()
+        labels = np.empty(max(reverse_mapping) + 1, dtype=object)
+        for target_value, label in reverse_mapping.items():
+            labels[target_value] = label
+        return labels[np.asarray(target_values, dtype=np.intp)]
+
 class SensorModel:
-    def __init__(self, preprocessor, model):
+    # models saved before the threshold was stored use the default cut-off of the classifier.
+    decision_threshold: float = 0.5
+
+    def __init__(self, preprocessor, model, decision_threshold: float = 0.5):
         try:
             self.preprocessor = preprocessor
             self.model = model
+            # a truck is predicted as an APS failure when its probability is >= decision_threshold.
+            self.decision_threshold = decision_threshold
         except Exception as e:
             raise e
 
-    def predict(self,x):
+    def predict_proba(self, x):
+        """
+        This method is used to get the probability of the positive class (APS failure) of every row.
+        """
         try:
             x_transform = self.preprocessor.transform(x)
-            y_hat = self.model.predict(x_transform)
-            return y_hat
+            return self.model.predict_proba(x_transform)[:, 1]
+        except Exception as e:
+            raise e
+
+    def apply_threshold(self, y_score):
+        """
+        This method is used to turn probabilities into labels with the decision threshold, without calling the model again.
+        """
+        return (np.asarray(y_score) >= self.decision_threshold).astype(np.int8)
+
+    def predict(self,x):
+        try:
+            return self.apply_threshold(self.predict_proba(x))
         except Exception as e:
             raise e
 
@@ -0,0 +1,128 @@
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set
+
+import numpy as np
+import pandas as pd
+
+# distinct values are only counted up to this number, beyond it a column is just "high cardinality".
+CARDINALITY_CAP = 64
+
+
+@dataclass
+class ColumnProfile:
+    """
+    Null rate, variance and capped cardinality of numerical columns, computed in one vectorised
+    pass per chunk. Profiles of chunks are merged with the parallel variance formula, so the
+    profile of a dataset never needs the dataset in memory.
+    """
+    columns: List[str]
+    n_rows: int
+    null_counts: np.ndarray
+    means: np.ndarray
+    # sum of the squared differences from the mean of every column.
+    m2: np.ndarray
+    # distinct values of every column, None once the column has more than the cardinality cap.
+    distinct_values: List[Optional[Set[float]]]
+    cardinality_cap: int = CARDINALITY_CAP
+
+    @classmethod
+    def from_dataframe(cls, dataframe: pd.DataFrame, columns: List[str], cardinality_cap: int = CARDINALITY_CAP) -> "ColumnProfile":
+        """
+        This method is used to profile the given columns of a dataframe (or of a chunk of it).
+
+        Args:
+            dataframe (pd.DataFrame): records.
+            columns (List[str]): numerical columns to profile.
+            cardinality_cap (int, optional): maximum number of distinct values counted. Defaults to CARDINALITY_CAP.
+
+        Returns:
+            ColumnProfile: profile of the columns.
+        """
+        values = dataframe.reindex(columns=columns).apply(pd.to_numeric, errors="coerce").to_numpy(dtype="float64")
+        is_null = np.isnan(values)
+        counts = (~is_null).sum(axis=0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            sums = np.nansum(values, axis=0)
+            means = np.where(counts > 0, sums / np.maximum(counts, 1), 0.0)
+            m2 = np.nansum((values - means) ** 2, axis=0)
+        # distinct values of every column are counted at once on the sorted values (nan sorts last and never differs),
+        # the values themselves are only kept for the columns under the cap.
+        sorted_values = np.sort(values, axis=0)
+        with np.errstate(invalid="ignore"):
+            n_distinct = (counts > 0) + (np.diff(sorted_values, axis=0) > 0).sum(axis=0)
+        distinct_values = [
+            set(np.unique(sorted_values[:counts[index], index]).tolist()) if n_distinct[index] <= cardinality_cap else None
+            for index in range(len(columns))
+        ]
+        return cls(columns=list(columns), n_rows=len(values), null_counts=is_null.sum(axis=0), means=means, m2=m2, distinct_values=distinct_values, cardinality_cap=cardinality_cap)
+
+    def merge(self, other: "ColumnProfile") -> "ColumnProfile":
+        """
+        This method is used to merge the profile of the next chunk into this profile.
+
+        Args:
+            other (ColumnProfile): profile of the same columns on other records.
+
+        Returns:
+            ColumnProfile: profile of the records of both.
+        """
+        count_a, count_b = self.n_rows - self.null_counts, other.n_rows - other.null_counts
+        count = count_a + count_b
+        delta = other.means - self.means
+        with np.errstate(invalid="ignore", divide="ignore"):
+            means = np.where(count > 0, self.means + delta * count_b / np.maximum(count, 1), 0.0)
+            m2 = self.m2 + other.m2 + np.where(count > 0, delta ** 2 * count_a * count_b / np.maximum(count, 1), 0.0)
+        distinct_values = []
+        for distinct_a, distinct_b in zip(self.distinct_values, other.distinct_values):
+            distinct = distinct_a | distinct_b if distinct_a is not None and distinct_b is not None else None
+            distinct_values.append(distinct if distinct is not None and len(distinct) <= self.cardinality_cap else None)
+        return ColumnProfile(columns=self.columns, n_rows=self.n_rows + other.n_rows, null_counts=self.null_counts + other.null_counts, means=means, m2=m2, distinct_values=distinct_values, cardinality_cap=self.cardinality_cap)
+
+    @property
+    def null_rates(self) -> np.ndarray:
+        return self.null_counts / self.n_rows if self.n_rows else np.zeros(len(self.columns))
+
+    @property
+    def variances(self) -> np.ndarray:
+        # population variance of the non null values, 0 for a column without values.
+        counts = self.n_rows - self.null_counts
+        return np.where(counts > 0, self.m2 / np.maximum(counts, 1), 0.0)
+
+    @property
+    def cardinalities(self) -> List[Optional[int]]:
+        # None means more distinct values than the cardinality cap.
+        return [len(distinct) if distinct is not None else None for distinct in self.distinct_values]
+
+    def prune_columns(self, max_null_rate: float, min_variance: float) -> Dict[str, str]:
+        """
+        This method is used to get the columns which carry too little information to be used as features.
+
+        Args:
+            max_null_rate (float): columns with a higher ratio of missing values are pruned.
+            min_variance (float): columns with this variance or less are pruned.
+
+        Returns:
+            Dict[str, str]: pruned column and the reason it was pruned.
+        """
+        pruned_columns = {}
+        for column, null_rate, variance, cardinality in zip(self.columns, self.null_rates, self.variances, self.cardinalities):
+            if null_rate > max_null_rate:
+                pruned_columns[column] = f"null rate {null_rate:.3f} > {max_null_rate}"
+            elif cardinality is not None and cardinality <= 1:
+                pruned_columns[column] = "constant"
+            elif variance <= min_variance:
+                pruned_columns[column] = f"variance {variance:.6g} <= {min_variance}"
+        return pruned_columns
+
+    def to_report(self) -> Dict[str, dict]:
+        """
+        This method is used to get the profile as a yaml friendly report.
+        """
+        return {
+            column: {
+                "null_rate": round(float(null_rate), 6),
+                "variance": float(variance),
+                "cardinality": cardinality if cardinality is not None else f">{self.cardinality_cap}",
+            }
+            for column, null_rate, variance, cardinality in zip(self.columns, self.null_rates, self.variances, self.cardinalities)
+        }
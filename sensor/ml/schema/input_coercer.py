@@ -0,0 +1,200 @@
+import csv
+import io
+import sys
+from dataclasses import dataclass, field
+from operator import itemgetter
+from typing import Any, Dict, Iterable, List, Mapping, Sequence
+
+import numpy as np
+
+from sensor.exception import SensorException
+from sensor.ml.schema.schema_validator import CompiledSchema
+
+# raw values which are parsed as missing values.
+NULL_VALUES = frozenset(["na", "NA", "nan", "NaN", ""])
+
+
+@dataclass
+class CoercedBatch:
+    """
+    Rows of a request coerced into a float32 matrix in training column order.
+    """
+    # float32 matrix of the accepted rows.
+    features: np.ndarray
+    # position of every accepted row in the request.
+    row_ids: np.ndarray
+    # error message of every rejected row, keyed by its position in the request.
+    row_errors: Dict[int, str] = field(default_factory=dict)
+
+    def __len__(self) -> int:
+        return len(self.row_ids)
+
+
+class InputCoercer:
+    """
+    This class is used to validate and coerce the incoming rows of the serving path into a
+    preallocated matrix of the feature dtype of the schema (float32) in training column order
+    without creating a dataframe.
+    """
+    def __init__(self, schema: CompiledSchema):
+        try:
+            self.feature_columns: List[str] = list(schema.numerical_columns)
+            self.n_features: int = len(self.feature_columns)
+            self.feature_dtype: np.dtype = schema.feature_dtype
+            self.min_values = schema.min_values.astype(self.feature_dtype)
+            self.max_values = schema.max_values.astype(self.feature_dtype)
+        except Exception as e:
+            raise SensorException(e, sys) from e
+
+    def _column_positions(self, header: Sequence[str]) -> List[int]:
+        """
+        This method is used to map the header of the request to the positions of the training columns.
+
+        Args:
+            header (Sequence[str]): column names of the request.
+
+        Raises:
+            Exception: when the request does not contain every training column.
+
+        Returns:
+            List[int]: position of every training column in the request.
+        """
+        header_positions = {name.strip(): position for position, name in enumerate(header)}
+        missing_columns = [column for column in self.feature_columns if column not in header_positions]
+        if missing_columns:
+            raise Exception(f"Request does not contain the columns: {missing_columns}")
+        return [header_positions[column] for column in self.feature_columns]
+
+    def _parse_row(self, values: Sequence[Any], row: np.ndarray) -> str:
+        """
+        This method is used to parse one row value by value, it is only used when the fast path fails.
+
+        Returns:
+            str: error message of the row, empty when the row is valid.
+        """
+        invalid_columns = []
+        for position, value in enumerate(values):
+            if value is None or (isinstance(value, str) and value.strip() in NULL_VALUES):
+                row[position] = np.nan
+                continue
+            try:
+                row[position] = float(value)
+            except (TypeError, ValueError):
+                invalid_columns.append(self.feature_columns[position])
+        if invalid_columns:
+            return f"non numeric values in columns: {invalid_columns}"
+        return ""
+
+    def _coerce(self, rows: List[Sequence[Any]]) -> CoercedBatch:
+        """
+        This method is used to fill the preallocated matrix with rows already ordered as the training columns.
+
+        Args:
+            rows (List[Sequence[Any]]): values of every row in training column order.
+
+        Returns:
+            CoercedBatch: accepted rows and errors of the rejected rows.
+        """
+        n_rows = len(rows)
+        features = np.empty((n_rows, self.n_features), dtype=self.feature_dtype)
+        row_ids = np.empty(n_rows, dtype=np.int64)
+        row_errors: Dict[int, str] = {}
+        n_valid = 0
+        for row_id, values in enumerate(rows):
+            if len(values) != self.n_features:
+                row_errors[row_id] = f"expected {self.n_features} values but got {len(values)}"
+                continue
+            try:
+                # fast path: numpy parses numbers and numeric strings directly into the float32 row.
+                features[n_valid] = [np.nan if value is None or value in NULL_VALUES else value for value in values]
+            except (TypeError, ValueError):
+                error = self._parse_row(values, features[n_valid])
+                if error:
+                    row_errors[row_id] = error
+                    continue
+            row_ids[n_valid] = row_id
+            n_valid += 1
+        features, row_ids = features[:n_valid], row_ids[:n_valid]
+
+        # range check of every accepted row in one pass, comparisons with NaN are False so missing values pass.
+        # ±inf is rejected on its own, it would pass the range check of a column without a minimum or maximum.
+        non_finite = np.isinf(features)
+        out_of_range = ~non_finite & ((features < self.min_values) | (features > self.max_values))
+        rejected = (non_finite | out_of_range).any(axis=1)
+        if rejected.any():
+            for row_id, row_non_finite, row_out_of_range in zip(row_ids[rejected].tolist(), non_finite[rejected], out_of_range[rejected]):
+                errors = []
+                if row_non_finite.any():
+                    errors.append(f"non finite values in columns: {[self.feature_columns[position] for position in np.flatnonzero(row_non_finite)]}")
+                if row_out_of_range.any():
+                    errors.append(f"values out of range in columns: {[self.feature_columns[position] for position in np.flatnonzero(row_out_of_range)]}")
+                row_errors[row_id] = "; ".join(errors)
+            features, row_ids = features[~rejected], row_ids[~rejected]
+        return CoercedBatch(features=features, row_ids=row_ids, row_errors=row_errors)
+
+    def coerce_rows(self, header: Sequence[str], rows: Iterable[Sequence[Any]]) -> CoercedBatch:
+        """
+        This method is used to coerce rows which share one header, extra columns are ignored.
+
+        Args:
+            header (Sequence[str]): column names of the rows.
+            rows (Iterable[Sequence[Any]]): values of every row.
+
+        Raises:
+            SensorException: raises the exception error.
+
+        Returns:
+            CoercedBatch: accepted rows and errors of the rejected rows.
+        """
+        try:
+            positions = self._column_positions(header)
+            header_length = len(header)
+            getter = itemgetter(*positions)
+            ordered_rows: List[Sequence[Any]] = []
+            for values in rows:
+                # short rows can not be reordered, they are rejected with a length error.
+                ordered_rows.append(getter(values) if len(values) == header_length else values)
+            return self._coerce(ordered_rows)
+        except Exception as e:
+            raise SensorException(e, sys) from e
+
+    def coerce_records(self, records: Iterable[Mapping[str, Any]]) -> CoercedBatch:
+        """
+        This method is used to coerce json like records, missing keys are treated as missing values.
+
+        Args:
+            records (Iterable[Mapping[str, Any]]): records of the request.
+
+        Raises:
+            SensorException: raises the exception error.
+
+        Returns:
+            CoercedBatch: accepted rows and errors of the rejected rows.
+        """
+        try:
+            columns = self.feature_columns
+            return self._coerce([[record.get(column) for column in columns] for record in records])
+        except Exception as e:
+            raise SensorException(e, sys) from e
+
+    def coerce_csv(self, text: str) -> CoercedBatch:
+        """
+        This method is used to coerce the csv text of a request, the first line is the header.
+
+        Args:
+            text (str): csv text.
+
+        Raises:
+            SensorException: raises the exception error.
+
+        Returns:
+            CoercedBatch: accepted rows and errors of the rejected rows.
+        """
+        try:
+            reader = csv.reader(io.StringIO(text))
+            header = next(reader, None)
+            if header is None:
+                raise Exception("Request does not contain a csv header")
+            return self.coerce_rows(header, [row for row in reader if row])
+        except Exception as e:
+            raise SensorException(e, sys) from e
@@ -0,0 +1,183 @@
+import sys
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+from sensor.constant.training_pipeline import SCHEMA_FILE_PATH, TARGET_COLUMN
+from sensor.exception import SensorException
+from sensor.ml.model.estimator import TargetValueMapping
+from sensor.utils.main_utils import read_yaml_file
+
+# string tokens which are treated as missing values in the raw sensor data.
+NULL_TOKENS = ("na",)
+
+
+@dataclass
+class SchemaValidationResult:
+    """
+    Result of validating a dataframe (or a chunk of it) against the compiled schema.
+    """
+    n_rows: int
+    missing_columns: List[str]
+    unexpected_columns: List[str]
+    invalid_row_mask: np.ndarray
+    null_counts: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def n_invalid_rows(self) -> int:
+        return int(self.invalid_row_mask.sum())
+
+    def columns_over_null_budget(self, null_budget: float) -> List[str]:
+        """
+        This method is used to get the columns whose null ratio is greater than the null budget.
+
+        Args:
+            null_budget (float): maximum allowed ratio of null values in a column.
+
+        Returns:
+            List[str]: columns exceeding the null budget.
+        """
+        if self.n_rows == 0:
+            return []
+        return [column for column, count in self.null_counts.items() if count / self.n_rows > null_budget]
+
+    def merge(self, other: "SchemaValidationResult") -> "SchemaValidationResult":
+        """
+        This method is used to merge the result of the next chunk into this result.
+
+        Args:
+            other (SchemaValidationResult): result of the next chunk.
+
+        Returns:
+            SchemaValidationResult: combined result.
+        """
+        null_counts = dict(self.null_counts)
+        for column, count in other.null_counts.items():
+            null_counts[column] = null_counts.get(column, 0) + count
+        return SchemaValidationResult(
+            n_rows=self.n_rows + other.n_rows,
+            missing_columns=sorted(set(self.missing_columns) | set(other.missing_columns)),
+            unexpected_columns=sorted(set(self.unexpected_columns) | set(other.unexpected_columns)),
+            invalid_row_mask=np.concatenate([self.invalid_row_mask, other.invalid_row_mask]),
+            null_counts=null_counts,
+        )
+
+
+class CompiledSchema:
+    """
+    This class is used to compile the schema.yaml file once into column indexes, dtypes,
+    allowed ranges and null budgets so that the validation runs in one vectorised pass.
+    """
+    def __init__(self, schema_config: dict):
+        try:
+            self.schema_config = schema_config
+            # every column entry is a single {name: dtype} mapping, keeping the order of the file.
+            columns = [next(iter(column.items())) for column in schema_config["columns"]]
+            self.column_names: List[str] = [name for name, _ in columns]
+            self.column_dtypes: Dict[str, str] = dict(columns)
+            self.numerical_columns: List[str] = list(schema_config["numerical_columns"])
+            self.drop_columns: List[str] = list(schema_config.get("drop_columns", []))
+            self.categorical_columns: List[str] = [name for name, dtype in columns if dtype == "category"]
+            self.column_index = pd.Index(self.column_names)
+            self.numerical_index = pd.Index(self.numerical_columns)
+            # allowed value range of every numerical column, per column overrides the default range.
+            default_range = schema_config.get("numerical_range", {}) or {}
+            column_ranges = schema_config.get("column_ranges", {}) or {}
+            self.min_values = np.array([self._range_bound(column_ranges.get(column, default_range), "min", -np.inf) for column in self.numerical_columns], dtype=np.float64)
+            self.max_values = np.array([self._range_bound(column_ranges.get(column, default_range), "max", np.inf) for column in self.numerical_columns], dtype=np.float64)
+            # maximum ratio of null values which is allowed in a column.
+            self.null_budget: float = float(schema_config.get("null_budget", 1.0))
+            # dtypes of the features and of the encoded target, float64 and int64 when the schema has no policy.
+            dtype_policy = schema_config.get("dtype_policy", {}) or {}
+            self.feature_dtype: np.dtype = np.dtype(dtype_policy.get("features", "float64"))
+            self.target_dtype: np.dtype = np.dtype(dtype_policy.get("target", "int64"))
+            # the target column can only contain the labels known by the TargetValueMapping.
+            self.allowed_categories: Dict[str, List[str]] = {TARGET_COLUMN: list(TargetValueMapping().to_dict().keys())}
+        except Exception as e:
+            raise SensorException(e, sys) from e
+
+    @staticmethod
+    def _range_bound(column_range: dict, key: str, default: float) -> float:
+        value = column_range.get(key)
+        return default if value is None else float(value)
+
+    @property
+    def n_columns(self) -> int:
+        return len(self.column_names)
+
+    @property
+    def read_dtypes(self) -> Dict[str, np.dtype]:
+        """
+        dtype of every numerical column for pd.read_csv, so validated files are parsed straight into the feature dtype.
+        """
+        return {column: self.feature_dtype for column in self.numerical_columns}
+
+    def validate(self, dataframe: pd.DataFrame) -> SchemaValidationResult:
+        """
+        This method is used to validate the whole dataframe (or a chunk of it) in one vectorised pass.
+        A row is invalid when a numerical value is not a number, a value is out of the allowed
+        range or a categorical value is unknown.
+
+        Args:
+            dataframe (pd.DataFrame): dataframe
+
+        Raises:
+            SensorException: raises the exception error.
+
+        Returns:
+            SchemaValidationResult: result of the validation.
+        """
+        try:
+            n_rows = len(dataframe)
+            missing_columns = self.column_index.difference(dataframe.columns).to_list()
+            unexpected_columns = dataframe.columns.difference(self.column_index).to_list()
+            invalid_row_mask = np.zeros(n_rows, dtype=bool)
+            null_counts: Dict[str, int] = {}
+
+            # numerical columns which are available in the dataframe, in schema order.
+            present_numerical = self.numerical_index.intersection(dataframe.columns, sort=False)
+            if len(present_numerical) > 0:
+                numerical_df = dataframe[present_numerical]
+                is_null = numerical_df.isna().to_numpy()
+                # only non numeric columns need coercion, numeric columns are used as they are.
+                object_columns = [column for column in present_numerical if not pd.api.types.is_numeric_dtype(numerical_df[column])]
+                if object_columns:
+                    numerical_df = numerical_df.copy()
+                    object_values = numerical_df[object_columns]
+                    is_null[:, present_numerical.get_indexer(object_columns)] |= object_values.isin(NULL_TOKENS).to_numpy()
+                    numerical_df[object_columns] = object_values.apply(pd.to_numeric, errors="coerce")
+                values = numerical_df.to_numpy(dtype=np.float64, na_value=np.nan)
+                # values which were present but could not be converted into a finite number, ±inf would pass an unbounded range.
+                non_numeric = ~np.isfinite(values) & ~is_null
+                # comparisons with NaN are False, so missing values never fail the range check.
+                column_positions = self.numerical_index.get_indexer(present_numerical)
+                with np.errstate(invalid="ignore"):
+                    out_of_range = (values < self.min_values[column_positions]) | (values > self.max_values[column_positions])
+                invalid_row_mask |= (non_numeric | out_of_range).any(axis=1)
+                null_counts = dict(zip(present_numerical, is_null.sum(axis=0).tolist()))
+
+            # categorical columns can only contain the allowed categories.
+            for column, categories in self.allowed_categories.items():
+                if column in dataframe.columns:
+                    invalid_row_mask |= ~dataframe[column].isin(categories).to_numpy()
+
+            return SchemaValidationResult(n_rows=n_rows, missing_columns=missing_columns, unexpected_columns=unexpected_columns, invalid_row_mask=invalid_row_mask, null_counts=null_counts)
+        except Exception as e:
+            raise SensorException(e, sys) from e
+
+
+@lru_cache(maxsize=None)
+def get_compiled_schema(file_path: str = SCHEMA_FILE_PATH) -> CompiledSchema:
+    """
+    This function is used to load and compile the schema file only once per process.
+
+    Args:
+        file_path (str, optional): path of the schema file. Defaults to SCHEMA_FILE_PATH.
+
+    Returns:
+        CompiledSchema: compiled schema.
+    """
+    return CompiledSchema(read_yaml_file(file_path))
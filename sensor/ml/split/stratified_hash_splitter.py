@@ -0,0 +1,107 @@
+import hashlib
+import os
+import sys
+from typing import Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from sensor.constant.training_pipeline import TARGET_COLUMN
+from sensor.exception import SensorException
+from sensor.logger import logging
+
+# the 64 bit row hashes are mapped into [0, 1) to be compared with the test ratio.
+HASH_SCALE = float(2 ** 64)
+
+
+class StratifiedHashSplitter:
+    """
+    This class is used to split records into train and test sets chunk by chunk. Every row is
+    assigned by hashing its values with a key derived from the seed and its class, so each class
+    is split at the test ratio independently of the others (stratified), the same row always lands
+    in the same set whatever the chunking or the order of the records, and duplicated rows can not
+    leak between train and test.
+    """
+    def __init__(self, test_ratio: float, seed: int, target_column: str = TARGET_COLUMN):
+        self.test_ratio = test_ratio
+        self.seed = seed
+        self.target_column = target_column
+        self._hash_keys: Dict[str, str] = {}
+
+    def get_hash_key(self, label) -> str:
+        """
+        This method is used to get the 16 character hash key of one class.
+        """
+        label = str(label)
+        if label not in self._hash_keys:
+            self._hash_keys[label] = hashlib.blake2b(f"{self.seed}:{label}".encode("utf-8"), digest_size=8).hexdigest()
+        return self._hash_keys[label]
+
+    def assign_test(self, dataframe: pd.DataFrame) -> np.ndarray:
+        """
+        This method is used to get which rows of a chunk belong to the test set.
+
+        Args:
+            dataframe (pd.DataFrame): chunk of records with the target column.
+
+        Returns:
+            np.ndarray: boolean mask of the test rows.
+        """
+        # values are hashed as float64 so that a column read as int in one chunk and as float in another hashes the same.
+        features = dataframe.drop(columns=[self.target_column]).apply(pd.to_numeric, errors="coerce").astype("float64")
+        labels = dataframe[self.target_column].astype(str).to_numpy()
+        is_test = np.zeros(len(dataframe), dtype=bool)
+        for label in np.unique(labels):
+            class_mask = labels == label
+            row_hashes = pd.util.hash_pandas_object(features[class_mask], index=False, hash_key=self.get_hash_key(label)).to_numpy()
+            is_test[class_mask] = row_hashes / HASH_SCALE < self.test_ratio
+        return is_test
+
+    def split_to_csv(self, chunks: Iterable[pd.DataFrame], train_file_path: str, test_file_path: str, train_chunk_callback: Optional[Callable[[pd.DataFrame], None]] = None) -> Dict[str, Dict[str, int]]:
+        """
+        This method is used to split a stream of chunks and append every chunk directly to the train
+        and test files, so the full dataset is never held in memory.
+
+        Args:
+            chunks (Iterable[pd.DataFrame]): chunks of records.
+            train_file_path (str): path of the train csv file.
+            test_file_path (str): path of the test csv file.
+            train_chunk_callback (Optional[Callable], optional): called with the train rows of every chunk. Defaults to None.
+
+        Raises:
+            SensorException: raises the exception error.
+
+        Returns:
+            Dict[str, Dict[str, int]]: number of rows of every class in the train and test sets.
+        """
+        try:
+            for file_path in (train_file_path, test_file_path):
+                os.makedirs(os.path.dirname(file_path) or ".", exist_ok=True)
+            class_counts = {"train": {}, "test": {}}
+            columns: Optional[List[str]] = None
+            for chunk in chunks:
+                if len(chunk) == 0:
+                    continue
+                # every chunk is written in the column order of the first one.
+                if columns is None:
+                    columns = chunk.columns.to_list()
+                else:
+                    chunk = chunk.reindex(columns=columns)
+                is_test = self.assign_test(chunk)
+                if train_chunk_callback is not None:
+                    train_chunk_callback(chunk[~is_test])
+                for split_name, file_path, mask in (("train", train_file_path, ~is_test), ("test", test_file_path, is_test)):
+                    first_write = sum(class_counts[split_name].values()) == 0
+                    chunk[mask].to_csv(file_path, mode="w" if first_write else "a", header=first_write, index=False)
+                    for label, count in chunk.loc[mask, self.target_column].astype(str).value_counts().items():
+                        class_counts[split_name][label] = class_counts[split_name].get(label, 0) + int(count)
+            if columns is None:
+                raise Exception("No records to split.")
+            # a set which received no row still gets its header.
+            for split_name, file_path in (("train", train_file_path), ("test", test_file_path)):
+                if not class_counts[split_name]:
+                    pd.DataFrame(columns=columns).to_csv(file_path, index=False)
+            logging.info(f"Split the records into train and test sets: {class_counts}")
+            return class_counts
+        except Exception as e:
+            raise SensorException(e, sys) from e
@@ -0,0 +1,129 @@
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from sensor.exception import SensorException
+from sensor.logger import logging
+
+
+@dataclass
+class PipelineNode:
+    name: str
+    func: Callable
+    # keyword argument of the function and name of the node whose output it receives.
+    inputs: Dict[str, str] = field(default_factory=dict)
+    # nodes which must complete first although their output is not used.
+    after: List[str] = field(default_factory=list)
+
+    @property
+    def dependencies(self) -> List[str]:
+        return list(dict.fromkeys(list(self.inputs.values()) + self.after))
+
+
+class DagExecutor:
+    """
+    This class is used to run pipeline stages as a DAG: every node starts as soon as the nodes it
+    depends on are completed, independent nodes run concurrently on a thread pool. When a node
+    fails no new node is started, the running ones are awaited and the first error is raised.
+    """
+    def __init__(self, max_workers: int = 4, on_node_completed: Optional[Callable[[str, Any], None]] = None):
+        self.max_workers = max_workers
+        # called with the name and output of every node which completed, from the thread running the DAG.
+        self.on_node_completed = on_node_completed
+        self.nodes: Dict[str, PipelineNode] = {}
+        self.outputs: Dict[str, Any] = {}
+        # start and end (seconds since the start of the run) of every node which ran.
+        self.timings: Dict[str, tuple] = {}
+
+    def add_node(self, name: str, func: Callable, inputs: Optional[Dict[str, str]] = None, after: Optional[List[str]] = None) -> None:
+        """
+        This method is used to add a stage to the DAG, its dependencies must be added first.
+
+        Args:
+            name (str): name of the node.
+            func (Callable): stage to run.
+            inputs (Optional[Dict[str, str]], optional): keyword argument and the node whose output it receives. Defaults to None.
+            after (Optional[List[str]], optional): nodes which must complete first. Defaults to None.
+        """
+        node = PipelineNode(name=name, func=func, inputs=dict(inputs or {}), after=list(after or []))
+        unknown = [dependency for dependency in node.dependencies if dependency not in self.nodes]
+        if unknown:
+            raise ValueError(f"Node {name} depends on unknown nodes: {unknown}")
+        self.nodes[name] = node
+
+    def _run_node(self, node: PipelineNode, start_time: float):
+        started = time.perf_counter() - start_time
+        try:
+            return node.func(**{argument: self.outputs[dependency] for argument, dependency in node.inputs.items()})
+        finally:
+            self.timings[node.name] = (round(started, 4), round(time.perf_counter() - start_time, 4))
+
+    def run(self, completed: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        This method is used to run every node of the DAG.
+
+        Args:
+            completed (Optional[Dict[str, Any]], optional): outputs of nodes which already ran, they are not run
+                again unless one of their dependencies has to run. Defaults to None.
+
+        Raises:
+            SensorException: raises the error of the first failed node.
+
+        Returns:
+            Dict[str, Any]: output of every node.
+        """
+        try:
+            completed = {name: output for name, output in (completed or {}).items() if name in self.nodes}
+            # nodes are added after their dependencies, so a node which has to run again invalidates everything downstream.
+            for name, node in self.nodes.items():
+                if name in completed and not all(dependency in completed for dependency in node.dependencies):
+                    del completed[name]
+            self.outputs.update(completed)
+            pending = [name for name in self.nodes if name not in self.outputs]
+            running = {}
+            error = None
+            start_time = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="pipeline") as executor:
+                while pending or running:
+                    if error is None:
+                        for name in [name for name in pending if all(dependency in self.outputs for dependency in self.nodes[name].dependencies)]:
+                            pending.remove(name)
+                            logging.info(f"Starting pipeline node {name}")
+                            running[executor.submit(self._run_node, self.nodes[name], start_time)] = name
+                    if not running:
+                        break
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        name = running.pop(future)
+                        try:
+                            self.outputs[name] = future.result()
+                            if self.on_node_completed is not None:
+                                self.on_node_completed(name, self.outputs[name])
+                        except Exception as e:
+                            logging.error(f"Pipeline node {name} failed: {e}")
+                            error = error or e
+            if error is not None:
+                raise error
+            return self.outputs
+        except Exception as e:
+            raise SensorException(e, sys) from e
+
+    def critical_path(self) -> List[str]:
+        """
+        This method is used to get the chain of nodes which decided the wall time of the run: starting
+        from the node which ended last, every step goes back to the dependency which ended last.
+
+        Returns:
+            List[str]: nodes of the critical path, in run order.
+        """
+        if not self.timings:
+            return []
+        path = [max(self.timings, key=lambda name: self.timings[name][1])]
+        while True:
+            dependencies = [dependency for dependency in self.nodes[path[-1]].dependencies if dependency in self.timings]
+            if not dependencies:
+                break
+            path.append(max(dependencies, key=lambda name: self.timings[name][1]))
+        return path[::-1]
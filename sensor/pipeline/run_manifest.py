@@ -0,0 +1,121 @@
+import os
+import sys
+import threading
+import typing
+from dataclasses import fields, is_dataclass
+from typing import Any, Dict
+
+import numpy as np
+
+from sensor.constant import training_pipeline
+from sensor.entity import artifact_entity
+from sensor.exception import SensorException
+from sensor.logger import logging
+from sensor.utils.main_utils import read_yaml_file, write_yaml_file
+
+
+class RunManifest:
+    """
+    This class is used to persist the artifact of every completed stage of a pipeline run into its
+    artifact directory, so a failed run can be resumed from the stages it already completed.
+    """
+    def __init__(self, artifact_dir: str):
+        self.manifest_file_path = os.path.join(artifact_dir, training_pipeline.PIPELINE_RUN_MANIFEST_FILE_NAME)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def _to_content(cls, value: Any) -> Any:
+        """
+        This method is used to convert an artifact into yaml friendly content, nested artifacts included.
+        """
+        if is_dataclass(value):
+            return {artifact_field.name: cls._to_content(getattr(value, artifact_field.name)) for artifact_field in fields(value)}
+        if isinstance(value, np.generic):
+            return value.item()
+        return value
+
+    @classmethod
+    def _from_content(cls, artifact_class: type, content: dict):
+        """
+        This method is used to rebuild an artifact from its manifest content, nested artifacts included.
+        """
+        field_types = typing.get_type_hints(artifact_class)
+        values = {}
+        for artifact_field in fields(artifact_class):
+            value = content.get(artifact_field.name)
+            field_type = field_types[artifact_field.name]
+            # optional nested artifacts are rebuilt like the required ones.
+            if typing.get_origin(field_type) is typing.Union:
+                field_type = next((argument for argument in typing.get_args(field_type) if argument is not type(None)), field_type)
+            values[artifact_field.name] = cls._from_content(field_type, value) if is_dataclass(field_type) and isinstance(value, dict) else value
+        return artifact_class(**values)
+
+    @staticmethod
+    def _missing_files(artifact) -> list:
+        """
+        This method is used to get the files of an artifact which do not exist any more.
+        """
+        if not is_dataclass(artifact):
+            return []
+        return [
+            getattr(artifact, artifact_field.name) for artifact_field in fields(artifact)
+            if artifact_field.name.endswith("_path") and isinstance(getattr(artifact, artifact_field.name), str) and not os.path.exists(getattr(artifact, artifact_field.name))
+        ]
+
+    def read(self) -> dict:
+        """
+        This method is used to read the manifest, an empty manifest is returned for a new run.
+        """
+        if not os.path.exists(self.manifest_file_path):
+            return {}
+        return read_yaml_file(self.manifest_file_path) or {}
+
+    def record(self, stage: str, artifact: Any) -> None:
+        """
+        This method is used to add the artifact of a completed stage to the manifest. The manifest is
+        written to a temporary file first, so a crash never leaves a partially written manifest.
+
+        Args:
+            stage (str): name of the completed stage.
+            artifact (Any): artifact returned by the stage, None for stages without artifact.
+
+        Raises:
+            SensorException: raises the exception error.
+        """
+        try:
+            with self._lock:
+                manifest = self.read()
+                manifest[stage] = {
+                    "artifact_type": type(artifact).__name__ if is_dataclass(artifact) else None,
+                    "artifact": self._to_content(artifact),
+                }
+                temporary_file_path = f"{self.manifest_file_path}.tmp"
+                write_yaml_file(file_path=temporary_file_path, content=manifest)
+                os.replace(temporary_file_path, self.manifest_file_path)
+        except Exception as e:
+            raise SensorException(e, sys) from e
+
+    def load(self) -> Dict[str, Any]:
+        """
+        This method is used to get the artifacts of the completed stages. A stage whose artifact files
+        were removed since is left out, so it runs again.
+
+        Raises:
+            SensorException: raises the exception error.
+
+        Returns:
+            Dict[str, Any]: stage and its artifact.
+        """
+        try:
+            artifacts = {}
+            for stage, entry in self.read().items():
+                artifact_type = entry.get("artifact_type")
+                artifact = self._from_content(getattr(artifact_entity, artifact_type), entry["artifact"]) if artifact_type else entry.get("artifact")
+                missing_files = self._missing_files(artifact)
+                if missing_files:
+                    logging.info(f"Stage {stage} runs again, its artifact files are missing: {missing_files}")
+                    continue
+                artifacts[stage] = artifact
+            return artifacts
+        except Exception as e:
+            raise SensorException(e, sys) from e
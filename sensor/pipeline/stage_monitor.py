@@ -0,0 +1,222 @@
+import functools
+import os
+import sys
+import threading
+import time
+from dataclasses import asdict, dataclass, fields, is_dataclass
+from typing import Dict, List, Optional, Set
+
+from prometheus_client import CollectorRegistry, Gauge, write_to_textfile
+
+from sensor.constant import training_pipeline
+from sensor.exception import SensorException
+from sensor.logger import logging
+from sensor.utils.compression import open_for_read
+from sensor.utils.main_utils import read_numpy_array_header, write_yaml_file
+from sensor.utils.resource_utils import get_peak_rss, get_rss, reset_peak_rss
+
+# data files whose rows are counted, other artifact files are only counted in bytes written.
+ROW_FILE_EXTENSIONS = (".csv", ".npy")
+
+
+@dataclass
+class StageMetrics:
+    stage: str
+    status: str
+    # start and end of the stage in seconds since the monitor was created, stages can overlap.
+    started_s: float
+    ended_s: float
+    wall_time_s: float
+    # cpu time of the whole process while the stage ran, like the peak memory it covers the stages which ran
+    # concurrently. It includes the XGBoost and thread pool threads of the stage, which a per thread clock misses.
+    process_cpu_time_s: float
+    peak_rss_delta_mb: float
+    rows_in: int
+    rows_out: int
+    bytes_written: int
+
+
+class StageMonitor:
+    """
+    This class is used to record wall/cpu time, peak memory, rows and bytes written of every pipeline stage.
+    """
+    def __init__(self, artifact_dir: str, run_id: str):
+        self.artifact_dir = artifact_dir
+        self.run_id = run_id
+        self.stage_metrics: List[StageMetrics] = []
+        self._row_counts: Dict[str, int] = {}
+        self._written_files: Set[str] = set()
+        self._lock = threading.Lock()
+        self._start_time = time.perf_counter()
+        # stages which decided the wall time of the run, set by the pipeline when its stages run as a DAG.
+        self.critical_path: List[str] = []
+        # stages reloaded from the run manifest when a failed run is resumed.
+        self.resumed_stages: List[str] = []
+
+    def _count_rows(self, file_path: str) -> int:
+        """
+        This method is used to count the rows of a csv or numpy file, the count of every file is cached.
+
+        Args:
+            file_path (str): path of the file.
+
+        Returns:
+            int: number of rows.
+        """
+        if file_path in self._row_counts:
+            return self._row_counts[file_path]
+        if file_path.endswith(".npy"):
+            # only the header is read, decompressed for a compressed array.
+            with open_for_read(file_path) as file_obj:
+                n_rows = int(read_numpy_array_header(file_obj)[0][0])
+        else:
+            n_lines = 0
+            with open(file_path, "rb") as file_obj:
+                for block in iter(lambda: file_obj.read(1 << 20), b""):
+                    n_lines += block.count(b"\n")
+            # first line is the header.
+            n_rows = max(n_lines - 1, 0)
+        self._row_counts[file_path] = n_rows
+        return n_rows
+
+    @staticmethod
+    def _artifact_files(artifact) -> List[tuple]:
+        """
+        This method is used to get the (field name, file path) of every existing file of an artifact.
+        """
+        if not is_dataclass(artifact):
+            return []
+        files = []
+        for artifact_field in fields(artifact):
+            value = getattr(artifact, artifact_field.name)
+            if isinstance(value, str) and os.path.isfile(value):
+                files.append((artifact_field.name, value))
+        return files
+
+    def artifact_rows(self, artifact) -> int:
+        """
+        This method is used to count the rows of the data files of an artifact, rejected rows are not counted.
+        """
+        return sum(self._count_rows(file_path) for name, file_path in self._artifact_files(artifact) if file_path.endswith(ROW_FILE_EXTENSIONS) and not name.startswith("invalid"))
+
+    def artifact_bytes(self, artifact) -> int:
+        """
+        This method is used to get the total size of the files of an artifact, files which are already
+        counted for an earlier stage (like ingested files reused as valid files) are not counted again.
+        """
+        n_bytes = 0
+        for _, file_path in self._artifact_files(artifact):
+            with self._lock:
+                if file_path in self._written_files:
+                    continue
+                self._written_files.add(file_path)
+            n_bytes += os.path.getsize(file_path)
+        return n_bytes
+
+    def run_stage(self, stage: str, method, *args, **kwargs):
+        """
+        This method is used to run one stage and record its metrics, the metrics are recorded even when the stage fails.
+
+        Args:
+            stage (str): name of the stage.
+            method (Callable): stage to run.
+
+        Returns:
+            artifact: output artifact of the stage.
+        """
+        rows_in = sum(self.artifact_rows(artifact) for artifact in list(args) + list(kwargs.values()))
+        # the peak memory and the cpu time are per process, for stages which run concurrently they cover all of them.
+        reset_peak_rss()
+        rss_before = get_rss()
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        artifact, status = None, "completed"
+        try:
+            artifact = method(*args, **kwargs)
+            return artifact
+        except Exception:
+            status = "failed"
+            raise
+        finally:
+            wall_end = time.perf_counter()
+            metrics = StageMetrics(
+                stage=stage,
+                status=status,
+                started_s=round(wall_start - self._start_time, 4),
+                ended_s=round(wall_end - self._start_time, 4),
+                wall_time_s=round(wall_end - wall_start, 4),
+                process_cpu_time_s=round(time.process_time() - cpu_start, 4),
+                peak_rss_delta_mb=round(max(get_peak_rss() - rss_before, 0) / 2 ** 20, 2),
+                rows_in=rows_in,
+                rows_out=self.artifact_rows(artifact),
+                bytes_written=self.artifact_bytes(artifact),
+            )
+            with self._lock:
+                self.stage_metrics.append(metrics)
+            logging.info(f"Stage metrics: {metrics}")
+
+    def write_run_summary(self, status: str, metrics_textfile_dir: Optional[str] = None) -> str:
+        """
+        This method is used to write the run summary yaml into the artifact directory and, when a
+        textfile directory is given, the same metrics in prometheus text format.
+
+        Args:
+            status (str): final status of the run.
+            metrics_textfile_dir (Optional[str], optional): directory of the prometheus textfile collector. Defaults to None.
+
+        Raises:
+            SensorException: raises the exception error.
+
+        Returns:
+            str: path of the run summary file.
+        """
+        try:
+            run_summary_file_path = os.path.join(self.artifact_dir, training_pipeline.PIPELINE_RUN_SUMMARY_FILE_NAME)
+            run_summary = {
+                "run_id": self.run_id,
+                "status": status,
+                # elapsed time of the run, less than the sum of the stage times when stages overlap.
+                "wall_time_s": round(max((metrics.ended_s for metrics in self.stage_metrics), default=0.0) - min((metrics.started_s for metrics in self.stage_metrics), default=0.0), 4),
+                "stage_time_s": round(sum(metrics.wall_time_s for metrics in self.stage_metrics), 4),
+                "critical_path": list(self.critical_path),
+                "resumed_stages": list(self.resumed_stages),
+                "stages": [asdict(metrics) for metrics in self.stage_metrics],
+            }
+            write_yaml_file(file_path=run_summary_file_path, content=run_summary)
+            if metrics_textfile_dir:
+                self.write_prometheus_metrics(os.path.join(metrics_textfile_dir, training_pipeline.PIPELINE_METRICS_FILE_NAME))
+            return run_summary_file_path
+        except Exception as e:
+            raise SensorException(e, sys) from e
+
+    def write_prometheus_metrics(self, file_path: str) -> None:
+        """
+        This method is used to export the stage metrics in prometheus text format.
+
+        Args:
+            file_path (str): path of the .prom file.
+        """
+        registry = CollectorRegistry()
+        labels = ["run_id", "stage", "status"]
+        gauges = {
+            "wall_time_s": Gauge("sensor_pipeline_stage_wall_seconds", "Wall time of the pipeline stage.", labels, registry=registry),
+            "process_cpu_time_s": Gauge("sensor_pipeline_stage_process_cpu_seconds", "CPU time of the whole process while the pipeline stage ran, it includes the stages which ran concurrently.", labels, registry=registry),
+            "peak_rss_delta_mb": Gauge("sensor_pipeline_stage_peak_rss_delta_megabytes", "Peak resident memory growth of the pipeline stage.", labels, registry=registry),
+            "rows_in": Gauge("sensor_pipeline_stage_rows_in", "Rows read by the pipeline stage.", labels, registry=registry),
+            "rows_out": Gauge("sensor_pipeline_stage_rows_out", "Rows written by the pipeline stage.", labels, registry=registry),
+            "bytes_written": Gauge("sensor_pipeline_stage_bytes_written", "Bytes written by the pipeline stage.", labels, registry=registry),
+        }
+        for metrics in self.stage_metrics:
+            for name, gauge in gauges.items():
+                gauge.labels(run_id=self.run_id, stage=metrics.stage, status=metrics.status).set(getattr(metrics, name))
+        os.makedirs(os.path.dirname(file_path) or ".", exist_ok=True)
+        write_to_textfile(file_path, registry)
+
+
+def track_stage(method):
+    """
+    This decorator is used to record the metrics of a TrainPipeline stage in its stage monitor.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        return self.stage_monitor.run_stage(method.__name__, method, self, *args, **kwargs)
+    return wrapper
@@ -1,5 +1,5 @@
 
-import sys
+import os, sys
 
 from sensor.entity.config_entity import TrainingPipelineConfig, DataIngestionConfig, DataValidationConfig, DataTransformationConfig, ModelPusherConfig, ModelEvaluationConfig, ModelTrainerConfig
 from sensor.exception import SensorException
@@ -12,8 +12,12 @@ from sensor.components.model_trainer import ModelTrainer
 from sensor.components.model_evaluation import ModelEvaluation
 from sensor.components.model_pusher import ModelPusher
 from sensor.constant.s3_bucket import TRAINING_BUCKET_NAME
-from sensor.constant.training_pipeline import SAVED_MODEL_DIR
+from sensor.constant.training_pipeline import ARTIFACT_DIR, PIPELINE_MAX_WORKERS, SAVED_MODEL_DIR
 from sensor.cloud_storage.S3Syncer import S3Sync
+from sensor.constant.env_variables import PIPELINE_METRICS_TEXTFILE_DIR_KEY
+from sensor.pipeline.dag_executor import DagExecutor
+from sensor.pipeline.run_manifest import RunManifest
+from sensor.pipeline.stage_monitor import StageMonitor, track_stage
 
 
 class TrainPipeline:
@@ -21,11 +25,17 @@ class TrainPipeline:
     This Class is used to train the entitire pipeline of ML model.
     """
     is_pipeline_running = False
-    def __init__(self, ):
-        self.training_pipeline_config = TrainingPipelineConfig()
+    def __init__(self, run_id: str = None):
+        # without run id a new run is started, with the run id of an earlier run its artifacts are reused.
+        self.training_pipeline_config = TrainingPipelineConfig(timestamp=run_id)
         self.s3_sync = S3Sync()
+        # records the time, memory, rows and bytes written of every stage.
+        self.stage_monitor = StageMonitor(artifact_dir=self.training_pipeline_config.artifact_dir, run_id=self.training_pipeline_config.timestamp)
+        # artifact of every completed stage, a failed run is resumed from it.
+        self.run_manifest = RunManifest(artifact_dir=self.training_pipeline_config.artifact_dir)
         # self.training_pipeline_config = training_pipeline_config
 
+    @track_stage
     def start_data_ingestion(self)->DataIngestionArtifact:
         """
         This method is used to start the data ingestion of ML pipeline.
@@ -50,6 +60,7 @@ class TrainPipeline:
         except Exception as e:
             raise SensorException(e, sys)
 
+    @track_stage
     def start_data_validation(self, data_ingestion_artifact:DataIngestionArtifact):
         """
         This method is used to start the Data_Validation of ML.
@@ -68,18 +79,41 @@ class TrainPipeline:
             data_validation_config = DataValidationConfig(training_pipeline_config=self.training_pipeline_config)
             # Creating the object of DataValidation.
             data_validation = DataValidation(data_ingestion_artifact=data_ingestion_artifact, data_validation_config=data_validation_config)
-            # Initiating the data_validation function which returns data_validation_artifact.
-            data_validation_artifact = data_validation.initiate_data_validation()
+            # Initiating the data_validation function which returns data_validation_artifact, the drift is detected by its own stage.
+            data_validation_artifact = data_validation.initiate_data_validation(detect_drift=False)
             return data_validation_artifact
         except Exception as e:
             raise SensorException(e, sys)
 
-    def start_data_transformation(self, data_validation_artifact:DataValidationArtifact):
+    @track_stage
+    def start_drift_detection(self, data_validation_artifact:DataValidationArtifact):
+        """
+        This method is used to start the drift detection between the valid train and test data.
+
+        Args:
+            data_validation_artifact (DataValidationArtifact): class of DataValidationArtifact
+
+        Raises:
+            SensorException: raises exception error
+
+        Returns:
+            data_validation_artifact: Data Validation artifact with the drift status and report.
+        """
+        try:
+            data_validation_config = DataValidationConfig(training_pipeline_config=self.training_pipeline_config)
+            data_validation = DataValidation(data_ingestion_artifact=None, data_validation_config=data_validation_config)
+            return data_validation.initiate_drift_detection(data_validation_artifact=data_validation_artifact)
+        except Exception as e:
+            raise SensorException(e, sys)
+
+    @track_stage
+    def start_data_transformation(self, data_validation_artifact:DataValidationArtifact, data_ingestion_artifact:DataIngestionArtifact = None):
         """
         This method is used to start the data tranformation of ML.
 
         Args:
             data_validation_artifact (DataValidationArtifact): Class of DataValidationArtifact
+            data_ingestion_artifact (DataIngestionArtifact, optional): Class of DataIngestionArtifact, its column profile selects the features.
 
         Raises:
             SensorException: raises exception error
@@ -91,7 +125,7 @@ class TrainPipeline:
             # creating the obj of DataTransformationConfig.
             data_transformation_config = DataTransformationConfig(training_pipeline_config=self.training_pipeline_config)
             # Creating the object of DataTransformation.
-            data_transformation = DataTransformation(data_validation_artifact=data_validation_artifact,data_transformation_config = data_transformation_config)
+            data_transformation = DataTransformation(data_validation_artifact=data_validation_artifact,data_transformation_config = data_transformation_config, data_ingestion_artifact=data_ingestion_artifact)
             # Initiating the data_transformation function which returns the data_transformation_artifact.
             data_transformation_artifact = data_transformation.initiate_data_transformation()
             return data_transformation_artifact
@@ -99,12 +133,14 @@ class TrainPipeline:
         except Exception as e:
             raise SensorException(e, sys)
 
-    def start_model_trainer(self, data_transformation_artifact: DataTransformationArtifact,):
+    @track_stage
+    def start_model_trainer(self, data_transformation_artifact: DataTransformationArtifact, data_validation_artifact: DataValidationArtifact = None):
         """
         This method is used to start the model training.
 
         Args:
             data_transformation_artifact (DataTransformationArtifact): class of DataTransformationArtifact.
+            data_validation_artifact (DataValidationArtifact, optional): artifact of the drift detection, decides whether the warm start is used.
 
         Raises:
             SensorException: raises Exception error
@@ -116,13 +152,14 @@ class TrainPipeline:
             # Creating the obj of ModelTrainerConfig.
             model_trainer_config = ModelTrainerConfig(training_pipeline_config=self.training_pipeline_config)
             # Creating the object of ModelTrainer.
-            model_trainer = ModelTrainer(model_trainer_config=model_trainer_config, data_transformation_artifact=data_transformation_artifact)
+            model_trainer = ModelTrainer(model_trainer_config=model_trainer_config, data_transformation_artifact=data_transformation_artifact, data_validation_artifact=data_validation_artifact)
             # Initiating the model trainer function which returns the model_trainer_artifact.
             model_trainer_artifact = model_trainer.initiate_model_trainer()
             return model_trainer_artifact
         except Exception as e:
             raise SensorException(e, sys)
 
+    @track_stage
     def start_model_evaluation(self, data_validation_artifact: DataValidationArtifact, model_trainer_artifact:ModelTrainerArtifact):
         """
         This method is used to start the model evaluation.
@@ -149,6 +186,7 @@ class TrainPipeline:
         except Exception as e:
             raise SensorException(e, sys)
 
+    @track_stage
     def start_model_pusher(self, model_eval_artifact:ModelEvaluationArtifact):
         """
         This method is used to start the model pusher.
@@ -163,6 +201,8 @@ class TrainPipeline:
             model_pusher_artifact: Model Pusher Artifact.
         """
         try:
+            if not model_eval_artifact.is_model_accepted:
+                raise Exception("Trained Model is not better than the best model")
             # Creating the object of ModelPusherConfig
             model_pusher_config = ModelPusherConfig(training_pipeline_config=self.training_pipeline_config)
             # Creating obj of Model Pusher
@@ -172,6 +212,22 @@ class TrainPipeline:
             return model_pusher_artifact
         except Exception as e:
             raise SensorException(e, sys)
+
+    def write_run_summary(self, status:str):
+        """
+        This method is used to write the stage metrics of the run into the artifact directory and,
+        when PIPELINE_METRICS_TEXTFILE_DIR is set, export them in prometheus text format.
+
+        Args:
+            status (str): final status of the run.
+        """
+        try:
+            run_summary_file_path = self.stage_monitor.write_run_summary(status=status, metrics_textfile_dir=os.getenv(PIPELINE_METRICS_TEXTFILE_DIR_KEY))
+            logging.info(f"Pipeline run summary:{run_summary_file_path}")
+        except Exception as e:
+            # the run summary must never hide the real result of the run.
+            logging.exception(e)
+
     def sync_artifact_dir_to_s3(self):
         try:
             aws_buket_url = f"s3://{TRAINING_BUCKET_NAME}/artifact/{self.training_pipeline_config.timestamp}"
@@ -186,9 +242,61 @@ class TrainPipeline:
         except Exception as e:
             raise SensorException(e,sys)
 
+    def get_pipeline_dag(self) -> DagExecutor:
+        """
+        This method is used to declare the stages of the pipeline with the artifacts they need, the
+        stages which only depend on completed ones run concurrently: the drift detection alongside
+        the transformation and training, and a first sync of the artifacts alongside the evaluation.
+
+        Returns:
+            DagExecutor: stages of the pipeline.
+        """
+        dag = DagExecutor(max_workers=PIPELINE_MAX_WORKERS, on_node_completed=self.run_manifest.record)
+        dag.add_node("data_ingestion", self.start_data_ingestion)
+        dag.add_node("data_validation", self.start_data_validation, inputs={"data_ingestion_artifact": "data_ingestion"})
+        dag.add_node("drift_detection", self.start_drift_detection, inputs={"data_validation_artifact": "data_validation"})
+        dag.add_node("data_transformation", self.start_data_transformation, inputs={"data_validation_artifact": "data_validation", "data_ingestion_artifact": "data_ingestion"})
+        model_trainer_inputs = {"data_transformation_artifact": "data_transformation"}
+        if ModelTrainerConfig(training_pipeline_config=self.training_pipeline_config).warm_start:
+            # the warm start falls back to a full training on drift, so the trainer waits for the drift detection.
+            model_trainer_inputs["data_validation_artifact"] = "drift_detection"
+        dag.add_node("model_trainer", self.start_model_trainer, inputs=model_trainer_inputs)
+        dag.add_node("artifact_sync", self.sync_artifact_dir_to_s3, after=["model_trainer", "drift_detection"])
+        dag.add_node("model_evaluation", self.start_model_evaluation, inputs={"data_validation_artifact": "data_validation", "model_trainer_artifact": "model_trainer"})
+        dag.add_node("model_pusher", self.start_model_pusher, inputs={"model_eval_artifact": "model_evaluation"})
+        return dag
+
+    @classmethod
+    def resume(cls, run_id: str) -> "TrainPipeline":
+        """
+        This method is used to resume a failed run: the artifacts of its completed stages are reloaded
+        from the run manifest and only the failed stage and the stages after it run again.
+
+        Args:
+            run_id (str): timestamp of the run, the name of its directory in the artifact directory.
+
+        Raises:
+            SensorException: raises Exception error.
+
+        Returns:
+            TrainPipeline: pipeline of the resumed run.
+        """
+        try:
+            # the run id names a directory of the artifact directory, never a path outside of it.
+            if not run_id or os.path.basename(run_id) != run_id or run_id in (".", ".."):
+                raise Exception(f"Invalid pipeline run id: {run_id}")
+            train_pipeline = cls(run_id=run_id)
+            if not os.path.isdir(train_pipeline.training_pipeline_config.artifact_dir):
+                raise Exception(f"Pipeline run {run_id} is not found in {ARTIFACT_DIR}")
+            train_pipeline.run_pipeline()
+            return train_pipeline
+        except Exception as e:
+            raise SensorException(e, sys)
+
     def run_pipeline(self):
         """
         This methood is used to run the entire pipeline of ML model by using the above functions.
+        Stages completed by an earlier attempt of the same run are not run again.
 
         Raises:
             Exception: message
@@ -196,18 +304,21 @@ class TrainPipeline:
         """
         try:
             TrainPipeline.is_pipeline_running = True
-            data_ingestion_artifact:DataIngestionArtifact = self.start_data_ingestion()
-            data_validation_artifact = self.start_data_validation(data_ingestion_artifact=data_ingestion_artifact)
-            data_transformation_artifact = self.start_data_transformation(data_validation_artifact=data_validation_artifact)
-            model_trainer_artifact = self.start_model_trainer(data_transformation_artifact=data_transformation_artifact)
-            model_eval_artifact = self.start_model_evaluation(data_validation_artifact=data_validation_artifact,model_trainer_artifact=model_trainer_artifact)
-            if not model_eval_artifact.is_model_accepted:
-                raise Exception("Trained Model is not better than the best model")
-            model_pusher_artifact = self.start_model_pusher(model_eval_artifact=model_eval_artifact)
+            self.pipeline_dag = self.get_pipeline_dag()
+            completed = self.run_manifest.load()
+            if completed:
+                logging.info(f"Resuming pipeline run {self.training_pipeline_config.timestamp}, completed stages: {list(completed)}")
+            try:
+                self.pipeline_dag.run(completed=completed)
+            finally:
+                self.stage_monitor.critical_path = self.pipeline_dag.critical_path()
+                self.stage_monitor.resumed_stages = [stage for stage in self.pipeline_dag.nodes if stage in self.pipeline_dag.outputs and stage not in self.pipeline_dag.timings]
             TrainPipeline.is_pipeline_running = False
+            self.write_run_summary(status="completed")
             self.sync_artifact_dir_to_s3()
             self.sync_saved_model_dir_to_s3()
         except Exception as e:
+            self.write_run_summary(status="failed")
             self.sync_artifact_dir_to_s3()
             TrainPipeline.is_pipeline_running = False
             raise SensorException(e, sys)
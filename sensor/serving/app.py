@@ -0,0 +1,171 @@
+"""
+FastAPI application of the serving process. It only imports what inference needs: the training
+pipeline (imblearn, scipy, pymongo, ...) is imported on the first /train request, and xgboost and
+sklearn are imported when the model is unpickled on the first prediction.
+"""
+import os
+from typing import Optional
+
+import numpy as np
+from fastapi import FastAPI, Request
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, Response
+from starlette.responses import RedirectResponse
+
+from sensor.constant.application import EXPLAIN_TOP_FEATURES, SHADOW_MODEL_DIR, SHADOW_TRAFFIC_FRACTION
+from sensor.constant.env_variables import PREDICTION_CACHE_ENABLED_KEY, PREDICTION_LOG_ENABLED_KEY, SHADOW_MODEL_DIR_KEY, SHADOW_TRAFFIC_FRACTION_KEY
+from sensor.constant.training_pipeline import SAVED_MODEL_DIR, TARGET_COLUMN
+from sensor.ml.model.estimator import TargetValueMapping
+from sensor.ml.schema.input_coercer import InputCoercer
+from sensor.ml.schema.schema_validator import get_compiled_schema
+from sensor.serving.explainer import ContributionExplainer
+from sensor.serving.metrics import PREDICT_BATCH_SIZE, PrometheusMiddleware, metrics_response_content, phase_timer
+from sensor.serving.model_cache import ModelCache
+from sensor.serving.prediction_logger import PredictionLogSink
+from sensor.serving.result_cache import PredictionResultCache
+from sensor.serving.row_hash import hash_feature_rows
+from sensor.serving.shadow_scorer import ShadowScorer
+
+
+app = FastAPI()
+origins = ["*"]
+
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=origins,
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+)
+app.add_middleware(PrometheusMiddleware)
+# best model is kept in memory and only reloaded when a newer model is pushed.
+model_cache = ModelCache(model_dir=SAVED_MODEL_DIR)
+# feature contributions of the explained rows, cached by model version and row hash.
+contribution_explainer = ContributionExplainer()
+# scores of recently seen rows, only used when the prediction cache is enabled.
+prediction_result_cache = PredictionResultCache() if os.getenv(PREDICTION_CACHE_ENABLED_KEY, "false").lower() == "true" else None
+# scored rows are written to mongodb in the background when the prediction log is enabled.
+prediction_log_sink = PredictionLogSink()
+# a fraction of the requests is scored by the challenger model in the background when shadow scoring is enabled.
+shadow_traffic_fraction = float(os.getenv(SHADOW_TRAFFIC_FRACTION_KEY, SHADOW_TRAFFIC_FRACTION))
+shadow_scorer = ShadowScorer(prediction_log_sink, model_dir=os.getenv(SHADOW_MODEL_DIR_KEY, SHADOW_MODEL_DIR), traffic_fraction=shadow_traffic_fraction) if shadow_traffic_fraction > 0 else None
+
+@app.on_event("startup")
+async def start_prediction_log():
+    if os.getenv(PREDICTION_LOG_ENABLED_KEY, "false").lower() == "true":
+        await prediction_log_sink.start()
+
+@app.on_event("shutdown")
+async def stop_prediction_log():
+    # the challenger scores of the pending shadow requests are logged before the sink stops.
+    if shadow_scorer is not None:
+        await shadow_scorer.stop()
+    await prediction_log_sink.stop()
+
+@app.get("/", tags=["authentication"])
+async def index():
+    return RedirectResponse(url="/docs")
+
+@app.get("/train")
+async def train_route(run_id: Optional[str] = None):
+    try:
+        # the training pipeline is only imported when it is used.
+        from sensor.pipeline.training_pipeline import TrainPipeline
+        if TrainPipeline.is_pipeline_running:
+            return Response("Training pipeline is already running.")
+        # the run id of a failed run resumes it from its last completed stage.
+        if run_id:
+            TrainPipeline.resume(run_id)
+        else:
+            TrainPipeline().run_pipeline()
+        return Response("Training successful !!")
+    except Exception as e:
+        return Response(f"Error Occurred! {e}")
+
+@app.post("/predict")
+async def predict_route(request: Request):
+    try:
+        # the version is taken with the model, a reload during the await below must not relabel its scores.
+        model, model_version = model_cache.get_model()
+        if model is None:
+            return Response("Model is not available")
+        # validating the uploaded csv rows and coercing them into the training column order.
+        with phase_timer("parse"):
+            input_coercer = InputCoercer(get_compiled_schema())
+            batch = input_coercer.coerce_csv((await request.body()).decode("utf-8"))
+        PREDICT_BATCH_SIZE.observe(len(batch))
+        y_pred, y_score = [], []
+        if len(batch) > 0:
+            if prediction_result_cache is not None:
+                # rows scored before by the same model are not scored again.
+                with phase_timer("cache"):
+                    row_hashes = hash_feature_rows(batch.features)
+                    y_score = prediction_result_cache.lookup(model_version, row_hashes)
+                    missed = np.flatnonzero(np.isnan(y_score))
+            else:
+                y_score, missed = None, None
+            if missed is None or len(missed) > 0:
+                features = batch.features if missed is None or len(missed) == len(batch) else batch.features[missed]
+                with phase_timer("preprocess"):
+                    x_transform = model.preprocessor.transform(features)
+                with phase_timer("infer"):
+                    # one model call, the labels come from the decision threshold stored with the model.
+                    missed_score = model.model.predict_proba(x_transform)[:, 1]
+                if missed is None:
+                    y_score = missed_score
+                else:
+                    y_score[missed] = missed_score
+                    prediction_result_cache.store(model_version, [row_hashes[index] for index in missed], missed_score)
+            y_pred = model.apply_threshold(y_score)
+            # the challenger scores the same rows in the background, its log rows share the request id of these ones.
+            request_id = shadow_scorer.submit(batch.features, y_pred, y_score, model_version) if shadow_scorer is not None else None
+            shadow_fields = {"request_id": request_id} if request_id is not None else {}
+            await prediction_log_sink.submit(batch.features, y_pred, y_score, model_version, role="champion", **shadow_fields)
+        with phase_timer("serialise"):
+            labels = TargetValueMapping().decode(y_pred).tolist()
+            predictions = [{"row": row_id, TARGET_COLUMN: label, "probability": score} for row_id, label, score in zip(batch.row_ids.tolist(), labels, np.round(np.asarray(y_score, dtype=np.float64), 6).tolist())]
+            response = JSONResponse({"predictions": predictions, "errors": {str(row_id): error for row_id, error in batch.row_errors.items()}})
+        return response
+    except Exception as e:
+        return Response(f"Error Occurred! {e}")
+
+@app.post("/explain")
+async def explain_route(request: Request, top_k: int = EXPLAIN_TOP_FEATURES):
+    try:
+        # the version is taken with the model, contributions of an older model are never cached under a newer version.
+        model, model_version = model_cache.get_model()
+        if model is None:
+            return Response("Model is not available")
+        with phase_timer("parse"):
+            schema = get_compiled_schema()
+            batch = InputCoercer(schema).coerce_csv((await request.body()).decode("utf-8"))
+        PREDICT_BATCH_SIZE.observe(len(batch))
+        explanations = []
+        if len(batch) > 0:
+            with phase_timer("explain"):
+                # one model call for the rows which are not cached, the scores are the sum of the contributions.
+                contributions = contribution_explainer.explain(model, model_version, batch.features)
+                y_score = contribution_explainer.get_scores(contributions)
+                y_pred = model.apply_threshold(y_score)
+            with phase_timer("serialise"):
+                feature_names = contribution_explainer.get_feature_names(model.preprocessor, schema.numerical_columns)
+                labels = TargetValueMapping().decode(y_pred)
+                # features with the largest absolute contribution first, top_k <= 0 returns every feature.
+                n_features = len(feature_names) if top_k <= 0 else min(top_k, len(feature_names))
+                order = np.argsort(-np.abs(contributions[:, :-1]), axis=1, kind="stable")[:, :n_features]
+                for position, row_id in enumerate(batch.row_ids.tolist()):
+                    explanations.append({
+                        "row": row_id,
+                        TARGET_COLUMN: labels[position],
+                        "probability": round(float(y_score[position]), 6),
+                        "base_value": round(float(contributions[position, -1]), 6),
+                        "contributions": {feature_names[index]: round(float(contributions[position, index]), 6) for index in order[position]},
+                    })
+        return JSONResponse({"explanations": explanations, "errors": {str(row_id): error for row_id, error in batch.row_errors.items()}})
+    except Exception as e:
+        return Response(f"Error Occurred! {e}")
+
+@app.get("/metrics")
+async def metrics_route():
+    content, content_type = metrics_response_content()
+    return Response(content, media_type=content_type)
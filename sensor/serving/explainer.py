@@ -0,0 +1,115 @@
+import sys
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from sensor.constant.application import EXPLAIN_CACHE_MAX_ENTRIES
+from sensor.exception import SensorException
+from sensor.serving.metrics import EXPLAIN_CACHE_HITS, EXPLAIN_CACHE_MISSES
+from sensor.serving.row_hash import hash_feature_rows
+
+
+class ContributionExplainer:
+    """
+    This class is used to explain predictions with the SHAP contributions of XGBoost (pred_contribs):
+    the contributions of the features of a row and the bias add up to the log odds of its score, so
+    the score is computed by the same model call. Contributions of every row are cached by model
+    version and row hash, the least recently used rows are evicted first.
+    """
+    def __init__(self, max_entries: int = EXPLAIN_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        # (model version, row hash) -> contributions of the features followed by the bias.
+        self._cache: "OrderedDict[Tuple[str, str], np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def get_feature_names(preprocessor, columns: Sequence[str]) -> List[str]:
+        """
+        This method is used to get the column of every model feature. The imputer and the scaler keep
+        one feature per column, only the column selector of the preprocessor drops columns.
+
+        Args:
+            preprocessor (object): preprocessor of the model.
+            columns (Sequence[str]): columns of the schema, in the order of the coerced rows.
+
+        Returns:
+            List[str]: column of every model feature.
+        """
+        # the step is recognised by its attribute, importing ColumnSelector would import sklearn at startup.
+        for _, step in getattr(preprocessor, "steps", []):
+            if hasattr(step, "selected_columns"):
+                return list(step.selected_columns)
+        return list(columns)
+
+    def compute_contributions(self, model, features: np.ndarray) -> np.ndarray:
+        """
+        This method is used to compute the contributions of a batch of rows in one model call.
+
+        Args:
+            model (SensorModel): model to explain.
+            features (np.ndarray): coerced rows.
+
+        Returns:
+            np.ndarray: contributions of the features of every row followed by its bias.
+        """
+        # xgboost is only imported once a prediction is explained, it is already loaded with the model then.
+        import xgboost
+        x_transform = model.preprocessor.transform(features)
+        return model.model.get_booster().predict(xgboost.DMatrix(x_transform), pred_contribs=True).astype(np.float32, copy=False)
+
+    def explain(self, model, model_version: str, features: np.ndarray) -> np.ndarray:
+        """
+        This method is used to get the contributions of every row, only the rows which are not cached
+        for this model version are computed.
+
+        Args:
+            model (SensorModel): model to explain.
+            model_version (str): version of the model, part of the cache key.
+            features (np.ndarray): coerced rows.
+
+        Raises:
+            SensorException: raises the exception error.
+
+        Returns:
+            np.ndarray: contributions of the features of every row followed by its bias.
+        """
+        try:
+            keys = [(model_version, row_hash) for row_hash in hash_feature_rows(features)]
+            cached: Dict[int, np.ndarray] = {}
+            with self._lock:
+                for index, key in enumerate(keys):
+                    contributions = self._cache.get(key)
+                    if contributions is not None:
+                        self._cache.move_to_end(key)
+                        cached[index] = contributions
+            missed = [index for index in range(len(keys)) if index not in cached]
+            EXPLAIN_CACHE_HITS.inc(len(cached))
+            EXPLAIN_CACHE_MISSES.inc(len(missed))
+            computed = self.compute_contributions(model, features[missed]) if missed else None
+            if not cached:
+                contributions = computed
+            else:
+                contributions = np.empty((len(keys), len(next(iter(cached.values())))), dtype=np.float32)
+                for index, row_contributions in cached.items():
+                    contributions[index] = row_contributions
+                if missed:
+                    contributions[missed] = computed
+            if missed:
+                with self._lock:
+                    for position, index in enumerate(missed):
+                        # a copy, a view would keep the contributions of the whole batch in memory.
+                        self._cache[keys[index]] = computed[position].copy()
+                    while len(self._cache) > self.max_entries:
+                        self._cache.popitem(last=False)
+            return contributions
+        except Exception as e:
+            raise SensorException(e, sys) from e
+
+    @staticmethod
+    def get_scores(contributions: np.ndarray) -> np.ndarray:
+        """
+        This method is used to get the probability of the positive class from the contributions, they add up to its log odds.
+        """
+        return 1.0 / (1.0 + np.exp(-contributions.sum(axis=1, dtype=np.float64)))
@@ -0,0 +1,263 @@
+"""
+Production launcher of the serving process.
+
+    python -m sensor.serving.launcher --workers 4
+
+The parent process binds the socket and loads the model once, then forks the workers so that they
+share the model memory copy-on-write. When a newer model is pushed (or on SIGHUP) the parent loads
+it, forks a new generation of workers and gracefully stops the old one, so requests are never
+served without a model. A worker which crashes is restarted with an increasing delay, and the
+launcher stops when too many workers crashed within a short time. SIGTERM/SIGINT stop every worker
+and exit.
+"""
+import argparse
+import gc
+import os
+import signal
+import socket
+import sys
+import tempfile
+import time
+from collections import deque
+from typing import Deque, Dict, List, Tuple
+
+from sensor.constant.application import (APP_HOST, APP_MODEL_RELOAD_INTERVAL_SECONDS, APP_PORT, APP_WORKER_CRASH_WINDOW_SECONDS,
+                                         APP_WORKER_MAX_CRASHES, APP_WORKER_RESTART_DELAY_SECONDS, APP_WORKER_RESTART_MAX_DELAY_SECONDS,
+                                         APP_WORKERS)
+from sensor.constant.env_variables import PROMETHEUS_MULTIPROC_DIR_KEY
+from sensor.exception import SensorException
+from sensor.logger import logging
+
+# seconds the old workers get to finish their in flight requests after a reload or a stop.
+WORKER_SHUTDOWN_TIMEOUT_SECONDS = 30
+
+
+class ServingLauncher:
+    """
+    This class is used to run N uvicorn workers which share the model loaded by the parent process.
+    """
+    def __init__(self, host: str = APP_HOST, port: int = APP_PORT, workers: int = APP_WORKERS, reload_interval: float = APP_MODEL_RELOAD_INTERVAL_SECONDS):
+        self.host = host
+        self.port = port
+        self.workers = workers if workers > 0 else (os.cpu_count() or 1)
+        self.reload_interval = reload_interval
+        # pid of every running worker and the generation it belongs to.
+        self.worker_generations: Dict[int, int] = {}
+        self.generation = 0
+        self.socket = None
+        self.app_module = None
+        # time of the recent crashes of the workers, and the time and generation of every pending restart.
+        self._crash_times: Deque[float] = deque()
+        self._pending_restarts: List[Tuple[float, int]] = []
+        self._reload_requested = False
+        self._stop_requested = False
+        self._crash_limit_reached = False
+
+    def _prepare_environment(self) -> None:
+        # metrics of the workers are aggregated through a shared directory.
+        if not os.getenv(PROMETHEUS_MULTIPROC_DIR_KEY):
+            os.environ[PROMETHEUS_MULTIPROC_DIR_KEY] = tempfile.mkdtemp(prefix="sensor_metrics_")
+        # workers predict concurrently, so each of them gets its share of the cores instead of all of them.
+        os.environ.setdefault("OMP_NUM_THREADS", str(max(1, (os.cpu_count() or 1) // self.workers)))
+
+    def _bind_socket(self) -> socket.socket:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((self.host, self.port))
+        sock.listen(2048)
+        sock.set_inheritable(True)
+        return sock
+
+    def load_model(self) -> bool:
+        """
+        This method is used to load the newest model in the parent process before the workers are forked.
+
+        Returns:
+            bool: True when a different model or challenger than the ones of the running workers was loaded.
+        """
+        model_cache = self.app_module.model_cache
+        previous_model_path = model_cache.model_path
+        # the parent checks on every call, the workers never check and keep the model they were forked with.
+        model_cache.check_interval = 0
+        model_cache.get_model()
+        is_model_changed = model_cache.model_path != previous_model_path
+        # the challenger of the shadow scoring is shared by the workers the same way.
+        shadow_scorer = getattr(self.app_module, "shadow_scorer", None)
+        if shadow_scorer is not None:
+            previous_challenger_path = shadow_scorer.model_cache.model_path
+            shadow_scorer.model_cache.check_interval = 0
+            shadow_scorer.get_model()
+            is_model_changed = is_model_changed or shadow_scorer.model_cache.model_path != previous_challenger_path
+        # objects which exist before the fork are never moved by the garbage collector, so their pages stay shared.
+        gc.freeze()
+        return is_model_changed
+
+    def spawn_worker(self) -> int:
+        """
+        This method is used to fork one worker which serves the app on the shared socket.
+
+        Returns:
+            int: pid of the worker.
+        """
+        pid = os.fork()
+        if pid != 0:
+            self.worker_generations[pid] = self.generation
+            return pid
+        # worker process.
+        exit_code = 0
+        try:
+            import uvicorn
+            signal.signal(signal.SIGHUP, signal.SIG_DFL)
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            if self.app_module.model_cache.model is not None:
+                self.app_module.model_cache.check_interval = float("inf")
+            # a new challenger is loaded by the parent and reaches the workers with a new generation.
+            shadow_scorer = getattr(self.app_module, "shadow_scorer", None)
+            if shadow_scorer is not None:
+                shadow_scorer.model_cache.check_interval = float("inf")
+            config = uvicorn.Config(self.app_module.app, log_config=None)
+            uvicorn.Server(config).run(sockets=[self.socket])
+        except BaseException as e:
+            logging.exception(e)
+            exit_code = 1
+        finally:
+            os._exit(exit_code)
+
+    def spawn_generation(self) -> None:
+        self.generation += 1
+        for _ in range(self.workers):
+            self.spawn_worker()
+        logging.info(f"Started generation {self.generation} with {self.workers} workers and model {self.app_module.model_cache.model_version}")
+
+    def stop_workers(self, generation: int = None) -> None:
+        """
+        This method is used to gracefully stop the workers of one generation, or every worker when no generation is given.
+        """
+        for pid, worker_generation in list(self.worker_generations.items()):
+            if generation is None or worker_generation == generation:
+                try:
+                    os.kill(pid, signal.SIGTERM)
+                except ProcessLookupError:
+                    pass
+
+    def reap_workers(self) -> None:
+        """
+        This method is used to collect the exited workers and replace the workers of the current generation which died.
+        """
+        # prometheus_client reads the multiprocess directory when it is imported, so it is imported after the environment is prepared.
+        from prometheus_client import multiprocess
+        while self.worker_generations:
+            pid, _ = os.waitpid(-1, os.WNOHANG)
+            if pid == 0:
+                return
+            worker_generation = self.worker_generations.pop(pid, None)
+            multiprocess.mark_process_dead(pid)
+            if worker_generation == self.generation and not self._stop_requested:
+                self._schedule_restart(pid)
+
+    def _schedule_restart(self, pid: int) -> None:
+        """
+        This method is used to restart a crashed worker after a delay which doubles with every crash in
+        the window, the launcher is stopped when the crash limit is reached.
+        """
+        now = time.monotonic()
+        self._crash_times.append(now)
+        while self._crash_times and now - self._crash_times[0] > APP_WORKER_CRASH_WINDOW_SECONDS:
+            self._crash_times.popleft()
+        if len(self._crash_times) >= APP_WORKER_MAX_CRASHES:
+            logging.error(f"Worker {pid} exited unexpectedly, {len(self._crash_times)} workers crashed within {APP_WORKER_CRASH_WINDOW_SECONDS} seconds, stopping the launcher")
+            self._crash_limit_reached = True
+            self._stop_requested = True
+            return
+        delay = min(APP_WORKER_RESTART_DELAY_SECONDS * 2 ** (len(self._crash_times) - 1), APP_WORKER_RESTART_MAX_DELAY_SECONDS)
+        logging.info(f"Worker {pid} exited unexpectedly, starting a new one in {delay} seconds")
+        self._pending_restarts.append((now + delay, self.generation))
+
+    def restart_workers(self) -> None:
+        """
+        This method is used to start the crashed workers whose restart delay is over, a restart of an
+        older generation is dropped since its generation was replaced.
+        """
+        now = time.monotonic()
+        pending_restarts = []
+        for restart_time, generation in self._pending_restarts:
+            if generation != self.generation:
+                continue
+            if restart_time <= now:
+                self.spawn_worker()
+            else:
+                pending_restarts.append((restart_time, generation))
+        self._pending_restarts = pending_restarts
+
+    def reload(self) -> None:
+        """
+        This method is used to roll the workers onto a newer model without downtime: the new generation
+        starts serving before the old one is stopped.
+        """
+        if not self.load_model():
+            return
+        previous_generation = self.generation
+        self.spawn_generation()
+        self.stop_workers(previous_generation)
+
+    def _handle_signal(self, signum, frame) -> None:
+        if signum == signal.SIGHUP:
+            self._reload_requested = True
+        else:
+            self._stop_requested = True
+
+    def run(self) -> None:
+        """
+        This method is used to start the workers and supervise them until the launcher is stopped.
+
+        Raises:
+            SensorException: raises the exception error.
+        """
+        try:
+            self._prepare_environment()
+            # the app is imported after the environment is prepared so that the metrics use the shared directory.
+            from sensor.serving import app as app_module
+            self.app_module = app_module
+            self.socket = self._bind_socket()
+            self.load_model()
+            self.spawn_generation()
+            for signum in (signal.SIGHUP, signal.SIGTERM, signal.SIGINT):
+                signal.signal(signum, self._handle_signal)
+            last_check = time.monotonic()
+            while not self._stop_requested:
+                time.sleep(1)
+                self.reap_workers()
+                if self._stop_requested:
+                    break
+                self.restart_workers()
+                if self._reload_requested or time.monotonic() - last_check >= self.reload_interval:
+                    self._reload_requested = False
+                    last_check = time.monotonic()
+                    self.reload()
+            self.stop_workers()
+            deadline = time.monotonic() + WORKER_SHUTDOWN_TIMEOUT_SECONDS
+            while self.worker_generations and time.monotonic() < deadline:
+                time.sleep(0.1)
+                self.reap_workers()
+            for pid in list(self.worker_generations):
+                os.kill(pid, signal.SIGKILL)
+            if self._crash_limit_reached:
+                raise RuntimeError(f"Stopped after {APP_WORKER_MAX_CRASHES} worker crashes within {APP_WORKER_CRASH_WINDOW_SECONDS} seconds")
+        except Exception as e:
+            self.stop_workers()
+            raise SensorException(e, sys) from e
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the sensor prediction service with several workers sharing the model.")
+    parser.add_argument("--host", default=APP_HOST)
+    parser.add_argument("--port", type=int, default=APP_PORT)
+    parser.add_argument("--workers", type=int, default=APP_WORKERS, help="number of workers, 0 means one per cpu core")
+    parser.add_argument("--reload-interval", type=float, default=APP_MODEL_RELOAD_INTERVAL_SECONDS, help="seconds between checks for a new model")
+    args = parser.parse_args()
+    ServingLauncher(host=args.host, port=args.port, workers=args.workers, reload_interval=args.reload_interval).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+import os
+import time
+from contextlib import contextmanager
+
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess
+
+from sensor.constant.env_variables import PROMETHEUS_MULTIPROC_DIR_KEY
+
+# paths which are not routes of the app are reported under one label to keep the cardinality bounded.
+OTHER_PATH_LABEL = "other"
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BATCH_SIZE_BUCKETS = (1, 10, 50, 100, 500, 1000, 5000, 10000, 50000, 100000)
+
+HTTP_REQUESTS = Counter("sensor_http_requests_total", "HTTP requests served.", ["method", "path", "status"])
+HTTP_REQUEST_LATENCY = Histogram("sensor_http_request_duration_seconds", "HTTP request latency.", ["method", "path"], buckets=LATENCY_BUCKETS)
+PREDICT_PHASE_LATENCY = Histogram("sensor_predict_phase_duration_seconds", "Latency of every phase of a prediction request.", ["phase"], buckets=LATENCY_BUCKETS)
+PREDICT_BATCH_SIZE = Histogram("sensor_predict_batch_rows", "Rows per prediction request.", buckets=BATCH_SIZE_BUCKETS)
+MODEL_CACHE_HITS = Counter("sensor_model_cache_hits_total", "Prediction requests served by the cached model.")
+MODEL_CACHE_MISSES = Counter("sensor_model_cache_misses_total", "Prediction requests which had to load the model.")
+MODEL_RELOADS = Counter("sensor_model_reloads_total", "Times a newer model replaced the cached model.")
+MODEL_LOAD_LATENCY = Histogram("sensor_model_load_duration_seconds", "Time to load the model from disk.", buckets=LATENCY_BUCKETS)
+PREDICTION_LOG_PENDING = Gauge("sensor_prediction_log_pending_requests", "Scored requests waiting to be written to the prediction log.", multiprocess_mode="livesum")
+PREDICTION_LOG_WRITTEN = Counter("sensor_prediction_log_written_total", "Rows written to the prediction log.")
+PREDICTION_LOG_FAILED = Counter("sensor_prediction_log_failed_total", "Rows which could not be written to the prediction log after every retry.")
+PREDICTION_LOG_FLUSH_LATENCY = Histogram("sensor_prediction_log_flush_duration_seconds", "Time of one bulk insert into the prediction log.", buckets=LATENCY_BUCKETS)
+EXPLAIN_CACHE_HITS = Counter("sensor_explain_cache_hits_total", "Rows explained from the contribution cache.")
+EXPLAIN_CACHE_MISSES = Counter("sensor_explain_cache_misses_total", "Rows whose contributions were computed by the model.")
+PREDICTION_CACHE_HITS = Counter("sensor_prediction_cache_hits_total", "Rows scored from the prediction result cache.")
+PREDICTION_CACHE_MISSES = Counter("sensor_prediction_cache_misses_total", "Rows scored by the model because they were not in the prediction result cache.")
+PREDICTION_CACHE_EVICTIONS = Counter("sensor_prediction_cache_evictions_total", "Rows removed from the prediction result cache.", ["reason"])
+PREDICTION_CACHE_ENTRIES = Gauge("sensor_prediction_cache_entries", "Rows in the prediction result cache.", multiprocess_mode="livesum")
+SHADOW_REQUESTS = Counter("sensor_shadow_requests_total", "Prediction requests sent to the challenger model, by outcome.", ["outcome"])
+SHADOW_ROWS = Counter("sensor_shadow_rows_total", "Rows scored by the challenger model.")
+SHADOW_DISAGREEMENTS = Counter("sensor_shadow_disagreements_total", "Rows whose challenger label differs from the served label.")
+SHADOW_SCORE_DIFFERENCE = Histogram("sensor_shadow_score_difference", "Absolute difference between the challenger and the served score of every row.", buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0))
+SHADOW_LATENCY = Histogram("sensor_shadow_duration_seconds", "Time of the challenger to score one request, in the background.", buckets=LATENCY_BUCKETS)
+MODEL_VERSION = Gauge("sensor_model_version", "Version (saved model timestamp) of the served model.", multiprocess_mode="livemax")
+
+
+@contextmanager
+def phase_timer(phase: str):
+    """
+    This function is used to record the latency of one phase (parse, preprocess, infer, serialise) of a prediction request.
+
+    Args:
+        phase (str): name of the phase.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        PREDICT_PHASE_LATENCY.labels(phase=phase).observe(time.perf_counter() - start)
+
+
+def metrics_response_content():
+    """
+    This function is used to get the body and content type of the /metrics response.
+
+    Returns:
+        tuple: body of the response and its content type.
+    """
+    if os.getenv(PROMETHEUS_MULTIPROC_DIR_KEY):
+        # metrics of every worker started by the launcher are aggregated from the shared directory.
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(), CONTENT_TYPE_LATEST
+
+
+class PrometheusMiddleware:
+    """
+    Plain ASGI middleware which counts requests and records their latency. It only wraps the send
+    callable to read the status code, so it does not buffer the body like BaseHTTPMiddleware does.
+    """
+    def __init__(self, app, paths=None):
+        self.app = app
+        # paths of the routes which get their own label, every other path is reported as "other".
+        self.paths = frozenset(paths) if paths is not None else None
+
+    def _path_label(self, scope) -> str:
+        path = scope.get("path", "")
+        if self.paths is None:
+            app = scope.get("app")
+            routes = getattr(app, "routes", None)
+            if routes is None:
+                return OTHER_PATH_LABEL
+            self.paths = frozenset(getattr(route, "path", "") for route in routes)
+        return path if path in self.paths else OTHER_PATH_LABEL
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            method, path = scope.get("method", ""), self._path_label(scope)
+            HTTP_REQUEST_LATENCY.labels(method=method, path=path).observe(time.perf_counter() - start)
+            HTTP_REQUESTS.labels(method=method, path=path, status=str(status_code)).inc()
@@ -0,0 +1,96 @@
+import os
+import sys
+import threading
+import time
+from typing import Any, Optional, Tuple
+
+from sensor.constant.application import MODEL_CACHE_CHECK_INTERVAL_SECONDS
+from sensor.constant.training_pipeline import SAVED_MODEL_DIR
+from sensor.exception import SensorException
+from sensor.logger import logging
+from sensor.ml.model.estimator import ModelResolver
+from sensor.serving.metrics import MODEL_CACHE_HITS, MODEL_CACHE_MISSES, MODEL_LOAD_LATENCY, MODEL_RELOADS, MODEL_VERSION
+from sensor.utils.main_utils import load_object
+
+
+class ModelCache:
+    """
+    This class is used to keep the best model in memory, the saved models directory is checked at
+    most once per check interval and the model is only loaded again when a newer one is pushed.
+    The cache and reload metrics are only exported by the cache of the served model.
+    """
+    def __init__(self, model_dir: str = SAVED_MODEL_DIR, check_interval: float = MODEL_CACHE_CHECK_INTERVAL_SECONDS, export_metrics: bool = True):
+        self.model_resolver = ModelResolver(model_dir=model_dir)
+        self.check_interval = check_interval
+        self.export_metrics = export_metrics
+        self.model = None
+        self.model_path = None
+        self.model_version = None
+        # the model and its version are replaced together, a request never pairs a model with the version of another.
+        self._model_with_version: Tuple[Any, Optional[str]] = (None, None)
+        self._last_check = 0.0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def get_model_version(model_path: str) -> str:
+        """
+        This method is used to get the version of a saved model, i.e. the timestamp directory it is saved in.
+        """
+        return os.path.basename(os.path.dirname(model_path))
+
+    def load_model(self, model_path: str):
+        """
+        This method is used to load the model and make it the cached model.
+
+        Args:
+            model_path (str): path of the model.
+
+        Returns:
+            SensorModel: loaded model.
+        """
+        start = time.perf_counter()
+        model = load_object(file_path=model_path)
+        if self.export_metrics:
+            MODEL_LOAD_LATENCY.observe(time.perf_counter() - start)
+            if self.model is not None:
+                MODEL_RELOADS.inc()
+        model_version = self.get_model_version(model_path)
+        self._model_with_version = (model, model_version)
+        self.model, self.model_path, self.model_version = model, model_path, model_version
+        if self.export_metrics and self.model_version.isdigit():
+            MODEL_VERSION.set(int(self.model_version))
+        logging.info(f"Loaded model version {self.model_version} from {model_path}")
+        return model
+
+    def get_model(self) -> Tuple[Any, Optional[str]]:
+        """
+        This method is used to get the best model with its version, the version must be taken from here
+        and not read from the cache later, another request may have loaded a newer model in between.
+
+        Raises:
+            SensorException: raises the exception error.
+
+        Returns:
+            Tuple[Any, Optional[str]]: best model and its version, (None, None) when no model is pushed yet.
+        """
+        try:
+            model_with_version = self._model_with_version
+            if model_with_version[0] is not None and time.monotonic() - self._last_check < self.check_interval:
+                if self.export_metrics:
+                    MODEL_CACHE_HITS.inc()
+                return model_with_version
+            with self._lock:
+                self._last_check = time.monotonic()
+                if not self.model_resolver.is_model_exists():
+                    return self._model_with_version
+                best_model_path = self.model_resolver.get_best_model_path()
+                if best_model_path == self.model_path:
+                    if self.export_metrics:
+                        MODEL_CACHE_HITS.inc()
+                    return self._model_with_version
+                if self.export_metrics:
+                    MODEL_CACHE_MISSES.inc()
+                self.load_model(best_model_path)
+                return self._model_with_version
+        except Exception as e:
+            raise SensorException(e, sys) from e
@@ -0,0 +1,148 @@
+import asyncio
+import sys
+import time
+from datetime import datetime
+from typing import List, Optional
+
+import numpy as np
+
+from sensor.constant import application
+from sensor.constant.database import PREDICTION_LOG_COLLECTION_NAME
+from sensor.exception import SensorException
+from sensor.logger import logging
+from sensor.serving.metrics import PREDICTION_LOG_FAILED, PREDICTION_LOG_FLUSH_LATENCY, PREDICTION_LOG_PENDING, PREDICTION_LOG_WRITTEN
+from sensor.serving.row_hash import hash_feature_rows
+
+# seconds to wait before the first retry of a failed bulk insert, doubled on every retry.
+RETRY_BACKOFF_SECONDS = 0.5
+
+
+class PredictionLogSink:
+    """
+    This class is used to persist every scored row for later labelling and drift checks without
+    writing to mongodb on the request path. Requests only enqueue their (features, scores) arrays,
+    a background task turns them into documents and writes them with unordered bulk inserts when
+    the batch is full or the flush interval is over. When the queue is full new requests wait
+    (backpressure) instead of dropping rows. Rows which can not be written are logged and counted,
+    and when the background task is not running the rows are dropped instead of blocking requests.
+    """
+    def __init__(self, collection_name: str = PREDICTION_LOG_COLLECTION_NAME, batch_size: int = application.PREDICTION_LOG_BATCH_SIZE, flush_interval: float = application.PREDICTION_LOG_FLUSH_INTERVAL_SECONDS, max_pending_requests: int = application.PREDICTION_LOG_MAX_PENDING_REQUESTS, max_retries: int = application.PREDICTION_LOG_MAX_RETRIES, mongo_client=None):
+        self.collection_name = collection_name
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending_requests = max_pending_requests
+        self.max_retries = max_retries
+        self.mongo_client = mongo_client
+        self.queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        """
+        This method is used to start the background flush task, it must be called from the event loop of the app.
+        """
+        try:
+            if self.mongo_client is None:
+                from sensor.configuration.async_mongo_db_connection import AsyncMongoDBClient
+                self.mongo_client = AsyncMongoDBClient()
+            self.queue = asyncio.Queue(maxsize=self.max_pending_requests)
+            self._task = asyncio.ensure_future(self._run())
+            logging.info(f"Started the prediction log sink of collection {self.collection_name}")
+        except Exception as e:
+            raise SensorException(e, sys) from e
+
+    async def stop(self) -> None:
+        """
+        This method is used to write the pending rows and stop the background task.
+        """
+        if self._task is None:
+            return
+        await self.queue.put(None)
+        await self._task
+        self._task = None
+
+    async def submit(self, features: np.ndarray, predictions: np.ndarray, scores: np.ndarray, model_version: str, **extra_fields) -> None:
+        """
+        This method is used to enqueue the scored rows of one request, it waits when the queue is full.
+
+        Args:
+            features (np.ndarray): coerced float32 feature matrix.
+            predictions (np.ndarray): predicted label of every row.
+            scores (np.ndarray): score of every row.
+            model_version (str): version of the model which scored the rows.
+            extra_fields: fields added to every document, like the role of the model.
+        """
+        if self.queue is None or len(features) == 0:
+            return
+        if self._task is None or self._task.done():
+            # nothing drains the queue any more, waiting for room would block the request forever.
+            PREDICTION_LOG_FAILED.inc(len(features))
+            logging.error(f"Prediction log task is not running, dropped {len(features)} rows")
+            return
+        await self.queue.put((features, predictions, scores, model_version, datetime.utcnow(), extra_fields))
+        PREDICTION_LOG_PENDING.set(self.queue.qsize())
+
+    @staticmethod
+    def to_documents(features: np.ndarray, predictions: np.ndarray, scores: np.ndarray, model_version: str, timestamp: datetime, extra_fields: dict) -> List[dict]:
+        """
+        This method is used to convert the scored rows of one request into prediction log documents.
+        """
+        feature_rows = np.where(np.isnan(features), None, features.astype(object)).tolist()
+        return [
+            {"inputs_hash": inputs_hash, "features": feature_row, "prediction": int(prediction), "score": float(score), "model_version": model_version, "timestamp": timestamp, **extra_fields}
+            for inputs_hash, feature_row, prediction, score in zip(hash_feature_rows(features), feature_rows, predictions, scores)
+        ]
+
+    async def _flush(self, documents: List[dict]) -> None:
+        """
+        This method is used to write the documents with an unordered bulk insert, retrying with backoff.
+        Rows which still fail after every retry are logged and counted, never dropped silently.
+        """
+        delay = RETRY_BACKOFF_SECONDS
+        for attempt in range(self.max_retries + 1):
+            start = time.perf_counter()
+            try:
+                inserted = await self.mongo_client.insert_many(self.collection_name, documents, ordered=False)
+                PREDICTION_LOG_FLUSH_LATENCY.observe(time.perf_counter() - start)
+                PREDICTION_LOG_WRITTEN.inc(inserted)
+                return
+            except Exception as e:
+                logging.error(f"Prediction log flush of {len(documents)} rows failed (attempt {attempt + 1}): {e}")
+                if attempt < self.max_retries:
+                    await asyncio.sleep(delay)
+                    delay *= 2
+        PREDICTION_LOG_FAILED.inc(len(documents))
+        logging.error(f"Prediction log lost {len(documents)} rows after {self.max_retries + 1} attempts")
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        documents: List[dict] = []
+        deadline = loop.time() + self.flush_interval
+        stopping = False
+        while not stopping:
+            try:
+                try:
+                    item = await asyncio.wait_for(self.queue.get(), timeout=max(deadline - loop.time(), 0))
+                    if item is None:
+                        stopping = True
+                    else:
+                        try:
+                            documents.extend(self.to_documents(*item))
+                        except Exception as e:
+                            # only the rows of this request are lost, the converted rows are still written.
+                            PREDICTION_LOG_FAILED.inc(len(item[0]))
+                            logging.exception(f"Prediction log lost {len(item[0])} rows which could not be converted: {e}")
+                    PREDICTION_LOG_PENDING.set(self.queue.qsize())
+                except asyncio.TimeoutError:
+                    pass
+                if len(documents) >= self.batch_size or loop.time() >= deadline or stopping:
+                    # full batches are written one after another, the rest waits for the next flush.
+                    while len(documents) >= self.batch_size or (documents and (loop.time() >= deadline or stopping)):
+                        batch, documents = documents[:self.batch_size], documents[self.batch_size:]
+                        await self._flush(batch)
+                    deadline = loop.time() + self.flush_interval
+            except Exception as e:
+                # an unexpected error loses the pending rows but never stops the task, the queue keeps draining.
+                PREDICTION_LOG_FAILED.inc(len(documents))
+                logging.exception(f"Prediction log lost {len(documents)} rows: {e}")
+                documents = []
+                deadline = loop.time() + self.flush_interval
@@ -0,0 +1,110 @@
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from sensor.constant.application import PREDICTION_CACHE_MAX_ENTRIES, PREDICTION_CACHE_TTL_SECONDS
+from sensor.exception import SensorException
+from sensor.serving.metrics import PREDICTION_CACHE_ENTRIES, PREDICTION_CACHE_EVICTIONS, PREDICTION_CACHE_HITS, PREDICTION_CACHE_MISSES
+
+
+class PredictionResultCache:
+    """
+    This class is used to keep the score of recently scored rows, keyed by the hash of the coerced
+    row, so identical readings (retries, stalled trucks) are not scored again. Only the scores of one
+    model version are kept: the cache is emptied when a new model is served. Rows are kept in
+    insertion order, so the expired rows and, when the cache is full, the oldest rows are evicted
+    from the front.
+    """
+    def __init__(self, max_entries: int = PREDICTION_CACHE_MAX_ENTRIES, ttl_seconds: float = PREDICTION_CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.model_version: Optional[str] = None
+        # row hash -> (score, expiry time).
+        self._entries: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _set_model_version(self, model_version: str) -> None:
+        """
+        This method is used to empty the cache when the scores of another model version are requested.
+        """
+        if model_version != self.model_version:
+            if self._entries:
+                PREDICTION_CACHE_EVICTIONS.labels(reason="model_version").inc(len(self._entries))
+                self._entries.clear()
+                PREDICTION_CACHE_ENTRIES.set(0)
+            self.model_version = model_version
+
+    def _evict_expired(self, now: float) -> None:
+        n_expired = 0
+        while self._entries and next(iter(self._entries.values()))[1] <= now:
+            self._entries.popitem(last=False)
+            n_expired += 1
+        if n_expired:
+            PREDICTION_CACHE_EVICTIONS.labels(reason="ttl").inc(n_expired)
+            PREDICTION_CACHE_ENTRIES.set(len(self._entries))
+
+    def lookup(self, model_version: str, row_hashes: List[str]) -> np.ndarray:
+        """
+        This method is used to get the cached score of every row.
+
+        Args:
+            model_version (str): version of the served model.
+            row_hashes (List[str]): hash of every coerced row.
+
+        Raises:
+            SensorException: raises the exception error.
+
+        Returns:
+            np.ndarray: score of every row, nan for the rows which are not cached.
+        """
+        try:
+            scores = np.full(len(row_hashes), np.nan, dtype=np.float64)
+            with self._lock:
+                self._set_model_version(model_version)
+                self._evict_expired(time.monotonic())
+                for index, row_hash in enumerate(row_hashes):
+                    entry = self._entries.get(row_hash)
+                    if entry is not None:
+                        scores[index] = entry[0]
+            n_hits = int(np.count_nonzero(~np.isnan(scores)))
+            PREDICTION_CACHE_HITS.inc(n_hits)
+            PREDICTION_CACHE_MISSES.inc(len(row_hashes) - n_hits)
+            return scores
+        except Exception as e:
+            raise SensorException(e, sys) from e
+
+    def store(self, model_version: str, row_hashes: List[str], scores: np.ndarray) -> None:
+        """
+        This method is used to cache the scores of rows scored by the model.
+
+        Args:
+            model_version (str): version of the model which scored the rows.
+            row_hashes (List[str]): hash of every scored row.
+            scores (np.ndarray): score of every row.
+
+        Raises:
+            SensorException: raises the exception error.
+        """
+        try:
+            expires_at = time.monotonic() + self.ttl_seconds
+            with self._lock:
+                self._set_model_version(model_version)
+                for row_hash, score in zip(row_hashes, np.asarray(scores, dtype=np.float64).tolist()):
+                    # a row stored again moves to the back with a new expiry time.
+                    self._entries.pop(row_hash, None)
+                    self._entries[row_hash] = (score, expires_at)
+                n_evicted = max(len(self._entries) - self.max_entries, 0)
+                for _ in range(n_evicted):
+                    self._entries.popitem(last=False)
+                if n_evicted:
+                    PREDICTION_CACHE_EVICTIONS.labels(reason="size").inc(n_evicted)
+                PREDICTION_CACHE_ENTRIES.set(len(self._entries))
+        except Exception as e:
+            raise SensorException(e, sys) from e
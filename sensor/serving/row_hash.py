@@ -0,0 +1,19 @@
+import hashlib
+from typing import List
+
+import numpy as np
+
+
+def hash_feature_rows(features: np.ndarray) -> List[str]:
+    """
+    This function is used to hash every row of a coerced float32 feature matrix, identical readings
+    always give the same hash.
+
+    Args:
+        features (np.ndarray): float32 feature matrix.
+
+    Returns:
+        List[str]: hex digest of every row.
+    """
+    rows = np.ascontiguousarray(features, dtype=np.float32)
+    return [hashlib.blake2b(row.tobytes(), digest_size=16).hexdigest() for row in rows]
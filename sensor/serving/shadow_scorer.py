@@ -0,0 +1,141 @@
+import asyncio
+import random
+import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Set
+
+import numpy as np
+
+from sensor.constant.application import SHADOW_MAX_PENDING_REQUESTS, SHADOW_MODEL_DIR, SHADOW_MODEL_THREADS, SHADOW_TRAFFIC_FRACTION
+from sensor.exception import SensorException
+from sensor.logger import logging
+from sensor.serving.metrics import SHADOW_DISAGREEMENTS, SHADOW_LATENCY, SHADOW_REQUESTS, SHADOW_ROWS, SHADOW_SCORE_DIFFERENCE
+from sensor.serving.model_cache import ModelCache
+from sensor.serving.prediction_logger import PredictionLogSink
+
+
+class ShadowScorer:
+    """
+    This class is used to score a fraction of the prediction requests with a challenger model, so it
+    can be compared with the served model on production data before it is promoted. The requests only
+    schedule a background task: the challenger scores the rows on its own thread, the agreement with
+    the served scores is exported as metrics and its scores are written to the prediction log with
+    the request id of the served scores. When too many requests are pending, new ones are not shadowed
+    instead of waiting.
+    """
+    def __init__(self, prediction_log_sink: PredictionLogSink, model_dir: str = SHADOW_MODEL_DIR, traffic_fraction: float = SHADOW_TRAFFIC_FRACTION, max_pending_requests: int = SHADOW_MAX_PENDING_REQUESTS, n_threads: int = SHADOW_MODEL_THREADS, seed: Optional[int] = None):
+        if not 0 <= traffic_fraction <= 1:
+            raise ValueError(f"Shadow traffic fraction must be between 0 and 1, got {traffic_fraction}")
+        self.prediction_log_sink = prediction_log_sink
+        # challenger registry, the newest model in it is the challenger.
+        self.model_cache = ModelCache(model_dir=model_dir, export_metrics=False)
+        self.traffic_fraction = traffic_fraction
+        self.max_pending_requests = max_pending_requests
+        self.n_threads = n_threads
+        self._random = random.Random(seed)
+        # the thread is started on the first shadowed request, after the launcher forked the worker.
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._tasks: Set[asyncio.Future] = set()
+        self._configured_model = None
+
+    def get_model(self):
+        """
+        This method is used to get the challenger model with its version, its XGBoost threads are limited
+        so it does not take the cores of the served requests. It only runs on the thread of the shadow executor.
+        """
+        model, model_version = self.model_cache.get_model()
+        if model is not None and model is not self._configured_model:
+            if hasattr(model.model, "set_params"):
+                model.model.set_params(n_jobs=self.n_threads)
+            self._configured_model = model
+        return model, model_version
+
+    def score(self, features: np.ndarray, predictions: np.ndarray, scores: np.ndarray, model_version: str) -> Optional[tuple]:
+        """
+        This method is used to score the rows with the challenger and compare them with the served scores.
+
+        Args:
+            features (np.ndarray): coerced rows of the request.
+            predictions (np.ndarray): served label of every row.
+            scores (np.ndarray): served score of every row.
+            model_version (str): version of the served model.
+
+        Returns:
+            tuple: challenger version, label and score of every row, None when there is no challenger
+                or it is the served model.
+        """
+        start = time.perf_counter()
+        model, challenger_version = self.get_model()
+        if model is None or challenger_version == model_version:
+            return None
+        challenger_scores = model.model.predict_proba(model.preprocessor.transform(features))[:, 1]
+        challenger_predictions = model.apply_threshold(challenger_scores)
+        SHADOW_LATENCY.observe(time.perf_counter() - start)
+        SHADOW_ROWS.inc(len(challenger_scores))
+        SHADOW_DISAGREEMENTS.inc(int(np.count_nonzero(challenger_predictions != predictions)))
+        for score_difference in np.abs(challenger_scores - np.asarray(scores, dtype=np.float64)).tolist():
+            SHADOW_SCORE_DIFFERENCE.observe(score_difference)
+        return challenger_version, challenger_predictions, challenger_scores
+
+    async def _shadow(self, features: np.ndarray, predictions: np.ndarray, scores: np.ndarray, model_version: str, request_id: str) -> None:
+        """
+        This method is used to score one request in the background, a failure is logged and counted, it never reaches the request.
+        """
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(self._executor, self.score, features, predictions, scores, model_version)
+            if result is None:
+                SHADOW_REQUESTS.labels(outcome="no_challenger").inc()
+                return
+            challenger_version, challenger_predictions, challenger_scores = result
+            await self.prediction_log_sink.submit(features, challenger_predictions, challenger_scores, challenger_version, role="challenger", request_id=request_id)
+            SHADOW_REQUESTS.labels(outcome="scored").inc()
+        except Exception as e:
+            SHADOW_REQUESTS.labels(outcome="failed").inc()
+            logging.error(f"Shadow scoring of request {request_id} failed: {e}")
+
+    def submit(self, features: np.ndarray, predictions: np.ndarray, scores: np.ndarray, model_version: str) -> Optional[str]:
+        """
+        This method is used to send a scored request to the challenger, it returns without waiting for
+        the challenger. It must be called from the event loop of the app.
+
+        Args:
+            features (np.ndarray): coerced rows of the request.
+            predictions (np.ndarray): served label of every row.
+            scores (np.ndarray): served score of every row.
+            model_version (str): version of the served model.
+
+        Raises:
+            SensorException: raises the exception error.
+
+        Returns:
+            Optional[str]: id of the request which pairs the served and the challenger scores in the
+                prediction log, None when the request is not shadowed.
+        """
+        try:
+            if len(features) == 0 or self.traffic_fraction <= 0 or self._random.random() >= self.traffic_fraction:
+                return None
+            if len(self._tasks) >= self.max_pending_requests:
+                SHADOW_REQUESTS.labels(outcome="dropped").inc()
+                return None
+            if self._executor is None:
+                # one thread, the challenger never scores more than one request at a time.
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="shadow")
+            request_id = uuid.uuid4().hex
+            task = asyncio.ensure_future(self._shadow(features, predictions, scores, model_version, request_id))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+            return request_id
+        except Exception as e:
+            raise SensorException(e, sys) from e
+
+    async def stop(self) -> None:
+        """
+        This method is used to wait for the pending shadow requests and stop the shadow thread.
+        """
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
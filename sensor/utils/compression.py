@@ -0,0 +1,183 @@
+import io
+from contextlib import contextmanager
+from typing import IO, Iterator, Optional
+
+from sensor.constant.training_pipeline import ARTIFACT_COMPRESSION_CODECS, ARTIFACT_COMPRESSION_LZ4_LEVEL, ARTIFACT_COMPRESSION_ZSTD_LEVEL
+
+try:
+    import zstandard
+except ImportError:
+    # zstandard is in requirements.txt, without it only uncompressed and lz4 artifacts can be used.
+    zstandard = None
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:
+    # lz4 is in requirements.txt, without it only uncompressed and zstd artifacts can be used.
+    lz4_frame = None
+
+# first bytes of a zstd and of an lz4 frame, a compressed artifact is recognised by them.
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+LZ4_MAGIC = b"\x04\x22\x4d\x18"
+CODEC_PACKAGES = {"zstd": "zstandard", "lz4": "lz4"}
+
+
+def is_codec_available(codec: str) -> bool:
+    """
+    This function is used to check if the package of a codec is installed.
+    """
+    return (codec == "zstd" and zstandard is not None) or (codec == "lz4" and lz4_frame is not None)
+
+
+def check_codec(codec: Optional[str]) -> Optional[str]:
+    """
+    This function is used to validate a codec, so a missing package fails before any artifact is written.
+
+    Args:
+        codec (Optional[str]): "zstd", "lz4" or an empty value for no compression.
+
+    Raises:
+        ValueError: the codec is not supported.
+        ImportError: the package of the codec is not installed.
+
+    Returns:
+        Optional[str]: codec, None for no compression.
+    """
+    codec = (codec or "").strip().lower() or None
+    if codec is None:
+        return None
+    if codec not in ARTIFACT_COMPRESSION_CODECS:
+        raise ValueError(f"Artifact compression must be one of {ARTIFACT_COMPRESSION_CODECS}, got {codec}")
+    if not is_codec_available(codec):
+        raise ImportError(f"Artifact compression {codec} needs the {CODEC_PACKAGES[codec]} package: pip install {CODEC_PACKAGES[codec]}")
+    return codec
+
+
+def detect_codec(header: bytes) -> Optional[str]:
+    """
+    This function is used to get the codec of a file from its first bytes.
+
+    Returns:
+        Optional[str]: "zstd", "lz4" or None for an uncompressed file.
+    """
+    if header.startswith(ZSTD_MAGIC):
+        return "zstd"
+    if header.startswith(LZ4_MAGIC):
+        return "lz4"
+    return None
+
+
+def get_file_codec(file_path: str) -> Optional[str]:
+    """
+    This function is used to get the codec a file was written with, None for an uncompressed file.
+    """
+    with open(file_path, "rb") as file_obj:
+        return detect_codec(file_obj.read(len(ZSTD_MAGIC)))
+
+
+class CountingWriter:
+    """
+    This class is used to count the bytes written through a file object, the size of an artifact
+    before compression.
+    """
+    def __init__(self, file_obj: IO[bytes]):
+        self.file_obj = file_obj
+        self.n_bytes = 0
+
+    def write(self, data) -> int:
+        self.n_bytes += memoryview(data).nbytes
+        return self.file_obj.write(data)
+
+    def flush(self) -> None:
+        self.file_obj.flush()
+
+
+@contextmanager
+def compress_stream(file_obj: IO[bytes], codec: Optional[str] = None) -> Iterator[IO[bytes]]:
+    """
+    This function is used to wrap a writable file object, the data written to it is compressed with
+    the codec. The file object is left open.
+    """
+    codec = check_codec(codec)
+    if codec is None:
+        yield file_obj
+    elif codec == "zstd":
+        with zstandard.ZstdCompressor(level=ARTIFACT_COMPRESSION_ZSTD_LEVEL).stream_writer(file_obj, closefd=False) as writer:
+            yield writer
+    else:
+        # LZ4FrameFile does not close a file object it did not open.
+        with lz4_frame.LZ4FrameFile(file_obj, mode="wb", compression_level=ARTIFACT_COMPRESSION_LZ4_LEVEL) as writer:
+            yield writer
+
+
+@contextmanager
+def open_for_write(file_path: str, codec: Optional[str] = None) -> Iterator[IO[bytes]]:
+    """
+    This function is used to open a file for writing, the data is compressed while it is written so
+    the uncompressed artifact is never held in memory.
+
+    Args:
+        file_path (str): path of the file.
+        codec (Optional[str]): "zstd", "lz4" or None for no compression.
+
+    Yields:
+        IO[bytes]: writable file object.
+    """
+    codec = check_codec(codec)
+    with open(file_path, "wb") as file_obj:
+        with compress_stream(file_obj, codec) as writer:
+            yield writer
+
+
+@contextmanager
+def open_for_read(file_path: str) -> Iterator[IO[bytes]]:
+    """
+    This function is used to open a file for reading, a compressed file is recognised by its first
+    bytes and decompressed while it is read.
+
+    Args:
+        file_path (str): path of the file.
+
+    Raises:
+        ImportError: the file is compressed with a codec whose package is not installed.
+
+    Yields:
+        IO[bytes]: readable file object, only an uncompressed file can be seeked.
+    """
+    with open(file_path, "rb") as file_obj:
+        codec = detect_codec(file_obj.read(len(ZSTD_MAGIC)))
+        file_obj.seek(0)
+        if codec is None:
+            yield file_obj
+        else:
+            check_codec(codec)
+            if codec == "zstd":
+                with zstandard.ZstdDecompressor().stream_reader(file_obj, closefd=False) as reader:
+                    yield reader
+            else:
+                with lz4_frame.LZ4FrameFile(file_obj, mode="rb") as reader:
+                    yield reader
+
+
+def compress_bytes(data: bytes, codec: str) -> bytes:
+    """
+    This function is used to compress bytes in memory with a codec.
+    """
+    buffer = io.BytesIO()
+    with compress_stream(buffer, codec) as writer:
+        writer.write(data)
+    return buffer.getvalue()
+
+
+def decompress_bytes(data: bytes) -> bytes:
+    """
+    This function is used to decompress bytes in memory, uncompressed bytes are returned as they are.
+    """
+    codec = detect_codec(data[:len(ZSTD_MAGIC)])
+    if codec is None:
+        return data
+    check_codec(codec)
+    if codec == "zstd":
+        with zstandard.ZstdDecompressor().stream_reader(io.BytesIO(data)) as reader:
+            return reader.read()
+    return lz4_frame.decompress(data)
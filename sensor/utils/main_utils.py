@@ -1,10 +1,12 @@
 import os,sys
+import time
 import yaml
 import numpy as np
 import dill
 
 from sensor.exception import SensorException
 from sensor.logger import logging
+from sensor.utils.compression import CountingWriter, check_codec, open_for_read, open_for_write
 
 def read_yaml_file(file_path:str)->dict:
     """
@@ -53,31 +55,80 @@ def write_yaml_file(file_path:str, content:object, replace:bool = False)->None:
         raise SensorException(e, sys) from e
 
 
-def save_numpy_array_data(file_path:str, array:np.array):
+def get_artifact_size_report(file_path: str, codec, raw_bytes: int, seconds: float) -> dict:
+    """
+    This function is used to report the size of a written artifact before and after compression and
+    the time it took to write it.
+
+    Args:
+        file_path (str): path of the artifact.
+        codec (str): codec of the artifact, None when it is not compressed.
+        raw_bytes (int): size of the artifact before compression.
+        seconds (float): time to serialise, compress and write the artifact.
+
+    Returns:
+        dict: size report of the artifact.
+    """
+    stored_bytes = os.path.getsize(file_path)
+    report = {
+        "file_path": file_path,
+        "codec": codec,
+        "raw_bytes": raw_bytes,
+        "stored_bytes": stored_bytes,
+        "ratio": round(raw_bytes / stored_bytes, 3) if stored_bytes else None,
+        "write_seconds": round(seconds, 4),
+    }
+    logging.info(f"Artifact size report: {report}")
+    return report
+
+def save_numpy_array_data(file_path:str, array:np.array, compression:str = None)->dict:
     """
     This is function is used to saving the numpy array data.
 
     Args:
         file_path (str): path of the file.
         array (np.array): numpy array data.
+        compression (str, optional): "zstd" or "lz4" to compress the file, a compressed file can not be memory mapped. Defaults to None.
 
     Raises:
         SensorException: raises the exception.
+
+    Returns:
+        dict: size report of the file.
     """
     try:
+        codec = check_codec(compression)
         dir_path = os.path.dirname(file_path)
         # creating the dir
         os.makedirs(dir_path, exist_ok=True)
-        # opening the filepath and write the numpy array data nto file.
-        with open(file_path,"wb") as file_obj:
+        start = time.perf_counter()
+        # opening the filepath and write the numpy array data nto file, compressed while it is written.
+        with open_for_write(file_path, codec) as file_obj:
+            writer = CountingWriter(file_obj)
             # saving the numpy array.
-            np.save(file_obj, array)
+            np.save(writer, array)
+        return get_artifact_size_report(file_path, codec, writer.n_bytes, time.perf_counter() - start)
     except Exception as e:
         raise SensorException(e, sys) from e
 
+def read_numpy_array_header(file_obj)->tuple:
+    """
+    This function is used to read the header of a numpy file, the file object is left at the start of the data.
+
+    Args:
+        file_obj (file): numpy file opened for reading, it does not need to be seekable.
+
+    Returns:
+        tuple: shape, fortran order and dtype of the array.
+    """
+    version = np.lib.format.read_magic(file_obj)
+    if version == (1, 0):
+        return np.lib.format.read_array_header_1_0(file_obj)
+    return np.lib.format.read_array_header_2_0(file_obj)
+
 def load_numpy_array_data(file_path:str):
     """
-    This function is used to load the numpy array data.
+    This function is used to load the numpy array data, a compressed file is decompressed.
 
     Args:
         file_path (str): path of the file.
@@ -90,39 +141,57 @@ def load_numpy_array_data(file_path:str):
     """
     try:
         # loading the data from given file path.
-        with open(file_path, "rb") as file_obj:
-            return np.load(file_obj)
+        with open_for_read(file_path) as file_obj:
+            if file_obj.seekable():
+                return np.load(file_obj)
+            # np.load needs to seek, the decompressed header and data are read in order instead.
+            shape, fortran_order, dtype = read_numpy_array_header(file_obj)
+            array = np.empty(shape, dtype=dtype, order="F" if fortran_order else "C")
+            buffer = memoryview(array.reshape(-1, order="A")).cast("B")
+            n_read = 0
+            while n_read < len(buffer):
+                n_chunk = file_obj.readinto(buffer[n_read:])
+                if not n_chunk:
+                    raise EOFError(f"{file_path} is truncated, read {n_read} of {len(buffer)} bytes")
+                n_read += n_chunk
+            return array
     except Exception as e:
         raise SensorException(e, sys) from e
 
-def save_object(file_path: str, obj: object):
+def save_object(file_path: str, obj: object, compression: str = None)->dict:
     """
     This function is used for the saving the object.
 
     Args:
         file_path (str): path of the file.
         obj (object): object.
+        compression (str, optional): "zstd" or "lz4" to compress the file. Defaults to None.
 
-    Returns: dumping the data.
+    Returns:
+        dict: size report of the file.
 
     Raises:
         SensorException: raises the exception.
     """
     logging.info("Entered the save object method of Main utils Class")
     try:
+        codec = check_codec(compression)
         # creating the directory.
         os.makedirs(os.path.dirname(file_path), exist_ok=True)
-        # writing the data in the form of pickle format by dill module.
-        with open(file_path, "wb") as file_obj:
+        start = time.perf_counter()
+        # writing the data in the form of pickle format by dill module, compressed while it is written.
+        with open_for_write(file_path, codec) as file_obj:
+            writer = CountingWriter(file_obj)
             # dumping the data.
-            dill.dump(obj, file_obj)
+            dill.dump(obj, writer)
         logging.info("Exited the save object method of mainutils class")
+        return get_artifact_size_report(file_path, codec, writer.n_bytes, time.perf_counter() - start)
     except Exception as e:
         raise SensorException(e, sys) from e
 
 def load_object(file_path: str):
     """
-    The function is used for loading the object.
+    The function is used for loading the object, a compressed file is decompressed.
 
     Args:
         file_path (str): path of the file.
@@ -140,7 +209,7 @@ def load_object(file_path: str):
         if not os.path.exists(file_path):
             raise Exception("The File:{file_path} is not exists")
         # opening the file then reading the file.
-        with open(file_path, "rb") as file_obj:
+        with open_for_read(file_path) as file_obj:
             return dill.load(file_obj)
     except Exception as e:
         raise SensorException(e, sys) from e
@@ -0,0 +1,74 @@
+import os
+
+try:
+    import resource
+except ImportError:
+    # resource module is not available on windows.
+    resource = None
+
+PROC_STATUS_FILE_PATH = "/proc/self/status"
+PROC_CLEAR_REFS_FILE_PATH = "/proc/self/clear_refs"
+
+
+def _read_proc_status_kb(key: str):
+    """
+    This function is used to read a memory counter in kB from /proc/self/status.
+
+    Args:
+        key (str): name of the counter like VmRSS or VmHWM.
+
+    Returns:
+        int: value of the counter in kB, None when it is not available.
+    """
+    try:
+        with open(PROC_STATUS_FILE_PATH, "r") as status_file:
+            for line in status_file:
+                if line.startswith(key + ":"):
+                    return int(line.split()[1])
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+def get_rss() -> int:
+    """
+    This function is used to get the current resident set size of the process.
+
+    Returns:
+        int: resident set size in bytes, 0 when it is not available.
+    """
+    rss_kb = _read_proc_status_kb("VmRSS")
+    return rss_kb * 1024 if rss_kb is not None else 0
+
+
+def get_peak_rss() -> int:
+    """
+    This function is used to get the peak resident set size of the process.
+
+    Returns:
+        int: peak resident set size in bytes, 0 when it is not available.
+    """
+    peak_kb = _read_proc_status_kb("VmHWM")
+    if peak_kb is not None:
+        return peak_kb * 1024
+    if resource is None:
+        return 0
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kB on linux and in bytes on macOS.
+    return max_rss if os.uname().sysname == "Darwin" else max_rss * 1024
+
+
+def reset_peak_rss() -> bool:
+    """
+    This function is used to reset the peak resident set size to the current one, so that the
+    peak of the next step can be measured. It is only supported on linux.
+
+    Returns:
+        bool: True when the peak was reset otherwise False.
+    """
+    try:
+        with open(PROC_CLEAR_REFS_FILE_PATH, "w") as clear_refs_file:
+            clear_refs_file.write("5")
+        return True
+    except OSError:
+        return False